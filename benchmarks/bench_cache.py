@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of cache hits of `bulwark.cache.ValidationCache`.
+
+A hit costs a fingerprint of the columns a check looks at. Comparing these timings
+with those of the same check and parameters in `bench_checks` shows which checks are
+worth caching (`bulwark.cache.CACHED_CHECKS`): ``HasNoNansCacheHit`` is up to 50 times
+slower than ``HasNoNans`` on numeric columns, while the other hits cost about as much as
+their checks on small frames, and much less as columns outgrow the CPU caches (e.g. 0.2 s
+against 1.5 s for ``unique`` of 1e7 shuffled ints).
+"""
+from bulwark.cache import ValidationCache
+
+from . import bench_checks
+
+
+class _CacheHit(object):
+    """Times looking up a check, which passed on the benchmarked frame, in a cache."""
+
+    def setup(self, rows, columns, dtype, case):
+        if case == "fail":
+            raise NotImplementedError("Failing checks aren't cached.")
+        super(_CacheHit, self).setup(rows, columns, dtype, case)
+        self.cache = ValidationCache()
+        self.cache.add(self.cache.key(self.df, self.check, self.kwargs))
+
+    def run(self):
+        assert self.cache.key(self.df, self.check, self.kwargs) in self.cache
+
+
+class HasNoNansCacheHit(_CacheHit, bench_checks.HasNoNans):
+    pass
+
+
+class UniqueCacheHit(_CacheHit, bench_checks.Unique):
+    pass
+
+
+class HasUniqueKeyCacheHit(_CacheHit, bench_checks.HasUniqueKey):
+    pass
+
+
+class OneToManyCacheHit(_CacheHit, bench_checks.OneToMany):
+    pass
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of every check in `bulwark.checks`.
+
+Deprecated aliases (``none_missing``, ``unique_index``, ``within_set``, ``within_range``
+and ``within_n_std``) only forward to the checks benchmarked here, so they're left out.
+"""
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+
+from .common import CASES, DTYPES, ROWS, _CheckBenchmark, missing_value
+
+NUMERIC = ["float", "int", "nullable"]
+
+
+def _with_last(df, value, col=0):
+    """Copy of `df` with the last value of its `col`th column set to `value`."""
+    df = df.copy()
+    df.iloc[-1, col] = value
+    return df
+
+
+def _last_is_missing(df, dtype, fail):
+    return (_with_last(df, missing_value(dtype)) if fail else df), {}
+
+
+class HasNoX(_CheckBenchmark):
+    check = staticmethod(ck.has_no_x)
+
+    def prepare(self, df, dtype, fail):
+        sentinel = df.iloc[-1, 0] if fail else df.iloc[0, 0]
+        return df.iloc[1:], {"values": [sentinel]}
+
+
+class HasNoNans(_CheckBenchmark):
+    check = staticmethod(ck.has_no_nans)
+    prepare = staticmethod(_last_is_missing)
+
+
+class HasNoNones(_CheckBenchmark):
+    check = staticmethod(ck.has_no_nones)
+    prepare = staticmethod(_last_is_missing)
+
+
+class HasNoInfs(_CheckBenchmark):
+    check = staticmethod(ck.has_no_infs)
+
+    def prepare(self, df, dtype, fail):
+        if fail and dtype != "float":
+            raise NotImplementedError("Only float columns can hold inf.")
+        return (_with_last(df, np.inf) if fail else df), {}
+
+
+class HasNoNegInfs(_CheckBenchmark):
+    check = staticmethod(ck.has_no_neg_infs)
+
+    def prepare(self, df, dtype, fail):
+        if fail and dtype != "float":
+            raise NotImplementedError("Only float columns can hold -inf.")
+        return (_with_last(df, -np.inf) if fail else df), {}
+
+
+class HasSetWithinVals(_CheckBenchmark):
+    check = staticmethod(ck.has_set_within_vals)
+
+    def prepare(self, df, dtype, fail):
+        first, last = df.iloc[0, 0], df.iloc[-1, 0]
+        items = {col: [first, last] for col in df}
+        if fail:
+            df = df[df.iloc[:, 0] != last]
+        return df, {"items": items}
+
+
+class HasUniqueIndex(_CheckBenchmark):
+    check = staticmethod(ck.has_unique_index)
+
+    def prepare(self, df, dtype, fail):
+        index = df.iloc[:, 0]
+        if dtype == "categorical" and not fail:
+            raise NotImplementedError("Categorical columns repeat their categories.")
+        if fail:
+            index = index.copy()
+            index.iloc[-1] = index.iloc[0]
+        return df.set_axis(pd.Index(index), axis=0), {}
+
+
+class IsMonotonic(_CheckBenchmark):
+    check = staticmethod(ck.is_monotonic)
+
+    def prepare(self, df, dtype, fail):
+        strict = dtype != "categorical"
+        if fail:
+            df = _with_last(df, df.iloc[0, 0])
+        return df, {"items": {col: (True, strict) for col in df}}
+
+
+class IsShape(_CheckBenchmark):
+    check = staticmethod(ck.is_shape)
+
+    def prepare(self, df, dtype, fail):
+        return df, {"shape": (df.shape[0] + fail, df.shape[1])}
+
+
+class Unique(_CheckBenchmark):
+    check = staticmethod(ck.unique)
+
+    def prepare(self, df, dtype, fail):
+        if dtype == "categorical" and not fail:
+            raise NotImplementedError("Categorical columns repeat their categories.")
+        return (_with_last(df, df.iloc[0, 0]) if fail else df), {}
+
+
+class HasUniqueKey(_CheckBenchmark):
+    check = staticmethod(ck.has_unique_key)
+
+    def prepare(self, df, dtype, fail):
+        if dtype == "categorical" and not fail:
+            raise NotImplementedError("Categorical columns repeat their categories.")
+        if fail:
+            df = df.copy()
+            df.iloc[-1] = df.iloc[0]
+        return df, {"columns": list(df.columns)}
+
+
+class HasValsWithinSet(_CheckBenchmark):
+    check = staticmethod(ck.has_vals_within_set)
+
+    def prepare(self, df, dtype, fail):
+        values = df.iloc[:, 0].unique().tolist()
+        if fail:
+            values = values[:-1]
+        return df, {"items": {col: values for col in df}}
+
+
+class HasValsWithinRange(_CheckBenchmark):
+    check = staticmethod(ck.has_vals_within_range)
+
+    def prepare(self, df, dtype, fail):
+        if fail and dtype == "categorical":
+            upper = df.iloc[:, 0].cat.categories[-2]
+        else:
+            upper = df.iloc[-2 if fail else -1, 0]
+        return df, {"items": {col: (df.iloc[0, 0], upper) for col in df}}
+
+
+class HasValsWithinNStd(_CheckBenchmark):
+    check = staticmethod(ck.has_vals_within_n_std)
+    dtypes = NUMERIC
+
+    def prepare(self, df, dtype, fail):
+        return (_with_last(df, 100 * len(df)) if fail else df), {}
+
+
+class HasDtypes(_CheckBenchmark):
+    check = staticmethod(ck.has_dtypes)
+
+    def prepare(self, df, dtype, fail):
+        items = dict(df.dtypes)
+        if fail:
+            items[df.columns[-1]] = "bool"
+        return df, {"items": items}
+
+
+class HasSchema(_CheckBenchmark):
+    check = staticmethod(ck.has_schema)
+    dtypes = ["float", "int", "nullable", "object", "datetime"]
+    schema_dtypes = {"float": "float", "int": "int", "nullable": "int",
+                     "object": "object", "datetime": "datetime"}
+
+    def prepare(self, df, dtype, fail):
+        schema = {col: self.schema_dtypes[dtype] for col in df}
+        if fail:
+            schema[df.columns[-1]] = "bool"
+        return df, {"schema": schema}
+
+
+class HasColumns(_CheckBenchmark):
+    check = staticmethod(ck.has_columns)
+
+    def prepare(self, df, dtype, fail):
+        columns = list(df.columns) + (["missing"] if fail else [])
+        return df, {"columns": columns, "exact_cols": True, "exact_order": True}
+
+
+class OneToMany(_CheckBenchmark):
+    check = staticmethod(ck.one_to_many)
+    # Checks a key column against a unit column of int buckets.
+    params = (ROWS, [2], DTYPES, CASES)
+
+    def prepare(self, df, dtype, fail):
+        if dtype == "categorical":
+            raise NotImplementedError("Categorical columns repeat their categories.")
+        many = df.iloc[:, 0]
+        if fail:
+            many = many.copy()
+            many.iloc[-1] = many.iloc[0]
+        df = pd.DataFrame({"many": many, "unit": np.arange(len(df)) // 100})
+        return df, {"unitcol": "unit", "manycol": "many"}
+
+
+class IsSameAs(_CheckBenchmark):
+    check = staticmethod(ck.is_same_as)
+
+    def prepare(self, df, dtype, fail):
+        other = _with_last(df, df.iloc[0, 0]) if fail else df.copy()
+        return df, {"df_to_compare": other}
+
+
+def _first_column_has_no_nans(df):
+    assert df.iloc[:, 0].notna().all()
+
+
+class CustomCheck(_CheckBenchmark):
+    check = staticmethod(ck.custom_check)
+
+    def prepare(self, df, dtype, fail):
+        df, _ = _last_is_missing(df, dtype, fail)
+        return df, {"check_func": _first_column_has_no_nans}
+
+
+class MultiCheck(_CheckBenchmark):
+    check = staticmethod(ck.multi_check)
+    dtypes = NUMERIC + ["datetime"]
+
+    def prepare(self, df, dtype, fail):
+        lower, upper = df.iloc[0, 0], df.iloc[-1, 0]
+        checks = {ck.has_no_nans: {},
+                  ck.unique: {},
+                  ck.is_monotonic: {"items": {col: (True, True) for col in df}},
+                  ck.has_vals_within_range: {"items": {col: (lower, upper) for col in df}}}
+        return _last_is_missing(df, dtype, fail)[0], {"checks": checks}
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Test data and the base class shared by the benchmarks.
+
+Every benchmark is parametrised over row counts, column counts, dtypes and
+whether the check passes or fails. Failing cases break the *last* row,
+so checks that stop at their first violation still scan the whole frame.
+
+Combinations with more than ``BULWARK_BENCH_MAX_CELLS`` cells (default 1e7) are skipped,
+as are those that don't apply to a check or that it doesn't support (it raises a
+TypeError or ValueError), by raising NotImplementedError in ``setup`` as asv expects.
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+ROWS = [10 ** 3, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]
+COLUMNS = [1, 10]
+DTYPES = ["float", "int", "nullable", "categorical", "object", "datetime"]
+CASES = ["pass", "fail"]
+
+MAX_CELLS = int(float(os.environ.get("BULWARK_BENCH_MAX_CELLS", 1e7)))
+
+# Number of categories of categorical columns.
+N_CATEGORIES = 100
+
+
+@functools.lru_cache(maxsize=4)
+def make_column(rows, dtype):
+    """Sorted column of `rows` values of `dtype`, all distinct unless categorical."""
+    base = np.arange(rows)
+    if dtype == "float":
+        return pd.Series(base, dtype=np.float64)
+    if dtype == "int":
+        return pd.Series(base, dtype=np.int64)
+    if dtype == "nullable":
+        return pd.Series(base, dtype="Int64")
+    if dtype == "categorical":
+        categories = ["c{:03d}".format(i) for i in range(N_CATEGORIES)]
+        codes = base * N_CATEGORIES // rows
+        return pd.Series(pd.Categorical.from_codes(codes, categories, ordered=True))
+    if dtype == "object":
+        return pd.Series(np.char.add("k", np.char.zfill(base.astype(str), 10)), dtype=object)
+    if dtype == "datetime":
+        return pd.Series(pd.date_range("2000-01-01", periods=rows, freq="s"))
+    raise ValueError("Unknown dtype {!r}".format(dtype))
+
+
+def make_frame(rows, columns, dtype):
+    """pd.DataFrame of `columns` copies of `make_column(rows, dtype)`, named c0, c1, ..."""
+    if rows * columns > MAX_CELLS:
+        raise NotImplementedError("More than {} cells; raise BULWARK_BENCH_MAX_CELLS to run."
+                                  .format(MAX_CELLS))
+    col = make_column(rows, dtype)
+    return pd.DataFrame({"c{}".format(j): col.copy() for j in range(columns)})
+
+
+def missing_value(dtype):
+    """Missing value of `dtype`, or NotImplementedError if it can't hold one."""
+    if dtype == "int":
+        raise NotImplementedError("int columns can't hold missing values.")
+    return {"float": np.nan, "nullable": pd.NA, "categorical": np.nan,
+            "object": None, "datetime": pd.NaT}[dtype]
+
+
+class _CheckBenchmark(object):
+    """Times, and measures the peak memory of, ``check(df, **kwargs)``.
+
+    Subclasses set ``check`` and override `prepare` to build the checked frame and
+    the check's arguments for a pass or fail case.
+    """
+
+    params = (ROWS, COLUMNS, DTYPES, CASES)
+    param_names = ["rows", "columns", "dtype", "case"]
+    dtypes = DTYPES
+
+    def setup(self, rows, columns, dtype, case):
+        if dtype not in self.dtypes:
+            raise NotImplementedError("{} doesn't apply to {} columns."
+                                      .format(type(self).__name__, dtype))
+        df = make_frame(rows, columns, dtype)
+        self.df, self.kwargs = self.prepare(df, dtype, case == "fail")
+        try:
+            # A few rows, including the broken last one, to find unsupported dtypes cheaply.
+            self.check(self.df.iloc[[0, 1, -1]], **self.kwargs)
+        except AssertionError:
+            pass
+        except (TypeError, ValueError) as e:
+            raise NotImplementedError("{} doesn't support {} columns: {}"
+                                      .format(type(self).__name__, dtype, e))
+
+    def prepare(self, df, dtype, fail):
+        """Returns the frame to check and the check's keyword arguments."""
+        raise NotImplementedError
+
+    def run(self):
+        try:
+            self.check(self.df, **self.kwargs)
+        except AssertionError:
+            pass
+
+    def time_check(self, rows, columns, dtype, case):
+        self.run()
+
+    def peakmem_check(self, rows, columns, dtype, case):
+        self.run()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Small runner for the benchmarks, for machines without asv.
+
+Runs every benchmark up to ``--max-rows`` rows, recording the best time
+and the peak memory allocated (as traced by `tracemalloc`) of each combination
+of parameters, and optionally compares them against a saved baseline::
+
+    python -m benchmarks.run --compare benchmarks/baseline.json
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --bench IsMonotonic --update benchmarks/baseline.json
+
+Timings depend on the machine, so only compare against a baseline saved on the
+same machine (the shipped one records where it was measured).
+Changes to the performance of checks, or to the parameters of benchmarks, update the
+shipped baseline with their new numbers; `--compare` fails on results it has none for.
+The full suite, including peak resident memory, runs with asv::
+
+    asv run
+"""
+import argparse
+import itertools
+import json
+import platform
+import re
+import sys
+import timeit
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import bench_cache, bench_checks
+from .common import _CheckBenchmark
+
+
+def benchmarks(pattern=None):
+    """Benchmark classes of `bench_checks` and `bench_cache` whose names match `pattern`."""
+    classes = dict(vars(bench_checks), **vars(bench_cache))
+    for name, cls in sorted(classes.items()):
+        if (isinstance(cls, type) and issubclass(cls, _CheckBenchmark) and
+                not name.startswith("_") and re.search(pattern or "", name)):
+            yield name, cls
+
+
+def measure(bench, repeat):
+    """Best time per run, in seconds, and peak traced memory, in bytes, of `bench.run`."""
+    # Like timeit's autorange, but aiming at runs of ~20ms to keep the suite quick.
+    number = 1
+    while timeit.timeit(bench.run, number=number) < .02 and number < 10 ** 4:
+        number *= 10
+    best = min(timeit.repeat(bench.run, number=number, repeat=repeat)) / number
+
+    tracemalloc.start()
+    try:
+        bench.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(pattern=None, max_rows=10 ** 5, repeat=3):
+    """Runs the benchmarks, returning {"Class(params)": {"time": s, "peakmem": bytes}}."""
+    results = {}
+    for name, cls in benchmarks(pattern):
+        for params in itertools.product(*cls.params):
+            if params[0] > max_rows:
+                continue
+            bench = cls()
+            try:
+                bench.setup(*params)
+            except NotImplementedError:
+                continue
+            time, peak = measure(bench, repeat)
+            results["{}{!r}".format(name, params)] = {"time": time, "peakmem": peak}
+    return results
+
+
+def compare(results, baseline, factor):
+    """Names of the results slower than `factor` times their baseline, with their ratios."""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        # Ignore sub-10µs timings, which are mostly noise.
+        if before is not None and result["time"] > max(factor * before["time"], 1e-5):
+            regressions.append((key, result["time"] / before["time"]))
+    return regressions
+
+
+def missing(results, baseline):
+    """Names of the results that have no baseline to compare against."""
+    return [key for key in results if key not in baseline]
+
+
+def _save(path, results):
+    machine = {"python": platform.python_version(), "numpy": np.__version__,
+               "pandas": pd.__version__, "machine": platform.machine(),
+               "processor": platform.processor()}
+    with open(path, "w") as f:
+        json.dump({"machine": machine, "results": results}, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--bench", help="Only run benchmarks whose class name matches.")
+    parser.add_argument("--max-rows", type=float, default=1e5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Save the results to this JSON file.")
+    parser.add_argument("--update", help="Replace or add the results in this JSON file, "
+                                         "keeping those of the benchmarks not run.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results to.")
+    parser.add_argument("--factor", type=float, default=2.,
+                        help="Slowdown that counts as a regression.")
+    args = parser.parse_args(argv)
+    # Deprecation and future warnings from pandas would drown the results.
+    warnings.simplefilter("ignore")
+
+    results = run(args.bench, args.max_rows, args.repeat)
+    for key, result in results.items():
+        print("{:<70} {:>12.1f}us {:>12,d}B".format(key, 1e6 * result["time"], result["peakmem"]))
+
+    if args.save:
+        _save(args.save, results)
+    if args.update:
+        with open(args.update) as f:
+            saved = json.load(f)["results"]
+        saved.update(results)
+        _save(args.update, saved)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.factor)
+        for key, ratio in regressions:
+            print("REGRESSION {} is {:.1f}x slower".format(key, ratio))
+        unmeasured = missing(results, baseline)
+        for key in unmeasured:
+            print("MISSING {} has no baseline".format(key))
+        return 1 if regressions or unmeasured else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Arrow-native execution of checks with `pyarrow.compute` kernels.
+
+Frames whose columns are backed by Arrow memory (``pd.ArrowDtype``, ``"string[pyarrow]"``)
+or that arrive as a `pyarrow.Table` would otherwise be converted to numpy, or to Python
+objects for strings, by every check. `ArrowBackend` instead decides the checks it knows
+directly on the columns' Arrow buffers:
+
+- `has_no_nans` and `has_no_nones` from null counts (and NaNs of float columns),
+- `has_vals_within_range` from ``min_max``,
+- `has_vals_within_set` with ``is_in``,
+- `unique` with ``count_distinct``,
+- `is_monotonic` by comparing zero-copy slices of adjacent values, and
+- `has_schema` from the Arrow types.
+
+Kernels only prove passes (see `bulwark.generic.CheckRegistry`). Failing checks, checks
+of numpy-backed columns and any other check are run on the pandas frame, of which a
+`pyarrow.Table` only converts the columns the check references.
+
+pyarrow is an optional dependency.
+"""
+import types
+
+import pandas as pd
+
+from bulwark import engine
+from bulwark.generic import CheckRegistry, LabeledFrame, referenced_columns
+from bulwark.kernels import MONOTONIC_OPS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Kernels take an `ArrowFrame` and return True only if the check passes.
+_KERNELS = CheckRegistry(errors=() if pa is None else (pa.ArrowException,))
+_arrow_kernel = _KERNELS.register
+
+
+def _is_arrow_backed(dtype):
+    arrow_dtype = getattr(pd, "ArrowDtype", None)  # pandas 1.5+
+    if arrow_dtype is not None and isinstance(dtype, arrow_dtype):
+        return True
+    return isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow"
+
+
+def _chunked(ser):
+    """The pa.ChunkedArray backing `ser`, without copying, or None if it isn't Arrow-backed."""
+    if not _is_arrow_backed(ser.dtype):
+        return None
+    chunked = ser.array.__arrow_array__()
+    return chunked if isinstance(chunked, pa.ChunkedArray) else pa.chunked_array([chunked])
+
+
+# Checks that look at every column of the frame, whatever columns they name.
+_WHOLE_FRAME = {"has_columns", "is_shape"}
+
+
+class ArrowFrame(LabeledFrame):
+    """Arrow columns of a pd.DataFrame or pa.Table, looked up once each.
+
+    Args:
+        data (pd.DataFrame or pa.Table): The checked data.
+
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.is_table = isinstance(data, pa.Table)
+        self._columns = {}
+
+    @property
+    def labels(self):
+        return list(self.data.column_names if self.is_table else self.data.columns)
+
+    def __len__(self):
+        return self.data.num_rows if self.is_table else len(self.data)
+
+    def __getitem__(self, col):
+        """The pa.ChunkedArray of `col`, or None if it isn't a single Arrow-backed column."""
+        try:
+            return self._columns[col]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable label
+            return None
+
+        chunked = None
+        if self.is_table:
+            if self.data.column_names.count(col) == 1:
+                chunked = self.data.column(col)
+        else:
+            try:
+                ser = self.data[col]
+            except (KeyError, TypeError, ValueError):
+                ser = None
+            if isinstance(ser, pd.Series):
+                chunked = _chunked(ser)
+        self._columns[col] = chunked
+        return chunked
+
+    def to_pandas(self, func, params):
+        """The data as a pd.DataFrame, only converting the columns `func` looks at."""
+        if not self.is_table:
+            return self.data
+        if (getattr(func, "__module__", None) != "bulwark.checks" or
+                getattr(func, "__name__", None) in _WHOLE_FRAME):
+            return self.data.to_pandas()
+        columns = referenced_columns(types.SimpleNamespace(columns=self.labels), params)
+        return self.data.select(columns).to_pandas()
+
+
+def _all(mask):
+    """Whether a boolean Arrow array is True everywhere it isn't null."""
+    return pc.all(mask, skip_nulls=True, min_count=0).as_py() is True
+
+
+def _has_nans(chunked):
+    return pa.types.is_floating(chunked.type) and pc.any(pc.is_nan(chunked)).as_py() is True
+
+
+@_arrow_kernel("has_no_nans", "has_no_nones")
+def _no_nulls(frame, columns=None):
+    columns = frame.columns(columns)
+    if columns is None:
+        return False
+    for col in columns:
+        chunked = frame[col]
+        if chunked is None or chunked.null_count or _has_nans(chunked):
+            return False
+    return True
+
+
+def _less_equal(left, right, arrow_type):
+    """`left <= right`, comparing temporal values as Arrow scalars so no precision is lost."""
+    if pa.types.is_temporal(arrow_type):
+        if not isinstance(left, pa.Scalar):
+            left = pa.scalar(left, type=arrow_type)
+        if not isinstance(right, pa.Scalar):
+            right = pa.scalar(right, type=arrow_type)
+        return pc.less_equal(left, right).as_py() is True
+    left = left.as_py() if isinstance(left, pa.Scalar) else left
+    right = right.as_py() if isinstance(right, pa.Scalar) else right
+    return bool(left <= right)
+
+
+@_arrow_kernel("has_vals_within_range")
+def _within_range(frame, items=None):
+    for col, (lower, upper) in items.items():
+        chunked = frame[col]
+        if chunked is None:
+            return False
+        extremes = pc.min_max(chunked)
+        # Nulls, and NaNs, are never outside the range.
+        if not extremes["min"].is_valid:
+            continue
+        if not (_less_equal(lower, extremes["min"], chunked.type) and
+                _less_equal(extremes["max"], upper, chunked.type)):
+            return False
+    return True
+
+
+@_arrow_kernel("has_vals_within_set")
+def _within_set(frame, items=None):
+    for col, values in items.items():
+        chunked = frame[col]
+        if chunked is None:
+            return False
+        value_set = pa.array(list(values), type=chunked.type)
+        if not _all(pc.is_in(chunked, value_set=value_set, skip_nulls=False)):
+            return False
+    return True
+
+
+@_arrow_kernel("unique")
+def _unique(frame, columns=None, approx=False):
+    if approx:  # count_distinct hashes whole columns
+        return False
+    columns = frame.columns(columns)
+    if columns is None:
+        return False
+    for col in columns:
+        chunked = frame[col]
+        if chunked is None or _has_nans(chunked):
+            return False
+        if pa.types.is_floating(chunked.type):
+            # -0.0 equals 0.0, but count_distinct tells them apart.
+            chunked = pc.add(chunked, pa.scalar(0, chunked.type))
+        if pc.count_distinct(chunked, mode="all").as_py() != len(chunked):
+            return False
+    return True
+
+
+def _is_comparable(arrow_type):
+    return (pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or
+            pa.types.is_decimal(arrow_type) or pa.types.is_temporal(arrow_type))
+
+
+@_arrow_kernel("is_monotonic")
+def _monotonic(frame, items=None, increasing=None, strict=False):
+    if items is None:
+        items = {col: (increasing, strict) for col in frame.labels}
+
+    for col, (increasing, strict) in items.items():
+        chunked = frame[col]
+        # The check takes `diff()`s, which skip pairs with a null (or NaN) in them.
+        if chunked is None or not _is_comparable(chunked.type) or chunked.null_count or \
+                _has_nans(chunked):
+            return False
+        if len(chunked) < 2:
+            continue
+        following, preceding = chunked.slice(1), chunked.slice(0, len(chunked) - 1)
+        # Arrow's comparison kernels are named after the numpy ufuncs.
+        if not any(_all(getattr(pc, op.__name__)(following, preceding))
+                   for op in MONOTONIC_OPS[(increasing, strict)]):
+            return False
+    return True
+
+
+def _is_timestamp_ns(arrow_type):
+    return pa.types.is_timestamp(arrow_type) and arrow_type.unit == "ns"
+
+
+# Arrow types matching each dtype accepted by `bulwark.generic.series_dtype_check`,
+# as pandas reports them for Arrow-backed columns.
+_SCHEMA_TYPES = {
+    "bool": lambda t: pa.types.is_boolean(t),
+    "string": lambda t: pa.types.is_string(t) or pa.types.is_large_string(t),
+    "numeric": lambda t: (pa.types.is_integer(t) or pa.types.is_floating(t) or
+                          pa.types.is_boolean(t)),
+    "float": lambda t: pa.types.is_floating(t),
+    "int": lambda t: pa.types.is_integer(t),
+    "int64": lambda t: t == pa.int64(),
+    "sint": lambda t: pa.types.is_signed_integer(t),
+    "uint": lambda t: pa.types.is_unsigned_integer(t),
+    "datetime": lambda t: pa.types.is_timestamp(t),
+    "datetime64": lambda t: pa.types.is_timestamp(t) and t.tz is None,
+    "datetime64_ns": lambda t: _is_timestamp_ns(t) and t.tz is None,
+    "datetime64tz": lambda t: pa.types.is_timestamp(t) and t.tz is not None,
+    "timedelta64": lambda t: pa.types.is_duration(t),
+    "timedelta64_ns": lambda t: pa.types.is_duration(t) and t.unit == "ns",
+}
+for _alias in ["signed_int", "signed-int", "signed int", "signedint"]:
+    _SCHEMA_TYPES[_alias] = _SCHEMA_TYPES["sint"]
+for _alias in ["unsigned_int", "unsigned-int", "unsigned int", "unsignedint"]:
+    _SCHEMA_TYPES[_alias] = _SCHEMA_TYPES["uint"]
+
+
+@_arrow_kernel("has_schema")
+def _schema(frame, schema=None):
+    if not frame.is_table:  # dtypes of pd.DataFrames are checked without touching data
+        return False
+    for col, dtype in schema.items():
+        chunked = frame[col]
+        if chunked is None or dtype not in _SCHEMA_TYPES or \
+                not _SCHEMA_TYPES[dtype](chunked.type):
+            return False
+    return True
+
+
+class ArrowBackend(object):
+    """Runs checks with `pyarrow.compute` kernels on Arrow-backed columns.
+
+    Use it as the ``backend`` of `bulwark.checks.multi_check` and of the decorators
+    (``backend="arrow"``), or call `run_checks` directly with a `pyarrow.Table`.
+
+    Raises:
+        ImportError: If pyarrow isn't installed.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pyarrow as pa
+        >>> table = pa.table({"a": [1, 2, 3], "b": ["x", "y", "x"]})
+        >>> ArrowBackend().run_checks(table, {ck.has_vals_within_set: {"items": {"b": ["x"]}}})
+        [ValidationResult('Not in set', 1    y
+        Name: b, dtype: object)]
+
+    """
+
+    def __init__(self):
+        if pa is None:
+            raise ImportError("ArrowBackend requires pyarrow.")
+
+    def run_checks(self, df, checks):
+        """Runs each check in `checks` on `df`, with Arrow kernels where possible.
+
+        Args:
+            df (pd.DataFrame or pa.Table): The data to check.
+            checks (dict): Mapping of check functions to parameters for those check functions.
+
+        Returns:
+            List of the AssertionErrors raised by failing checks, in the order of `checks`.
+
+        """
+        frame = ArrowFrame(df)
+        errors = []
+        for func, params in checks.items():
+            if _KERNELS.attempt(func, params, frame, default=False):
+                continue
+            errors.extend(engine.run_checks(frame.to_pandas(func, params), {func: params}))
+        return errors
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of checks that already passed on unchanged data.
+
+Reference frames (lookup tables, dimensions, ...) often go through the same
+decorated functions again and again. With a `ValidationCache`, a check that has
+passed on a frame is skipped the next time it sees the same data, at the cost of
+fingerprinting the columns the check looks at.
+
+Fingerprinting hashes every value, so it only pays off for checks that cost more than
+that: custom checks, and those of `bulwark.checks` in `CACHED_CHECKS`, which build hash
+tables of their columns. Every other check of `bulwark.checks` reads its columns once,
+or only their dtypes, and is faster than their fingerprint (up to 50 times for
+`has_no_nans`), so decorators always run it. ``benchmarks/bench_cache.py`` times cache
+hits against the checks themselves.
+
+A fingerprint covers each column's label, dtype and length, and a hash of all of its
+values (and of the index), so equal data has equal fingerprints whichever frame holds
+it, and any change to the data changes them.
+
+Hashing only a fixed sample of values per column (``sample_size``) is much cheaper, but
+is opt-in because it isn't sound: *any* frame, new or mutated in place, that matches a
+passing one at the sampled rows is taken for it, and its checks are skipped even if
+unsampled rows would fail them. Only sample when frames that reach the cache are known
+to either equal an earlier one or differ at the sampled rows.
+"""
+import collections
+import hashlib
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bulwark.generic import referenced_columns
+
+# Checks of `bulwark.checks` that cost more than fingerprinting the columns they look at.
+CACHED_CHECKS = frozenset(["unique", "has_unique_index", "unique_index", "has_unique_key",
+                           "one_to_many"])
+
+
+def _positions(n, sample_size):
+    if sample_size is None or n <= sample_size:
+        return None
+    return np.unique(np.linspace(0, n - 1, sample_size).astype(np.intp))
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _hash_values(obj, positions):
+    """Hash of `obj`'s values at `positions`, or of all of them if `positions` is None."""
+    if isinstance(obj, pd.RangeIndex):
+        return repr(obj)
+    if positions is not None:
+        obj = obj.take(positions)
+
+    dtype = obj.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return _digest(np.ascontiguousarray(obj.to_numpy()).tobytes())
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = obj.cat.codes if isinstance(obj, pd.Series) else obj.codes
+        return _digest(np.asarray(codes).tobytes()) + _hash_values(dtype.categories, None)
+    # Nullable and Arrow-backed numbers, as their values (with NAs zeroed) and NA mask.
+    numpy_dtype = getattr(dtype, "numpy_dtype", None)
+    if isinstance(numpy_dtype, np.dtype) and numpy_dtype.kind in "biuf":
+        values = obj.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0))
+        return _digest(values.tobytes() + np.asarray(obj.isna()).tobytes())
+
+    try:
+        if dtype == object:
+            # Python objects cache their hash, e.g. strings, which makes `hash` much faster
+            # than pandas' hashing of their contents. Like those, it's only stable within
+            # a process, equal numbers of different types (1 and 1.0) hash alike, and
+            # distinct NaN objects don't, which only costs a cache miss.
+            values = obj.to_numpy()
+            hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values))
+            return _digest(hashes.tobytes())
+        if isinstance(obj, pd.Index):
+            hashes = pd.util.hash_pandas_object(obj)
+        else:
+            hashes = pd.util.hash_pandas_object(obj, index=False)
+    except TypeError:  # unhashable values, e.g. lists
+        return repr(obj.tolist())
+    return _digest(hashes.to_numpy().tobytes())
+
+
+def fingerprint(df, columns=None, sample_size=None):
+    """Fingerprint of `df`'s index and `columns`.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): Labels of the columns to fingerprint. Default is all of them.
+        sample_size (int): Number of evenly spaced values hashed per column, which
+                           makes different frames collide, see `bulwark.cache`.
+                           Default hashes all of them.
+
+    Returns:
+        Tuple describing ``df``'s shape, labels, and the index and columns' contents.
+
+    """
+    columns = df.columns if columns is None else columns
+    positions = _positions(len(df), sample_size)
+    parts = [df.shape, tuple(df.columns),
+             (str(df.index.dtype), _hash_values(df.index, positions))]
+    for col in columns:
+        ser = df[col]
+        if isinstance(ser, pd.DataFrame):  # duplicated labels
+            parts.append(fingerprint(ser, sample_size=sample_size))
+            continue
+        parts.append((col, str(ser.dtype), _hash_values(ser, positions)))
+    return tuple(parts)
+
+
+def _freeze(value, sample_size):
+    """A repr of `value` in which pandas and numpy objects are replaced by fingerprints."""
+    if isinstance(value, pd.DataFrame):
+        return repr(fingerprint(value, sample_size=sample_size))
+    if isinstance(value, (pd.Series, pd.Index)):
+        return repr(fingerprint(value.to_frame(), sample_size=sample_size))
+    if isinstance(value, np.ndarray):
+        return repr((value.dtype.str, value.shape,
+                     _digest(np.ascontiguousarray(value).tobytes())))
+    if isinstance(value, dict):
+        return "{" + ", ".join("{!r}: {}".format(k, _freeze(v, sample_size))
+                               for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_freeze(v, sample_size) for v in value) + "]"
+    return repr(value)
+
+
+class ValidationCache(object):
+    """LRU cache of (check, params, fingerprint) keys of checks that passed.
+
+    Keys are digests of a few dozen bytes, so memory use is bounded by ``max_entries``
+    and ``max_bytes`` regardless of the size of the frames.
+
+    Args:
+        max_entries (int): Maximum number of passing checks to remember.
+        max_bytes (int): Maximum memory used by the remembered keys.
+        sample_size (int): Number of values hashed per column, see `fingerprint`.
+                           Default hashes all of them; sampling is unsound.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> cache = ValidationCache()
+        >>> df = pd.DataFrame({"a": [1, 2]})
+        >>> key = cache.key(df, ck.unique, {"columns": ["a"]})
+        >>> key in cache
+        False
+        >>> cache.add(key)
+        >>> key in cache
+        True
+
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=1 << 20, sample_size=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sample_size = sample_size
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Whether `key` is cached, counting a hit or miss and refreshing its recency."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def caches(self, check_func):
+        """Whether passes of `check_func` are worth caching, see `CACHED_CHECKS`."""
+        if getattr(check_func, "__module__", None) != "bulwark.checks":
+            return True
+        return getattr(check_func, "__name__", None) in CACHED_CHECKS
+
+    def key(self, df, check_func, params):
+        """Key of running `check_func` with `params` on `df`.
+
+        Checks from `bulwark.checks` only fingerprint the columns they reference;
+        any other check fingerprints all of ``df``.
+        """
+        if getattr(check_func, "__module__", None) == "bulwark.checks":
+            columns = referenced_columns(df, params)
+        else:
+            columns = None
+        name = "{}.{}".format(getattr(check_func, "__module__", None),
+                              getattr(check_func, "__qualname__", check_func))
+        data = repr((name, id(check_func), _freeze(params, self.sample_size),
+                     fingerprint(df, columns, self.sample_size)))
+        return hashlib.blake2b(data.encode(), digest_size=16).digest()
+
+    def add(self, key):
+        """Remembers that the check of `key` passed, evicting the least recently used keys."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            size = sys.getsizeof(key)
+            self._entries[key] = size
+            self.nbytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     self.nbytes > self.max_bytes):
+                self.nbytes -= self._entries.popitem(last=False)[1]
+
+    def clear(self):
+        """Forgets every cached key."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Cache shared by the decorators created with ``cache=True``.
+DEFAULT_CACHE = ValidationCache()
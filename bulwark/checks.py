@@ -7,15 +7,23 @@ Each function in this module should:
 - return the original, unaltered pd.DataFrame
 
 """
-import operator
 import warnings
 
 import numpy as np
 import pandas as pd
 import pandas.testing as tm
 
-from bulwark.generic import bad_locations
-from bulwark.generic import series_dtype_check
+from bulwark import engine
+from bulwark.arrow import ArrowBackend
+from bulwark.generic import MAX_BAD_LOCATIONS, RunningMoments, bad_locations, column_list
+from bulwark.generic import column_locations
+from bulwark.generic import float_blocks, numeric_columns, series_dtype_check
+from bulwark.kernels import MONOTONIC_OPS, block_extremes, missing_values
+from bulwark.kernels import monotonic_violations, outside_set, range_mask, x_mask
+from bulwark.parallel import default_backend, map_columns
+from bulwark.polars import PolarsBackend
+from bulwark.results import MAX_SAMPLES, ValidationReport, ValidationResult
+from bulwark.sketch import duplicated_rows, duplicated_values, row_hashes
 
 # Required for DeprecationWarnings to not be ignored
 warnings.simplefilter('always', DeprecationWarning)
@@ -71,6 +79,10 @@ def has_columns(df, columns, exact_cols=False, exact_order=False):
 def has_no_x(df, values=None, columns=None):
     """Asserts that there are no user-specified `values` in `df`'s `columns`.
 
+    NaN, None, inf and -inf are looked for with dtype-specific kernels,
+    skipping columns whose dtype can't hold them. Missing values of nullable dtypes
+    (e.g. "Int64") and of categoricals count as NaN, and not as None.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         values (list): A list of values to check for in the pd.DataFrame.
@@ -82,14 +94,24 @@ def has_no_x(df, values=None, columns=None):
     """
     values = values if values is not None else []
     columns = columns if columns is not None else df.columns
+    if not pd.api.types.is_list_like(columns):
+        columns = [columns]
 
-    try:
-        assert not df[columns].isin(values).values.any()
-    except AssertionError as e:
-        missing = df[columns].isin(values)
-        msg = bad_locations(missing)
-        e.args = msg
-        raise
+    bad_cols, masks = [], []
+    for col in columns:
+        subset = df[col]
+        for ser in ([subset] if isinstance(subset, pd.Series) else
+                    (subset.iloc[:, j] for j in range(subset.shape[1]))):
+            mask = x_mask(ser, values)
+            if mask is not None:
+                bad_cols.append(col)
+                masks.append(mask)
+
+    if masks:
+        missing = pd.DataFrame(np.column_stack(masks), index=df.index, columns=bad_cols)
+        locations = bad_locations(missing)
+        raise ValidationResult("has_no_x", bad_cols[0] if len(bad_cols) == 1 else None,
+                               len(locations), locations.rows, render=lambda: (locations,))
     return df
 
 
@@ -180,6 +202,11 @@ def has_set_within_vals(df, items):
     Returns:
         Original `df`.
 
+    Notes:
+        Columns are scanned from their first rows in growing blocks, stopping as soon as
+        all their values are found, and categorical columns through their codes only,
+        see `bulwark.kernels.missing_values`.
+
     Examples:
         The following check will pass, since df['a'] contains each of 1 and 2:
 
@@ -204,7 +231,7 @@ def has_set_within_vals(df, items):
     bad_cols_vals = {}
 
     for col, vals in items.items():
-        missing_vals = np.setdiff1d(vals, df[col].unique(), assume_unique=True).tolist()
+        missing_vals = missing_values(df[col], vals)
         if missing_vals:
             bad_cols_vals.update({col: missing_vals})
 
@@ -225,16 +252,27 @@ def unique_index(df):
     return has_unique_index(df)
 
 
-def has_unique_index(df):
+def has_unique_index(df, approx=False, fp_rate=0.01, max_bytes=None):
     """Asserts that `df`'s index is unique.
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
+        approx (bool): Whether to find duplicates in bounded memory with a Bloom filter,
+                       for indexes too large to hash exactly, see `bulwark.sketch`.
+                       The result is still exact.
+        fp_rate (float): False-positive rate of the Bloom filter, if `approx`.
+        max_bytes (int): Upper bound on the size of the Bloom filter, if `approx`.
 
     Returns:
         Original `df`.
 
     """
+    if approx:
+        duplicated = duplicated_values(df.index, fp_rate, max_bytes)
+        if len(duplicated):
+            raise AssertionError(*duplicated)
+        return df
+
     try:
         assert df.index.is_unique
     except AssertionError as e:
@@ -244,7 +282,8 @@ def has_unique_index(df):
     return df
 
 
-def is_monotonic(df, items=None, increasing=None, strict=False):
+def is_monotonic(df, items=None, increasing=None, strict=False, n_jobs=None,
+                 fail_fast=False):
     """Asserts that the `df` is monotonic.
 
     Args:
@@ -254,10 +293,21 @@ def is_monotonic(df, items=None, increasing=None, strict=False):
         increasing (bool, None): None checks for either increasing or decreasing monotonicity.
         strict (bool): Whether the comparison should be strict,
                        meaning two values in a row being equal should fail.
+        n_jobs (int or Executor): Number of threads to spread columns over;
+                                  -1 uses one per CPU. Default runs in the calling thread.
+        fail_fast (bool): Whether to stop at the first violation, and only report it.
+                          Default reports every violation of each failing column.
 
     Returns:
         Original `df`.
 
+    Notes:
+        Numbers, booleans, datetimes and timedeltas, including nullable ones, are checked
+        by comparing adjacent values block by block, skipping pairs with a missing value.
+        Other dtypes are checked through their ``diff()``.
+        Each reported violation is the row that breaks monotonicity with the previous one;
+        with ``increasing=None``, those of the direction the column breaks least.
+
     Examples:
         The following check will pass, since each column matches its monotonicity requirements:
 
@@ -303,31 +353,20 @@ def is_monotonic(df, items=None, increasing=None, strict=False):
     if items is None:
         items = {col: (increasing, strict) for col in df}
 
-    operator_choices = {
-        # key = (increasing, strict)
-        (True, True): operator.gt,
-        (False, True): operator.lt,
-        (True, False): operator.ge,
-        (False, False): operator.le,
-        (None, True): (operator.gt, operator.lt),
-        (None, False): (operator.ge, operator.le),
-    }
-
-    bad = pd.DataFrame()
-    for col, (increasing, strict) in items.items():
-        ser_diff = df[col].diff().dropna()
-        op = operator_choices[(increasing, strict)]
-
-        if increasing is None:
-            ser_diff_incr = op[0](ser_diff, 0)
-            ser_diff_dec = op[1](ser_diff, 0)
-            if not ser_diff_incr.all() | ser_diff_dec.all():
-                bad[ser_diff.name] = ~ser_diff_incr | ~ser_diff_dec
-        else:
-            bad[ser_diff.name] = ~op(ser_diff, 0)
+    def violations(item):
+        col, (increasing, strict) = item
+        return monotonic_violations(df[col], MONOTONIC_OPS[(increasing, strict)], fail_fast)
 
-    if np.any(bad):
-        msg = bad_locations(bad)
+    failing, positions = [], []
+    for col, hits in zip(items, map_columns(violations, items.items(), n_jobs)):
+        if hits.size:
+            failing.append(col)
+            positions.append(hits)
+            if fail_fast:
+                break
+
+    if failing:
+        msg = column_locations(df.index, pd.Index(failing, tupleize_cols=False), positions)
         raise AssertionError(msg)
 
     return df
@@ -358,25 +397,82 @@ def is_shape(df, shape):
     return df
 
 
-def unique(df, columns=None):
+def unique(df, columns=None, n_jobs=None, approx=False, fp_rate=0.01, max_bytes=None):
     """Asserts that columns in `df` only have unique values.
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         columns (list): A subset of columns to check for uniqueness of row values.
+        n_jobs (int or Executor): Number of threads to spread columns over;
+                                  -1 uses one per CPU. Default runs in the calling thread.
+        approx (bool): Whether to find duplicates in bounded memory with a Bloom filter,
+                       for columns too large to hash exactly, see `bulwark.sketch`.
+                       The result is still exact.
+        fp_rate (float): False-positive rate of the Bloom filter, if `approx`.
+        max_bytes (int): Upper bound on the size of the Bloom filter, if `approx`.
 
     Returns:
         Original `df`.
 
     """
+    def is_unique(col):
+        if approx:
+            return not len(duplicated_values(df[col], fp_rate, max_bytes))
+        return df[col].is_unique
+
     if columns is None:
         columns = df.columns
-    for col in columns:
-        if not df[col].is_unique:
+    for col, col_is_unique in zip(columns, map_columns(is_unique, columns, n_jobs)):
+        if not col_is_unique:
             raise AssertionError("Column {!r} contains non-unique values".format(col))
     return df
 
 
+def has_unique_key(df, columns, max_keys=MAX_BAD_LOCATIONS):
+    """Asserts that no two rows of `df` have the same values in all of `columns`.
+
+    Rows are hashed a block at a time into 8 bytes each, and only those sharing a hash are
+    compared exactly, see `bulwark.sketch.duplicated_rows`, so neither a MultiIndex nor
+    a tuple per row is built. NaNs in a key compare equal to each other.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (str or list): The column, or list of columns, making up the key.
+        max_keys (int): Maximum number of duplicated keys to report.
+                        None reports all of them.
+
+    Returns:
+        Original `df`.
+
+    """
+    keycols = column_list(columns)
+    positions = duplicated_rows(df, keycols)
+    if not positions.size:
+        return df
+
+    def keys(rows):
+        for row in rows.itertuples(index=False, name=None):
+            yield row[0] if len(keycols) == 1 else row
+
+    def render():
+        duplicated = df.take(positions)[keycols]
+        codes, uniques = pd.factorize(row_hashes(duplicated))
+        counts = np.bincount(codes)
+        n_shown = len(uniques) if max_keys is None else min(max_keys, len(uniques))
+        _, first = np.unique(codes, return_index=True)
+        shown = dict(zip(keys(duplicated.iloc[first[:n_shown]]),
+                         counts[:n_shown].tolist()))
+        msg = "Duplicated keys of {} with their counts: {}".format(columns, shown)
+        if len(uniques) > n_shown:
+            msg += " ... and {} more".format(len(uniques) - n_shown)
+        return (msg,)
+
+    column = keycols[0] if len(keycols) == 1 else None
+    samples = keys(df.take(positions[:MAX_SAMPLES])[keycols])
+    raise ValidationResult("has_unique_key", column, len(positions), positions,
+                           samples, render)
+
+
 def within_set(df, items=None):
     """Deprecated: replaced with has_vals_within_set"""
     warnings.warn("This function has been renamed to has_vals_within_set. "
@@ -387,22 +483,34 @@ def within_set(df, items=None):
     return has_vals_within_set(df, items)
 
 
-def has_vals_within_set(df, items=None):
+def has_vals_within_set(df, items=None, n_jobs=None):
     """Asserts that `df` is a subset of items.
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         items (dict): Mapping of columns (col) to array-like of values (v) that
                       ``df[col]`` is expected to be a subset of.
+        n_jobs (int or Executor): Number of threads to spread columns over;
+                                  -1 uses one per CPU. Default runs in the calling thread.
 
     Returns:
         Original `df`.
 
+    Notes:
+        Categorical columns are checked by looking their codes up in a table of the
+        allowed categories, and not scanned at all if every category is allowed.
+
     """
-    for col, v in items.items():
-        if not df[col].isin(v).all():
-            bad = df.loc[~df[col].isin(v), col]
-            raise AssertionError('Not in set', bad)
+    def outside(item):
+        col, v = item
+        return outside_set(df[col], v)
+
+    for col, positions in zip(items, map_columns(outside, items.items(), n_jobs)):
+        if positions is not None:
+            ser = df[col]
+            raise ValidationResult("has_vals_within_set", col, positions.size, positions,
+                                   ser.iloc[positions[:MAX_SAMPLES]].tolist(),
+                                   render=lambda: ('Not in set', ser.iloc[positions]))
     return df
 
 
@@ -416,13 +524,15 @@ def within_range(df, items=None):
     return has_vals_within_range(df, items)
 
 
-def has_vals_within_range(df, items=None):
+def has_vals_within_range(df, items=None, n_jobs=None):
     """Asserts that `df` is within a range.
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         items (dict): Mapping of columns (col) to a (low, high) tuple (v) that
                       ``df[col]`` is expected to be between.
+        n_jobs (int or Executor): Number of threads to spread columns over;
+                                  -1 uses one per CPU. Default runs in the calling thread.
 
     Returns:
         Original `df`.
@@ -445,19 +555,42 @@ def has_vals_within_range(df, items=None):
         >>> ck.has_vals_within_range(df, items= {'a': (0, 3), 'b': ('a', 'b')})
         Traceback (most recent call last):
             ...
-        AssertionError: ('Outside range', 0    False
+        bulwark.results.ValidationResult: ('Outside range', 0    False
         1    False
         2     True
         Name: b, dtype: bool)
 
     """
-    for col, (lower, upper) in items.items():
-        if (lower > df[col]).any() or (upper < df[col]).any():
-            bad = (lower > df[col]) | (upper < df[col])
-            raise AssertionError("Outside range", bad)
+    # Columns sharing a dtype are reduced together; only failing columns build a mask.
+    bounds = block_extremes(df, list(items))
+
+    def outside(item):
+        col, (lower, upper) = item
+        return range_mask(df[col], lower, upper, bounds.get(col))
+
+    for col, bad in zip(items, map_columns(outside, items.items(), n_jobs)):
+        if bad is not None:
+            raise _outside_range(df[col], bad)
     return df
 
 
+def _outside_range(ser, bad):
+    """`ValidationResult` of the values of `ser` where the mask `bad` is True."""
+    positions = np.flatnonzero(bad.to_numpy(dtype=bool, na_value=False))
+    # Only nullable masks, whose NAs can't be rebuilt from positions, are kept.
+    index, name, nullable = bad.index, bad.name, None if bad.dtype == bool else bad
+
+    def render():
+        if nullable is not None:
+            return "Outside range", nullable
+        mask = np.zeros(len(index), dtype=bool)
+        mask[positions] = True
+        return "Outside range", pd.Series(mask, index=index, name=name)
+
+    return ValidationResult("has_vals_within_range", ser.name, positions.size, positions,
+                            ser.iloc[positions[:MAX_SAMPLES]].tolist(), render=render)
+
+
 def within_n_std(df, n=3):
     """Deprecated: replaced with has_vals_within_n_std"""
     warnings.warn("This function has been renamed to has_vals_within_n_std. "
@@ -468,22 +601,74 @@ def within_n_std(df, n=3):
     return has_vals_within_n_std(df, n)
 
 
-def has_vals_within_n_std(df, n=3):
+def has_vals_within_n_std(df, n=3, columns=None, means=None, stds=None):
     """Asserts that every value is within ``n`` standard deviations of its column's mean.
 
+    Means, standard deviations and extremes of all columns are gathered in a single
+    pass over `df`, block by block; every value is within range iff both extremes are,
+    so violating cells are only located for columns that fail. Missing values are
+    never within range.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         n (int): Number of standard deviations from the mean.
+        columns (list): Columns to check. Default is every numeric column,
+                        or those of `means` if given.
+        means (dict or pd.Series): Reference mean of each column, e.g. from training data.
+        stds (dict or pd.Series): Reference standard deviation of each column.
+                                  With `means`, `df` is only scanned for its extremes,
+                                  rather than summarised first.
 
     Returns:
         Original `df`.
 
+    Raises:
+        ValueError: If only one of `means` and `stds` is given.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'a': [1., 2., 9.]})
+        >>> ck.has_vals_within_n_std(df, means={'a': 2.}, stds={'a': 1.})
+        Traceback (most recent call last):
+            ...
+        AssertionError: [(2, 'a')]
+
     """
-    means = df.mean()
-    stds = df.std()
-    inliers = (np.abs(df[means.index] - means) < n * stds)
-    if not np.all(inliers):
-        msg = bad_locations(~inliers)
+    if (means is None) != (stds is None):
+        raise ValueError("means and stds must be given together.")
+    if columns is None:
+        columns = list(means.keys()) if means is not None else numeric_columns(df)
+    values = df if list(columns) == list(df.columns) else df[columns]
+    if not len(values):
+        return df
+
+    if means is None:
+        moments = RunningMoments(values.shape[1])
+        for block in float_blocks(values):
+            moments.update(block)
+        mean, std = moments.mean, moments.std()
+        low, high, nulls = moments.min, moments.max, moments.n_nulls > 0
+    else:
+        mean = np.array([means[col] for col in values.columns], dtype=np.float64)
+        std = np.array([stds[col] for col in values.columns], dtype=np.float64)
+        low, high = np.full(values.shape[1], np.inf), np.full(values.shape[1], -np.inf)
+        nulls = np.zeros(values.shape[1], dtype=bool)
+        for block in float_blocks(values):
+            low = np.fmin(low, np.fmin.reduce(block, axis=0))
+            high = np.fmax(high, np.fmax.reduce(block, axis=0))
+            nulls |= np.isnan(block).any(axis=0)
+
+    limit = n * std
+    with np.errstate(invalid="ignore"):
+        inliers = (high - mean < limit) & (mean - low < limit) & ~nulls
+    if not inliers.all():
+        failing = np.flatnonzero(~inliers)
+        floats = values.iloc[:, failing].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            outliers = ~(np.abs(floats - mean[failing]) < limit[failing])
+        msg = bad_locations(pd.DataFrame(outliers, index=values.index,
+                                         columns=values.columns[failing]))
         raise AssertionError(msg)
     return df
 
@@ -507,7 +692,7 @@ def has_dtypes(df, items):
     return df
 
 
-def one_to_many(df, unitcol, manycol):
+def one_to_many(df, unitcol, manycol, max_keys=MAX_BAD_LOCATIONS):
     """Asserts that a many-to-one relationship is preserved between two columns.
 
     For example, a retail store will have have distinct departments, each with several employees.
@@ -516,22 +701,46 @@ def one_to_many(df, unitcol, manycol):
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
-        unitcol (str): The column that encapulates the groups in ``manycol``.
-        manycol (str): The column that must remain unique in the distict pairs
-                       between ``manycol`` and ``unitcol``.
+        unitcol (str or list): The column, or list of columns,
+                               that encapulates the groups in ``manycol``.
+        manycol (str or list): The column, or list of columns, that must remain unique
+                               in the distict pairs between ``manycol`` and ``unitcol``.
+        max_keys (int): Maximum number of offending ``manycol`` values to report.
+                        None reports all of them.
 
     Returns:
         Original `df`.
 
     """
-    subset = df[[manycol, unitcol]].drop_duplicates()
-    for many in subset[manycol].unique():
-        if subset[subset[manycol] == many].shape[0] > 1:
-            msg = ("{} in {} has multiple values for {}"
-                   .format(many, manycol, unitcol))
-            raise AssertionError(msg)
+    unitcols, manycols = column_list(unitcol), column_list(manycol)
+    subset = df[manycols + unitcols].drop_duplicates()
+    conflicting = subset[subset.duplicated(subset=manycols, keep=False)]
+    if conflicting.empty:
+        return df
 
-    return df
+    # Group the conflicting pairs by key. Hashes treat NaN keys as equal and,
+    # unlike sorting, work on columns of mixed types.
+    hashes = pd.util.hash_pandas_object(conflicting[manycols], index=False).to_numpy()
+    codes, uniques = pd.factorize(hashes)
+    n_keys = len(uniques)
+    positions = np.arange(len(codes)) if max_keys is None else np.flatnonzero(codes < max_keys)
+    positions = positions[np.argsort(codes[positions], kind="mergesort")]
+
+    n_many = len(manycols)
+    rows = conflicting.iloc[positions].itertuples(index=False, name=None)
+    conflicts = {}
+    for code, row in zip(codes[positions], rows):
+        many = row[0] if n_many == 1 else row[:n_many]
+        unit = row[n_many] if len(unitcols) == 1 else row[n_many:]
+        if code not in conflicts:
+            conflicts[code] = (many, [])
+        conflicts[code][1].append(unit)
+
+    msg = ("{} values with multiple values for {}: {}"
+           .format(manycol, unitcol, dict(conflicts.values())))
+    if n_keys > len(conflicts):
+        msg += " ... and {} more".format(n_keys - len(conflicts))
+    raise AssertionError(msg)
 
 
 def is_same_as(df, df_to_compare, **kwargs):
@@ -553,32 +762,52 @@ def is_same_as(df, df_to_compare, **kwargs):
     return df
 
 
-def multi_check(df, checks, warn=False):
+def multi_check(df, checks, warn=False, backend=None, report=False):
     """Asserts that all checks pass.
 
+    Checks share the per-column facts (null counts, min/max, uniqueness, ...) they need,
+    so each column is scanned once per fact rather than once per check.
+    See `bulwark.engine` for details.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         checks (dict): Mapping of check functions to parameters for those check functions.
         warn (bool): Indicates whether an error should be raised
                      or only a warning notification should be displayed.
                      Default is to error.
+        backend (bulwark.parallel.ProcessBackend, bulwark.arrow.ArrowBackend,
+                 bulwark.polars.PolarsBackend or str):
+                 Runs the checks on worker processes instead, e.g. for checks that hold
+                 the GIL, with Arrow kernels for Arrow-backed columns, or as polars
+                 expressions for polars frames.
+                 "process" uses a shared ProcessBackend with one worker per CPU,
+                 "arrow" an ArrowBackend and "polars" a PolarsBackend.
+        report (bool): Whether to return a `bulwark.results.ValidationReport` of the failing
+                       checks instead of raising it (or `df`). Their messages are only
+                       rendered when the report is printed.
 
     Returns:
-        Original `df`.
+        Original `df`, or the `ValidationReport` if `report` is True.
 
     """
-    error_msgs = []
-    for func, params in checks.items():
-        try:
-            func(df, **params)
-        except AssertionError as e:
-            error_msgs.append(e)
-
+    if backend == "process":
+        backend = default_backend()
+    elif backend == "arrow":
+        backend = ArrowBackend()
+    elif backend == "polars":
+        backend = PolarsBackend()
+    if backend is None:
+        error_msgs = engine.run_checks(df, checks)
+    else:
+        error_msgs = backend.run_checks(df, checks)
+
+    if report:
+        return ValidationReport(error_msgs)
     if warn and error_msgs:
         print(error_msgs)
         return df
     elif error_msgs:
-        raise AssertionError("\n".join(str(i) for i in error_msgs))
+        raise ValidationReport(error_msgs)
 
     return df
 
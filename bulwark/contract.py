@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Suites of checks compiled once and applied to many frames.
+
+`bulwark.checks.multi_check` and the decorators bind each check's arguments and
+work out what to compare on every call. A `Contract` does that once, when it is
+created: column lists, dtypes, schema predicates, deduplicated allowed value sets,
+range bounds and the comparisons proving monotonicity are resolved into an
+execution plan of one step per check. Applying the plan to a frame then costs little
+more than the comparisons themselves, which matters when validating many small frames.
+
+Steps only prove passes (see `bulwark.generic.CheckRegistry`); a step that can't
+runs the original check function.
+"""
+import functools
+
+import pandas as pd
+
+from bulwark import profiling
+from bulwark.generic import CheckRegistry, dtype_predicate
+from bulwark.kernels import MONOTONIC_OPS, extremes, extremes_within, missing_values
+from bulwark.kernels import monotonic_violations, outside_set
+from bulwark.results import ValidationReport
+
+# Compilers return a function of a pd.DataFrame that returns True only if the check
+# passes on it, or None if the check can't be compiled.
+_COMPILERS = CheckRegistry()
+_compiles = _COMPILERS.register
+
+
+def _proves(predicate):
+    """Wraps `predicate` so that it returns False rather than raising."""
+    def proves(df):
+        try:
+            return bool(predicate(df))
+        except _COMPILERS.errors:
+            return False
+    return proves
+
+
+@_compiles("has_columns")
+def _compile_has_columns(columns, exact_cols=False, exact_order=False):
+    expected = list(columns)
+    expected_set = frozenset(expected)
+
+    def passes(df):
+        if exact_order:
+            return list(df.columns[:len(expected)]) == expected and (
+                not exact_cols or len(df.columns) == len(expected))
+        df_cols = frozenset(df.columns)
+        return expected_set <= df_cols and (not exact_cols or df_cols <= expected_set)
+    return passes
+
+
+@_compiles("is_shape")
+def _compile_is_shape(shape):
+    expected = tuple(shape)
+
+    def passes(df):
+        return all(want in (None, -1) or want == got for want, got in zip(expected, df.shape))
+    return passes
+
+
+@_compiles("has_dtypes")
+def _compile_has_dtypes(items):
+    resolved = []
+    for col, dtype in items.items():
+        try:
+            resolved.append((col, pd.api.types.pandas_dtype(dtype)))
+        except TypeError:
+            return None
+
+    def passes(df):
+        # Looking up single columns is much cheaper than building `df.dtypes`.
+        return all(df[col].dtype == dtype for col, dtype in resolved)
+    return passes
+
+
+@_compiles("has_schema")
+def _compile_has_schema(schema=None):
+    resolved = [(col, dtype_predicate(dtype)) for col, dtype in schema.items()]
+
+    def passes(df):
+        return all(predicate(df[col]) for col, predicate in resolved)
+    return passes
+
+
+@_compiles("has_vals_within_set", "within_set")
+def _compile_within_set(items=None):
+    resolved = []
+    for col, values in items.items():
+        allowed = pd.Index(values).unique()
+        # pd.Index may turn None into NaN, which `isin` doesn't match with None.
+        resolved.append((col, list(values) if allowed.hasnans else allowed))
+
+    def passes(df):
+        return all(outside_set(df[col], allowed) is None for col, allowed in resolved)
+    return passes
+
+
+@_compiles("has_set_within_vals")
+def _compile_set_within_vals(items):
+    resolved = [(col, pd.Index(values).unique()) for col, values in items.items()]
+    # `np.setdiff1d` never finds NaN, so required NaNs always fail.
+    if any(required.hasnans for _, required in resolved):
+        return None
+
+    def passes(df):
+        return not any(missing_values(df[col], required) for col, required in resolved)
+    return passes
+
+
+@_compiles("has_vals_within_range", "within_range")
+def _compile_within_range(items=None):
+    resolved = [(col, lower, upper) for col, (lower, upper) in items.items()]
+
+    def passes(df):
+        return all(extremes_within(lower, upper, extremes(df[col]))
+                   for col, lower, upper in resolved)
+    return passes
+
+
+@_compiles("unique")
+def _compile_unique(columns=None, approx=False):
+    if approx:  # `is_unique` hashes whole columns
+        return None
+    resolved = None if columns is None else list(columns)
+
+    def passes(df):
+        return all(df[col].is_unique for col in (df.columns if resolved is None else resolved))
+    return passes
+
+
+def _is_monotonic(ser, ops):
+    return not monotonic_violations(ser, ops, first=True).size
+
+
+@_compiles("is_monotonic")
+def _compile_monotonic(items=None, increasing=None, strict=False):
+    resolved = None
+    if items is not None:
+        resolved = [(col, MONOTONIC_OPS[(incr, strict)]) for col, (incr, strict) in items.items()]
+    default = MONOTONIC_OPS[(increasing, strict)]
+
+    def passes(df):
+        conditions = resolved if resolved is not None else ((col, default) for col in df.columns)
+        return all(_is_monotonic(df[col], ops) for col, ops in conditions)
+    return passes
+
+
+class _Step(object):
+    """A compiled check: the check, its parameters and the predicate proving it passes."""
+
+    def __init__(self, func, params):
+        self.func = func
+        self.params = dict(params)
+        self.passes = None
+
+        passes = _COMPILERS.call(func, self.params)
+        if passes is not None:
+            self.passes = _proves(passes)
+
+    def run(self, df):
+        with profiling.measure(df, self.func, self.params):
+            if self.passes is None or not self.passes(df):
+                self.func(df, **self.params)
+
+
+class Contract(object):
+    """A suite of checks compiled once into an execution plan.
+
+    Args:
+        checks (dict): Mapping of check functions to parameters for those check functions,
+                       as in `bulwark.checks.multi_check`.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+
+    Raises:
+        TypeError: If the parameters of a `bulwark.checks` function don't match it.
+        ValueError: If a schema names an unsupported dtype.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> contract = Contract({ck.has_columns: {"columns": ["a"]},
+        ...                      ck.has_vals_within_set: {"items": {"a": [1, 2]}}})
+        >>> contract.validate(pd.DataFrame({"a": [1, 2]}))
+           a
+        0  1
+        1  2
+
+        Contracts can also be used as decorators:
+
+        >>> @contract
+        ... def load():
+        ...     return pd.DataFrame({"a": [1, 3]})
+        >>> load()
+        Traceback (most recent call last):
+            ...
+        bulwark.results.ValidationReport: ('Not in set', 1    3
+        Name: a, dtype: int64)
+
+    """
+
+    def __init__(self, checks, warn=False):
+        self.checks = checks
+        self.warn = warn
+        self._steps = [_Step(func, params) for func, params in checks.items()]
+
+    def errors(self, df):
+        """List of the AssertionErrors raised by failing checks, in the order of `checks`."""
+        errors = []
+        for step in self._steps:
+            try:
+                step.run(df)
+            except AssertionError as e:
+                errors.append(e)
+        return errors
+
+    def validate(self, df):
+        """Asserts that all checks pass on `df`.
+
+        Args:
+            df (pd.DataFrame): Any pd.DataFrame.
+
+        Returns:
+            Original `df`.
+
+        """
+        error_msgs = self.errors(df)
+        if self.warn and error_msgs:
+            print(error_msgs)
+            return df
+        elif error_msgs:
+            raise ValidationReport(error_msgs)
+
+        return df
+
+    def __call__(self, f):
+        @functools.wraps(f)
+        def decorated(*args, **kwargs):
+            return self.validate(f(*args, **kwargs))
+        return decorated
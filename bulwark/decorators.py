@@ -1,27 +1,318 @@
 """Generates decorators for each check in `checks.py`."""
+import asyncio
+import collections
+import concurrent.futures
 import functools
+import inspect
+import queue
 import sys
+import threading
 from inspect import getfullargspec, getmembers, isfunction
 
+import numpy as np
+
 import bulwark.checks as ck
+from bulwark import profiling
+from bulwark.arrow import ArrowBackend
+from bulwark.cache import DEFAULT_CACHE
 from bulwark.generic import snake_to_camel
+from bulwark.parallel import default_backend
+from bulwark.polars import PolarsBackend
+
+_DEFAULT_EXECUTOR = None
+_DEFAULT_EXECUTOR_LOCK = threading.Lock()
+
+# Default bounds of a decorator's deferred checks, which each hold their frame.
+MAX_PENDING = 8
+MAX_FAILURES = 100
+
+
+def _default_executor():
+    """Single background thread shared by deferred checks, which keeps them in call order."""
+    global _DEFAULT_EXECUTOR
+    with _DEFAULT_EXECUTOR_LOCK:
+        if _DEFAULT_EXECUTOR is None:
+            _DEFAULT_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                1, thread_name_prefix="bulwark-checks")
+    return _DEFAULT_EXECUTOR
 
 
 class BaseDecorator(object):
+    """Base class of the decorators generated for each check in `bulwark.checks`.
+
+    Besides the check's own arguments, every decorator accepts these keyword arguments:
+
+    - enabled (bool): Whether the check runs at all. Default is True.
+    - sample_calls (float): Only check this fraction of calls, chosen at random.
+    - every_n_calls (int): Only check every nth call, starting with the first.
+    - sample_rows (int or float): Only check a random sample of about this many rows
+      (or this fraction of rows, if a float) of each returned frame, in their original order.
+      Only useful for checks that look at rows independently.
+    - seed (int): Seed for the sampling above, so runs are reproducible. Default is 0.
+    - backend (bulwark.parallel.ProcessBackend, bulwark.arrow.ArrowBackend,
+      bulwark.polars.PolarsBackend or str): Runs the check on worker processes, one column
+      per worker where possible, with Arrow kernels, or as polars expressions for functions
+      returning polars frames. "process" uses a ProcessBackend with one worker per CPU,
+      shared by all decorators, "arrow" an ArrowBackend and "polars" a PolarsBackend.
+    - cache (bulwark.cache.ValidationCache or bool): Skips the check on data it already
+      passed on, if the check costs more than fingerprinting the data, see `bulwark.cache`.
+      True uses a cache shared by all decorators.
+    - executor (concurrent.futures.Executor): Where checks of ``async def`` functions run,
+      so they don't block the event loop. Default is the loop's default executor.
+    - defer (bool or concurrent.futures.Executor): Returns the function's result right away
+      and runs the check in the background instead, on a thread shared by all decorators
+      if True. Failures aren't raised, but put in `failures` and passed to `on_failure`.
+      The frame mustn't be modified until its check has run.
+    - max_pending (int): Maximum number of the decorator's deferred checks submitted but
+      not yet done, each holding its frame. Calls beyond it block (or, in coroutines,
+      wait) until one is done. Default is 8; None doesn't bound them.
+    - on_failure (function): Called with the exception of each failing deferred check,
+      in the thread that ran it.
+    - failures (queue.Queue): Where exceptions of failing deferred checks are put, which
+      may hold their frame until taken out. Default is a new queue of at most 100 of them.
+      Failures that don't fit are dropped, and counted in `n_failures_dropped`.
+
+    Coroutine functions are decorated with coroutine functions that await them, then await
+    the check in the executor, so other tasks keep running while the result is checked.
+    `n_calls` and `n_skipped` count the calls made while enabled and those skipped by sampling.
+    Checks that run are reported to the hooks registered in `bulwark.profiling`.
+
+    """
+
     def __init__(self, *args, **kwargs):
-        self.enabled = kwargs.pop("enabled", True)  # setter to enforce bool would be a lot safer
-        # self.warn = False ? No - put at func level for all funcs and pass through
+        self._pop_options(kwargs)
 
         self.check_func_params = dict(
             zip(getfullargspec(self.check_func).args[1:], args))
         self.check_func_params.update(**kwargs)
 
+    def _pop_options(self, kwargs):
+        """Pops the decorator's own options out of `kwargs`, leaving the check's params."""
+        self.enabled = kwargs.pop("enabled", True)  # setter to enforce bool would be a lot safer
+        # self.warn = False ? No - put at func level for all funcs and pass through
+
+        self.sample_calls = kwargs.pop("sample_calls", None)
+        self.every_n_calls = kwargs.pop("every_n_calls", None)
+        self.sample_rows = kwargs.pop("sample_rows", None)
+        self.seed = kwargs.pop("seed", 0)
+        self.backend = kwargs.pop("backend", None)
+        if self.backend == "process":
+            self.backend = default_backend()
+        elif self.backend == "arrow":
+            self.backend = ArrowBackend()
+        elif self.backend == "polars":
+            self.backend = PolarsBackend()
+        self.cache = kwargs.pop("cache", None)
+        if self.cache is True:
+            self.cache = DEFAULT_CACHE
+        elif self.cache is False:
+            self.cache = None
+        self.executor = kwargs.pop("executor", None)
+        self.defer = kwargs.pop("defer", False)
+        if self.defer is True:
+            self.defer = _default_executor()
+        self.on_failure = kwargs.pop("on_failure", None)
+        self.max_pending = kwargs.pop("max_pending", MAX_PENDING)
+        self.failures = kwargs.pop("failures", None)
+        if self.failures is None:
+            self.failures = queue.Queue(MAX_FAILURES)
+        self.n_failures_dropped = 0
+        self._pending = set()
+        self._slots = None
+        if self.max_pending is not None:
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+        # (loop, asyncio.Future) of each coroutine waiting for a slot, in order.
+        self._slot_waiters = collections.deque()
+        self.n_calls = 0
+        self.n_skipped = 0
+        self._random_state = np.random.RandomState(self.seed)
+        self._lock = threading.Lock()
+        self._delivered = threading.Condition(self._lock)
+
+    def _should_check(self):
+        """Counts a call, returning whether it should be checked."""
+        with self._lock:
+            self.n_calls += 1
+            check = True
+            if self.every_n_calls is not None:
+                check = (self.n_calls - 1) % self.every_n_calls == 0
+            if check and self.sample_calls is not None:
+                check = self._random_state.random_sample() < self.sample_calls
+            if not check:
+                self.n_skipped += 1
+        return check
+
+    def _sample(self, df):
+        """Returns the rows of `df` to check."""
+        if self.sample_rows is None or not len(df):
+            return df
+
+        if isinstance(self.sample_rows, float):
+            size = int(np.ceil(self.sample_rows * len(df)))
+        else:
+            size = self.sample_rows
+        if size >= len(df):
+            return df
+
+        # Drawing with replacement avoids permuting all of `df`'s positions.
+        with self._lock:
+            positions = self._random_state.randint(0, len(df), size)
+        return df.take(np.unique(positions))
+
+    def _check(self, df):
+        if self.backend is None:
+            self.check_func(df, **self.check_func_params)
+        else:
+            self._run_on_backend(df, self.check_func, self.check_func_params)
+
+    def _measured_check(self, df, func):
+        df = self._sample(df)
+        with profiling.measure(df, self.check_func, self.check_func_params, func):
+            self._check(df)
+
+    def _validate(self, df, func=None):
+        if self.cache is None or not self.cache.caches(self.check_func):
+            self._measured_check(df, func)
+            return
+
+        key = self.cache.key(df, self.check_func, self.check_func_params)
+        if key not in self.cache:
+            self._measured_check(df, func)
+            self.cache.add(key)
+
+    def submit(self, df, func=None):
+        """Checks `df` in the background, on the `defer` executor or the shared thread.
+
+        Blocks while `max_pending` of the decorator's deferred checks aren't done.
+
+        Args:
+            df (pd.DataFrame): The frame to check, which mustn't be modified until checked.
+            func (function): The function that returned `df`, if any, for `bulwark.profiling`.
+
+        Returns:
+            concurrent.futures.Future of the check, whose exception is that of a failure.
+            Failures are also put in `failures` and passed to `on_failure`.
+
+        """
+        if self._slots is not None:
+            self._slots.acquire()
+        return self._submit(df, func)
+
+    async def _acquire_slot(self):
+        """Takes a slot without blocking the event loop or one of its executor's threads."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._slots.acquire(blocking=False):
+                return
+            waiter = loop.create_future()
+            self._slot_waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, waiter) in self._slot_waiters:
+                    self._slot_waiters.remove((loop, waiter))
+                    raise
+            # A slot was handed over before the cancellation, and isn't needed anymore.
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+
+    def _hand_slot(self, waiter):
+        """Gives a released slot to `waiter`, in its loop, unless it was cancelled meanwhile."""
+        if waiter.done():
+            self._release_slot()
+        else:
+            waiter.set_result(None)
+
+    def _release_slot(self):
+        """Frees a slot, handing it to the first coroutine waiting for one, if any."""
+        if self._slots is None:
+            return
+        with self._lock:
+            while self._slot_waiters:
+                loop, waiter = self._slot_waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._hand_slot, waiter)
+                    return
+                except RuntimeError:  # closed loop
+                    continue
+            self._slots.release()
+
+    def _submit(self, df, func):
+        """Submits the check of `df`, once a slot is taken."""
+        executor = self.defer or _default_executor()
+        try:
+            future = executor.submit(self._validate, df, func)
+        except BaseException:
+            self._release_slot()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._deliver)
+        return future
+
+    def _deliver(self, future):
+        try:
+            if not future.cancelled() and future.exception() is not None:
+                try:
+                    self.failures.put_nowait(future.exception())
+                except queue.Full:
+                    with self._lock:
+                        self.n_failures_dropped += 1
+                if self.on_failure is not None:
+                    self.on_failure(future.exception())
+        finally:
+            self._release_slot()
+            with self._delivered:
+                self._pending.discard(future)
+                self._delivered.notify_all()
+
+    def wait(self, timeout=None):
+        """Waits for the deferred checks submitted so far, and their failures' delivery.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait. Default waits until all are done.
+
+        Returns:
+            List of the exceptions of those that failed, also put in `failures`.
+
+        """
+        with self._delivered:
+            pending = set(self._pending)
+            self._delivered.wait_for(lambda: self._pending.isdisjoint(pending), timeout)
+        return [future.exception() for future in pending
+                if future.done() and not future.cancelled() and future.exception() is not None]
+
+    def _run_on_backend(self, df, check_func, params):
+        errors = self.backend.run_checks(df, {check_func: params})
+        if errors:
+            raise errors[0]
+
     def __call__(self, f):
+        if inspect.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def decorated_coroutine(*args, **kwargs):
+                df = await f(*args, **kwargs)
+                if self.enabled and self._should_check():
+                    loop = asyncio.get_running_loop()
+                    if self.defer:
+                        if self._slots is not None:
+                            await self._acquire_slot()
+                        self._submit(df, f)
+                        return df
+                    await loop.run_in_executor(self.executor, self._validate, df, f)
+                return df
+            return decorated_coroutine
+
         @functools.wraps(f)
         def decorated(*args, **kwargs):
             df = f(*args, **kwargs)
-            if self.enabled:
-                self.check_func(df, **self.check_func_params)
+            if self.enabled and self._should_check():
+                if self.defer:
+                    self.submit(df, f)
+                else:
+                    self._validate(df, f)
             return df
         return decorated
 
@@ -45,23 +336,20 @@ for func in check_functions:
     setattr(this_module, decorator_name, decorator_factory(decorator_name, func))
 
 
-class CustomCheck:
+class CustomCheck(BaseDecorator):
     """
     Notes:
         - This code is purposefully located below the auto-generation of decorators,
           so this overwrites the auto-generated CustomCheck.
-        - `CustomCheck`'s __init__ and __call__ diverge from `BaseDecorator`,
+        - `CustomCheck`'s __init__ and _check diverge from `BaseDecorator`,
           since the check_func needs to be set by the user at creation time.
 
-    TODO: Work this into BaseDecorator?
-
     """
 
     def __init__(self, *args, **kwargs):
-        self.enabled = kwargs.pop("enabled", True)  # setter to enforce bool would be a lot safer
-        # self.warn = False ? No - put at func level for all funcs and pass through
+        self._pop_options(kwargs)
 
-        self.check_func = kwargs.get("check_func")
+        self.check_func = kwargs.pop("check_func", None)
         if self.check_func:
             check_func_args = args
         else:
@@ -72,12 +360,10 @@ class CustomCheck:
             zip(getfullargspec(self.check_func).args[1:], check_func_args))
         self.check_func_params.update(**kwargs)
 
-    def __call__(self, f):
-        @functools.wraps(f)
-        def decorated(*args, **kwargs):
-            df = f(*args, **kwargs)
-            if self.enabled:
-                # differs from BaseDecorator
-                ck.custom_check(df, self.check_func, **self.check_func_params)
-            return df
-        return decorated
+    def _check(self, df):
+        # differs from BaseDecorator
+        if self.backend is None:
+            ck.custom_check(df, self.check_func, **self.check_func_params)
+        else:
+            self._run_on_backend(df, ck.custom_check,
+                                 dict(self.check_func_params, check_func=self.check_func))
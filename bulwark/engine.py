@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Fused execution engine behind `bulwark.checks.multi_check`.
+
+Running a suite of checks one after the other rescans each column once per check.
+Instead, the engine lazily computes per-column facts (null count, min/max,
+monotonicity flags, uniqueness and the set of values) the first time any check asks
+for them, caches them for the rest of the suite, and decides every check it knows
+about from those facts.
+
+The null count, min and max of numeric columns are computed together, in a single
+blockwise pass (see `bulwark.kernels.null_extremes`). The other facts, and all facts
+of other dtypes, each take a pass of their own, so a column is read once per kind of
+fact the suite needs rather than once per check, but not necessarily only once.
+
+Facts are only ever used to *prove* that a check passes (see
+`bulwark.generic.CheckRegistry`): unknown checks, unsupported dtypes and actual
+failures are left to the original check function, so failing columns are scanned
+again by their check.
+"""
+import numpy as np
+import pandas as pd
+
+from bulwark import profiling
+from bulwark.generic import CheckRegistry, LabeledFrame
+from bulwark.kernels import is_diffable, null_extremes
+
+# Returned by facts that can't be computed for a column, e.g. min of mixed objects.
+_UNAVAILABLE = object()
+
+# Planners take a `FrameFacts` and return True only if the facts prove the check passes.
+_PLANNERS = CheckRegistry()
+_fuses = _PLANNERS.register
+
+
+class ColumnFacts(object):
+    """Lazily computed, cached facts about a single column."""
+
+    def __init__(self, ser):
+        self.ser = ser
+        self._cache = {}
+
+    def _get(self, name, compute):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        try:
+            value = compute()
+        except (TypeError, ValueError):
+            value = _UNAVAILABLE
+        self._cache[name] = value
+        return value
+
+    def cached(self, name):
+        """The fact `name` if it was already computed, else `_UNAVAILABLE`."""
+        return self._cache.get(name, _UNAVAILABLE)
+
+    def _reduced(self, name, compute):
+        """Fact `name` of null_count, min and max, computed together in one pass if possible."""
+        if name not in self._cache and "null_extremes" not in self._cache:
+            summary = self._cache["null_extremes"] = null_extremes(self.ser)
+            if summary is not None:
+                self._cache.update(zip(("null_count", "min", "max"), summary))
+        return self._get(name, compute)
+
+    @property
+    def null_count(self):
+        return self._reduced("null_count", lambda: int(self.ser.isna().sum()))
+
+    @property
+    def min(self):
+        return self._reduced("min", self.ser.min)
+
+    @property
+    def max(self):
+        return self._reduced("max", self.ser.max)
+
+    @property
+    def is_unique(self):
+        return self._get("is_unique", lambda: self.ser.is_unique)
+
+    @property
+    def is_monotonic_increasing(self):
+        return self._get("is_monotonic_increasing", lambda: self.ser.is_monotonic_increasing)
+
+    @property
+    def is_monotonic_decreasing(self):
+        return self._get("is_monotonic_decreasing", lambda: self.ser.is_monotonic_decreasing)
+
+    @property
+    def values(self):
+        """Unique values of the column."""
+        return self._get("values", self.ser.unique)
+
+
+class FrameFacts(LabeledFrame):
+    """Per-column `ColumnFacts` for a pd.DataFrame, created on first use."""
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    @property
+    def labels(self):
+        return self.df.columns
+
+    def __getitem__(self, col):
+        """Returns the `ColumnFacts` for `col`, or None if it isn't a single column."""
+        try:
+            return self._columns[col]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable label
+            return None
+
+        try:
+            ser = self.df[col]
+        except (KeyError, TypeError, ValueError):
+            ser = None
+        facts = ColumnFacts(ser) if isinstance(ser, pd.Series) else None
+        self._columns[col] = facts
+        return facts
+
+
+def _compare(op, left, right):
+    """`op(left, right)` as a bool, or False if the values can't be compared."""
+    if left is _UNAVAILABLE or right is _UNAVAILABLE:
+        return False
+    try:
+        return bool(op(left, right))
+    except (TypeError, ValueError):
+        return False
+
+
+@_fuses("has_no_nans", "has_no_nones")
+def _plan_no_nulls(facts, columns=None):
+    columns = facts.columns(columns)
+    if columns is None:
+        return False
+    for col in columns:
+        col_facts = facts[col]
+        if col_facts is None or not _compare(np.equal, col_facts.null_count, 0):
+            return False
+    return True
+
+
+def _plan_no_inf(facts, columns, extreme, inf):
+    columns = facts.columns(columns)
+    if columns is None:
+        return False
+    for col in columns:
+        col_facts = facts[col]
+        if col_facts is None:
+            return False
+        dtype = col_facts.ser.dtype
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "biuf":
+            return False
+        # A NaN extreme means the column is empty or all-NaN.
+        if dtype.kind == "f" and not _compare(np.not_equal, getattr(col_facts, extreme), inf):
+            return False
+    return True
+
+
+@_fuses("has_no_infs")
+def _plan_no_infs(facts, columns=None):
+    return _plan_no_inf(facts, columns, "max", np.inf)
+
+
+@_fuses("has_no_neg_infs")
+def _plan_no_neg_infs(facts, columns=None):
+    return _plan_no_inf(facts, columns, "min", -np.inf)
+
+
+def _bound_holds(op, bound, extreme):
+    """Whether `op(bound, extreme)` holds, treating a NaN extreme (no values) as holding."""
+    if extreme is _UNAVAILABLE:
+        return False
+    if pd.api.types.is_scalar(extreme) and pd.isna(extreme):
+        return True
+    return _compare(op, bound, extreme)
+
+
+@_fuses("has_vals_within_range")
+def _plan_within_range(facts, items=None):
+    for col, (lower, upper) in items.items():
+        col_facts = facts[col]
+        # (lower > ser).any() is the same as lower > ser.min()
+        if (col_facts is None or
+                not _bound_holds(np.less_equal, lower, col_facts.min) or
+                not _bound_holds(np.greater_equal, upper, col_facts.max)):
+            return False
+    return True
+
+
+@_fuses("has_vals_within_set")
+def _plan_within_set(facts, items=None):
+    for col, v in items.items():
+        col_facts = facts[col]
+        if col_facts is None or isinstance(col_facts.ser.dtype, pd.CategoricalDtype):
+            return False  # codes are checked faster than their unique values are found
+        if col_facts.values is _UNAVAILABLE:
+            return False
+        if not pd.Series(col_facts.values).isin(v).all():
+            return False
+    return True
+
+
+@_fuses("has_set_within_vals")
+def _plan_set_within_vals(facts, items):
+    # Unless another check already took them, unique values cost more than the check,
+    # which stops scanning once it has found all the values.
+    for col, vals in items.items():
+        col_facts = facts[col]
+        if col_facts is None or col_facts.cached("values") is _UNAVAILABLE:
+            return False
+        if np.setdiff1d(vals, col_facts.values, assume_unique=True).size:
+            return False
+    return True
+
+
+@_fuses("unique")
+def _plan_unique(facts, columns=None, approx=False):
+    if approx:  # facts hash whole columns
+        return False
+    columns = facts.columns(columns)
+    if columns is None:
+        return False
+    for col in columns:
+        col_facts = facts[col]
+        if col_facts is None or col_facts.is_unique is not True:
+            return False
+    return True
+
+
+@_fuses("is_monotonic")
+def _plan_monotonic(facts, items=None, increasing=None, strict=False):
+    if items is None:
+        items = {col: (increasing, strict) for col in facts.df}
+
+    for col, (increasing, strict) in items.items():
+        col_facts = facts[col]
+        if col_facts is None or not is_diffable(col_facts.ser.dtype):
+            return False
+
+        # pandas' flags are False whenever NaNs are present, so those are delegated.
+        if increasing is None:
+            ok = (col_facts.is_monotonic_increasing is True or
+                  col_facts.is_monotonic_decreasing is True)
+        elif increasing:
+            ok = col_facts.is_monotonic_increasing is True
+        else:
+            ok = col_facts.is_monotonic_decreasing is True
+        if not ok or (strict and col_facts.is_unique is not True):
+            return False
+    return True
+
+
+def run_checks(df, checks):
+    """Runs each check in `checks` on `df`, sharing per-column facts between them.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        checks (dict): Mapping of check functions to parameters for those check functions.
+
+    Returns:
+        List of the AssertionErrors raised by failing checks, in the order of `checks`.
+
+    """
+    facts = FrameFacts(df)
+    errors = []
+    for func, params in checks.items():
+        try:
+            with profiling.measure(df, func, params):
+                if not _PLANNERS.attempt(func, params, facts, default=False):
+                    func(df, **params)
+        except AssertionError as e:
+            errors.append(e)
+
+    return errors
@@ -2,20 +2,323 @@
 """
 Module for useful generic functions.
 """
-from itertools import chain, cycle
+import functools
+import inspect
 
 import numpy as np
 import pandas as pd
 
 
-def bad_locations(df):
-    """Indicates bad cells in `df`."""
-    columns = df.columns
-    all_locs = chain.from_iterable(zip(df.index, cycle([col])) for col in columns)
-    bad = pd.Series(list(all_locs))[np.asarray(df).ravel(order='F')]
-    msg = bad.values
+# Default cap on the number of bad locations kept for error messages.
+MAX_BAD_LOCATIONS = 1000
 
-    return msg
+
+class BadLocations(object):
+    """Bad (index, column) locations of a pd.DataFrame, rendered only when printed.
+
+    Only integer positions are kept, so building this costs memory proportional
+    to the number of violations kept rather than to the size of the frame.
+
+    Args:
+        index (pd.Index): Index of the checked pd.DataFrame.
+        columns (pd.Index): Columns of the checked pd.DataFrame.
+        rows (np.ndarray): Row positions of the kept violations.
+        cols (np.ndarray): Column positions of the kept violations.
+        total (int): Total number of violations, including those not kept.
+
+    """
+
+    def __init__(self, index, columns, rows, cols, total=None):
+        self.index = index
+        self.columns = columns
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.cols = np.asarray(cols, dtype=np.intp)
+        self.total = len(self.rows) if total is None else total
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return zip(self.index[self.rows].tolist(), self.columns[self.cols].tolist())
+
+    def __repr__(self):
+        msg = repr(list(self))
+        if self.total > len(self.rows):
+            msg += " ... and {} more".format(self.total - len(self.rows))
+        return msg
+
+
+def bad_locations(df, max_locations=MAX_BAD_LOCATIONS):
+    """Indicates bad cells in `df`.
+
+    Args:
+        df (pd.DataFrame): Boolean pd.DataFrame that is True at bad cells.
+        max_locations (int): Maximum number of bad cells to keep, column by column.
+                             None keeps all of them.
+
+    Returns:
+        `BadLocations` of the True cells in ``df``.
+
+    """
+    hits = (np.flatnonzero(df.iloc[:, j].to_numpy(dtype=bool, na_value=False))
+            for j in range(df.shape[1]))
+    return column_locations(df.index, df.columns, hits, max_locations)
+
+
+def column_locations(index, columns, positions, max_locations=MAX_BAD_LOCATIONS):
+    """`BadLocations` from the row positions of bad cells in each column.
+
+    Args:
+        index (pd.Index): Index of the checked pd.DataFrame.
+        columns (pd.Index): Labels of the columns, in the order of `positions`.
+        positions (iterable): np.ndarray of the row positions of bad cells of each column.
+        max_locations (int): Maximum number of bad cells to keep, column by column.
+                             None keeps all of them.
+
+    """
+    rows, cols, total, kept = [], [], 0, 0
+    for j, hits in enumerate(positions):
+        total += hits.size
+        if max_locations is not None:
+            hits = hits[:max(max_locations - kept, 0)]
+        kept += hits.size
+        rows.append(hits)
+        cols.append(np.full(hits.size, j, dtype=np.intp))
+
+    if not rows:
+        return BadLocations(index, columns, [], [], 0)
+    return BadLocations(index, columns, np.concatenate(rows), np.concatenate(cols), total)
+
+
+def column_list(col):
+    """Columns named by `col`: the list itself if it is a list, else just ``[col]``.
+
+    Tuples are kept as single (MultiIndex) column labels.
+    """
+    return list(col) if isinstance(col, list) else [col]
+
+
+# Arguments of the checks in `bulwark.checks` that name the columns they look at.
+_COLUMN_ARGUMENTS = ("columns", "items", "schema", "unitcol", "manycol")
+
+
+def referenced_columns(df, params):
+    """Columns of `df` that a `bulwark.checks` function called with `params` looks at.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        params (dict): Keyword arguments for the check.
+
+    Returns:
+        List of the labels of the referenced columns that are in ``df``,
+        or of all its columns if the check doesn't name any.
+
+    """
+    labels = []
+    for name in _COLUMN_ARGUMENTS:
+        value = params.get(name)
+        if value is None:
+            continue
+        if isinstance(value, (dict, list)):
+            labels.extend(value)
+        elif name in ("unitcol", "manycol"):
+            labels.append(value)
+        else:
+            return list(df.columns)
+
+    if not labels:
+        return list(df.columns)
+    return [col for col in dict.fromkeys(labels) if col in df.columns]
+
+
+def check_arguments(check_func, params):
+    """Binds `params` to `check_func`'s signature, skipping its leading `df` argument.
+
+    Args:
+        check_func (function): A check taking a pd.DataFrame as its first argument.
+        params (dict): Keyword arguments for ``check_func``.
+
+    Returns:
+        Dict of every argument after `df`, including defaults not given in `params`.
+
+    Raises:
+        TypeError: If ``params`` don't match ``check_func``'s signature.
+
+    """
+    bound = inspect.signature(check_func).bind(None, **params)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop(next(iter(arguments)))
+    return arguments
+
+
+@functools.lru_cache(maxsize=None)
+def _keyword_names(func):
+    parameters = inspect.signature(func).parameters.values()
+    if any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters):
+        return None
+    return frozenset(parameter.name for parameter in parameters)
+
+
+def call_with_arguments(func, arguments, *args):
+    """Calls ``func(*args, **arguments)``, passing only the `arguments` that `func` names.
+
+    Planners, compilers and kernels registered for a check only name the arguments of
+    `check_arguments` they use, so arguments added to a check, e.g. ``n_jobs``, don't
+    have to be added to all of them.
+    """
+    names = _keyword_names(func)
+    if names is not None:
+        arguments = {name: value for name, value in arguments.items() if name in names}
+    return func(*args, **arguments)
+
+
+class CheckRegistry(object):
+    """Implementations of `bulwark.checks` functions, by check name.
+
+    The engines running checks in other ways than calling them (fused facts, compiled
+    contracts, Arrow kernels, polars expressions, Parquet statistics, chunk states) each
+    keep one. Implementations name the arguments of `check_arguments` they use (see
+    `call_with_arguments`). Apart from chunk states, they are only ever used to *prove*
+    that a check passes: whenever they can't, the check function itself is called, so
+    error messages and edge cases are exactly those of the check.
+
+    Args:
+        errors (tuple): Exception types, besides AttributeError, KeyError, TypeError and
+                        ValueError, that mean an implementation can't decide a check.
+
+    """
+
+    def __init__(self, errors=()):
+        self.errors = (AttributeError, KeyError, TypeError, ValueError) + tuple(errors)
+        self._implementations = {}
+
+    def register(self, *names):
+        """Decorator registering an implementation of the checks with the given names."""
+        def register(implementation):
+            for name in names:
+                self._implementations[name] = implementation
+            return implementation
+        return register
+
+    def lookup(self, func):
+        """The implementation of `func`, or None if it isn't a registered `bulwark.checks` one."""
+        if getattr(func, "__module__", None) != "bulwark.checks":
+            return None
+        return self._implementations.get(getattr(func, "__name__", None))
+
+    def call(self, func, params, *args):
+        """Calls the implementation of `func` with `args` and `func`'s bound `params`.
+
+        Returns:
+            What the implementation returns, or None if `func` has none.
+
+        Raises:
+            TypeError: If ``params`` don't match ``func``'s signature.
+
+        """
+        implementation = self.lookup(func)
+        if implementation is None:
+            return None
+        return call_with_arguments(implementation, check_arguments(func, params), *args)
+
+    def attempt(self, func, params, *args, default=None):
+        """Like `call`, but returns `default` whenever the implementation can't decide.
+
+        That is if `func` has none, ``params`` don't match ``func``'s signature, or the
+        implementation raises one of `errors`.
+        """
+        if self.lookup(func) is None:
+            return default
+        try:
+            return self.call(func, params, *args)
+        except self.errors:
+            return default
+
+
+class LabeledFrame(object):
+    """Base of the frames that implementations in a `CheckRegistry` take.
+
+    Subclasses set ``labels`` to the list of their column labels.
+    """
+
+    labels = ()
+
+    def columns(self, columns=None):
+        """Resolves a check's ``columns`` argument to a list of labels, or None."""
+        if columns is None:
+            return list(self.labels)
+        if pd.api.types.is_list_like(columns) and not isinstance(columns, (dict, tuple)):
+            return list(columns)
+        return None
+
+
+def numeric_columns(df):
+    """Labels of the numeric and boolean columns of `df`, whose values can be read as floats."""
+    return df.select_dtypes(include=["number", "bool"], exclude=["timedelta"]).columns
+
+
+def float_blocks(df, block_size=1 << 20):
+    """Iterates over `df`'s rows in 2-D float arrays of about `block_size` elements each.
+
+    Missing values are NaN, so blocks can be fed to `RunningMoments`
+    without converting the whole of `df` at once.
+    """
+    step = max(block_size // max(df.shape[1], 1), 1)
+    for start in range(0, len(df), step):
+        yield df.iloc[start:start + step].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class RunningMoments(object):
+    """Count, mean, squared deviations, min and max per column, updated block by block.
+
+    Blocks are merged with Chan et al.'s pairwise form of Welford's algorithm,
+    so the statistics can be accumulated in a single pass without keeping the data.
+    NaNs are counted in `n_nulls` and otherwise ignored.
+
+    Args:
+        n_columns (int): Number of columns in each block.
+
+    """
+
+    def __init__(self, n_columns):
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+        self.n_nulls = np.zeros(n_columns, dtype=np.int64)
+
+    def update(self, block):
+        """Adds a 2-D (rows x columns) block of floats to the running statistics."""
+        block = np.asarray(block, dtype=np.float64)
+        if not block.shape[0]:
+            return
+
+        nulls = np.isnan(block)
+        counts = block.shape[0] - nulls.sum(axis=0)
+        safe_counts = np.maximum(counts, 1)
+        filled = np.where(nulls, 0., block)
+        block_mean = filled.sum(axis=0) / safe_counts
+        block_m2 = (np.where(nulls, 0., block - block_mean) ** 2).sum(axis=0)
+
+        total = self.count + counts
+        safe_total = np.maximum(total, 1)
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * counts / safe_total
+        self.m2 = self.m2 + block_m2 + delta ** 2 * self.count * counts / safe_total
+        self.count = total
+
+        self.min = np.fmin(self.min, np.fmin.reduce(block, axis=0))
+        self.max = np.fmax(self.max, np.fmax.reduce(block, axis=0))
+        self.n_nulls += nulls.sum(axis=0)
+
+    def std(self, ddof=1):
+        """Standard deviation per column; NaN where there are too few values."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > ddof,
+                            np.sqrt(self.m2 / np.maximum(self.count - ddof, 1)),
+                            np.nan)
 
 
 def snake_to_camel(snake_str):
@@ -23,6 +326,43 @@ def snake_to_camel(snake_str):
     return ''.join(x.title() for x in components)
 
 
+_SIGNED_INT = ["signed_int", "signed-int", "signed int", "signedint", "sint"]
+_UNSIGNED_INT = ["unsigned_int", "unsigned-int", "unsigned int", "unsignedint", "uint"]
+
+_DTYPE_PREDICATES = dict(
+    [("object", pd.api.types.is_object_dtype),
+     ("bool", pd.api.types.is_bool_dtype),
+     ("string", pd.api.types.is_string_dtype),
+     ("numeric", pd.api.types.is_numeric_dtype),
+     ("float", pd.api.types.is_float_dtype),
+     ("complex", pd.api.types.is_complex_dtype),
+     ("int", pd.api.types.is_integer_dtype),
+     ("int64", pd.api.types.is_int64_dtype)] +
+    [(name, pd.api.types.is_signed_integer_dtype) for name in _SIGNED_INT] +
+    [(name, pd.api.types.is_unsigned_integer_dtype) for name in _UNSIGNED_INT] +
+    [("datetime", pd.api.types.is_datetime64_any_dtype),
+     ("datetime64", pd.api.types.is_datetime64_dtype),
+     ("datetime64_ns", pd.api.types.is_datetime64_ns_dtype),
+     ("datetime64tz", pd.api.types.is_datetime64tz_dtype),
+     ("timedelta64", pd.api.types.is_timedelta64_dtype),
+     ("timedelta64_ns", pd.api.types.is_timedelta64_ns_dtype)])
+
+
+def dtype_predicate(dtype: str):
+    """The function of a pd.Series that `series_dtype_check` uses for `dtype`.
+
+    Raises:
+        ValueError: If ``dtype`` isn't supported by `series_dtype_check`.
+
+    """
+    try:
+        return _DTYPE_PREDICATES[dtype]
+    except (KeyError, TypeError):
+        raise ValueError(
+            f"This function doesn't support for `{dtype}` checking."
+        )
+
+
 def series_dtype_check(ser: pd.Series, dtype: str) -> bool:
     """For a given Series specifies if elements have dtypes.
 
@@ -43,41 +383,4 @@ def series_dtype_check(ser: pd.Series, dtype: str) -> bool:
     Returns:
         A boolean value
     """
-    if dtype == "object":
-        result = pd.api.types.is_object_dtype(ser)
-    elif dtype == "bool":
-        result = pd.api.types.is_bool_dtype(ser)
-    elif dtype == "string":
-        result = pd.api.types.is_string_dtype(ser)
-    elif dtype == "numeric":
-        result = pd.api.types.is_numeric_dtype(ser)
-    elif dtype == "float":
-        result = pd.api.types.is_float_dtype(ser)
-    elif dtype == "complex":
-        result = pd.api.types.is_complex_dtype(ser)
-    elif dtype == "int":
-        result = pd.api.types.is_integer_dtype(ser)
-    elif dtype == "int64":
-        result = pd.api.types.is_int64_dtype(ser)
-    elif dtype in ["signed_int", "signed-int", "signed int", "signedint", "sint"]:
-        result = pd.api.types.is_signed_integer_dtype(ser)
-    elif dtype in ["unsigned_int", "unsigned-int", "unsigned int", "unsignedint", "uint"]:
-        result = pd.api.types.is_unsigned_integer_dtype(ser)
-    elif dtype == "datetime":
-        result = pd.api.types.is_datetime64_any_dtype(ser)
-    elif dtype == "datetime64":
-        result = pd.api.types.is_datetime64_dtype(ser)
-    elif dtype == "datetime64_ns":
-        result = pd.api.types.is_datetime64_ns_dtype(ser)
-    elif dtype == "datetime64tz":
-        result = pd.api.types.is_datetime64tz_dtype(ser)
-    elif dtype == "timedelta64":
-        result = pd.api.types.is_timedelta64_dtype(ser)
-    elif dtype == "timedelta64_ns":
-        result = pd.api.types.is_timedelta64_ns_dtype(ser)
-    else:
-        raise ValueError(
-            f"This function doesn't support for `{dtype}` checking."
-        )
-
-    return result
+    return dtype_predicate(dtype)(ser)
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""
+Column-level kernels used by the checks in `bulwark.checks`.
+
+Kernels work on a single column's underlying array and pick the cheapest
+implementation its dtype allows, falling back to the generic pandas operation
+when there's nothing better to do.
+"""
+import numpy as np
+import pandas as pd
+
+# Number of elements scanned at a time by kernels that can stop early.
+BLOCK_SIZE = 1 << 16
+
+# Size of the first block of kernels whose blocks grow, so that they stop
+# after a few thousand elements when those are enough.
+_FIRST_BLOCK_SIZE = 1 << 12
+
+
+def _slice(values, start, stop):
+    if isinstance(values, pd.Series):
+        return values.iloc[start:stop]
+    return values[start:stop]
+
+
+def any_blockwise(values, func, block_size=BLOCK_SIZE):
+    """Whether ``func(block).any()`` for any block of `values`, stopping at the first hit.
+
+    Args:
+        values (array-like): np.ndarray, ExtensionArray or pd.Series to scan.
+        func (function): Maps a block of ``values`` to a boolean np.ndarray.
+        block_size (int): Number of elements per block.
+
+    Returns:
+        bool
+
+    """
+    for start in range(0, len(values), block_size):
+        if np.asarray(func(_slice(values, start, start + block_size))).any():
+            return True
+    return False
+
+
+def _growing_blocks(n, block_size=BLOCK_SIZE):
+    """(start, stop) of blocks covering ``range(n)``, doubling in size up to `block_size`."""
+    start, size = 0, min(_FIRST_BLOCK_SIZE, block_size)
+    while start < n:
+        yield start, min(start + size, n)
+        start += size
+        size = min(size * 2, block_size)
+
+
+def missing_values(ser, values, block_size=BLOCK_SIZE):
+    """Those of `values` that aren't in `ser`, stopping as soon as all of them are found.
+
+    ``ser`` is scanned from its first rows, in blocks doubling in size up to `block_size`.
+    Categorical columns are scanned through their codes, counted with ``np.bincount``,
+    so their values are never compared, nor converted to objects. As with ``np.setdiff1d``,
+    required NaNs are never found.
+
+    Args:
+        ser (pd.Series): Column to look in.
+        values (array-like): Values required to be in ``ser``.
+        block_size (int): Maximum number of elements per block.
+
+    Returns:
+        List of the missing values, in the order of `values`.
+
+    """
+    required = pd.Index(values)
+    found = np.zeros(len(required), dtype=bool)
+    looking = ~np.asarray(required.isna())
+
+    categorical = isinstance(ser.dtype, pd.CategoricalDtype)
+    if categorical:
+        codes = ser.cat.codes.to_numpy()
+        n_categories = len(ser.cat.categories)
+        # Values that aren't categories can't be in `ser`.
+        required_codes = ser.cat.categories.get_indexer(required)
+        looking &= required_codes >= 0
+
+    for start, stop in _growing_blocks(len(ser), block_size):
+        if not looking.any():
+            break
+        if categorical:
+            block = codes[start:stop]
+            seen = np.bincount(block[block >= 0], minlength=n_categories) > 0
+            hits = looking & seen[required_codes]
+        else:
+            hits = looking.copy()
+            hits[looking] = required[looking].isin(_slice(ser, start, stop))
+        found |= hits
+        looking &= ~hits
+    return required[~found].tolist()
+
+
+def category_table(ser, values):
+    """Lookup table of whether each code of the categorical `ser` stands for one of `values`.
+
+    Indexing it with ``ser.cat.codes`` gives ``ser.isin(values)``: the missing values'
+    code, -1, picks the last entry, which is whether `values` hold a NaN or None.
+    """
+    values = pd.Index(values)
+    categories = ser.cat.categories
+    table = np.zeros(len(categories) + 1, dtype=bool)
+    positions = categories.get_indexer(values)
+    table[positions[positions >= 0]] = True
+    table[-1] = bool(values.isna().any())
+    return table
+
+
+def outside_set(ser, values):
+    """Row positions of `ser` whose values aren't in `values`, or None if there are none.
+
+    Categorical columns are looked up in a `category_table` by their codes, without
+    comparing any values. If every category is allowed, they pass without scanning their
+    rows when missing values are allowed too, and are only scanned for missing codes if not.
+    """
+    if isinstance(ser.dtype, pd.CategoricalDtype):
+        table = category_table(ser, values)
+        codes = ser.cat.codes.to_numpy()
+        if table.all():
+            return None
+        if table[:-1].all():
+            positions = np.flatnonzero(codes < 0)
+        else:
+            positions = np.flatnonzero(~table[codes])
+    else:
+        positions = np.flatnonzero(~ser.isin(values).to_numpy(dtype=bool, na_value=False))
+    return positions if positions.size else None
+
+
+def _is_nan(value):
+    return isinstance(value, float) and np.isnan(value)
+
+
+def _isin_kernel(ser, values):
+    return ser, lambda block: block.isin(values).to_numpy(dtype=bool, na_value=False)
+
+
+def _special_kernel(ser, value):
+    """Kernel for NaN, None, inf or -inf, or None if `ser`'s dtype can't hold `value`.
+
+    Returns:
+        (values, func) such that ``func(values)`` is True where ``ser`` holds ``value``,
+        matching ``ser.isin([value])``, except that missing values of nullable dtypes
+        count as NaN.
+
+    """
+    dtype = ser.dtype
+    kind = getattr(dtype, "kind", "O")
+    is_nan = _is_nan(value)
+
+    if isinstance(dtype, np.dtype):
+        if kind in "biumM" or (kind == "f" and value is None):
+            return None
+        if kind == "f" and is_nan:
+            return ser.to_numpy(), np.isnan
+        if kind == "f":
+            return ser.to_numpy(), np.isposinf if value > 0 else np.isneginf
+        return _isin_kernel(ser, [value])
+
+    if kind in "mM" or (kind in "biuf" and value is None):
+        return None
+    if kind in "biu":  # nullable integer and boolean
+        return (ser.array, lambda block: block.isna()) if is_nan else None
+    if kind == "f":  # nullable float
+        if is_nan:
+            return ser.array, lambda block: block.isna()
+        func = np.isposinf if value > 0 else np.isneginf
+        return ser.array, lambda block: func(block.to_numpy(dtype=np.float64, na_value=np.nan))
+    if pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
+        return (ser.array, lambda block: block.isna()) if is_nan else None
+    return _isin_kernel(ser, [value])
+
+
+def _is_special(value):
+    return value is None or _is_nan(value) or (
+        isinstance(value, float) and np.isinf(value))
+
+
+def x_kernels(ser, values):
+    """Kernels finding `values` in `ser`, skipping values its dtype can't hold.
+
+    NaN, None, inf and -inf get dtype-specific kernels; any other values share one
+    ``isin``. Categorical columns get a single lookup of their codes in a `category_table`.
+
+    Returns:
+        List of (values, func) pairs, as taken by `any_blockwise`.
+
+    """
+    if isinstance(ser.dtype, pd.CategoricalDtype):
+        # One lookup of the codes finds every value, and none if no category is one.
+        # As in float columns, missing values are NaN, and neither None nor NA.
+        table = category_table(ser, values)
+        table[-1] = any(_is_nan(value) for value in values)
+        if not table.any():
+            return []
+        if not table[:-1].any():  # only missing values, whose code is -1
+            return [(ser.cat.codes.to_numpy(), lambda block: block < 0)]
+        return [(ser.cat.codes.to_numpy(), lambda block: table[block])]
+
+    kernels = []
+    others = []
+    for value in values:
+        if _is_special(value):
+            kernel = _special_kernel(ser, value)
+            if kernel is not None:
+                kernels.append(kernel)
+        else:
+            others.append(value)
+
+    if others:
+        kernels.append(_isin_kernel(ser, others))
+    return kernels
+
+
+def x_mask(ser, values):
+    """Mask of where `ser` holds any of `values`, or None if it holds none of them.
+
+    Columns are scanned block by block, stopping at the first hit, so the full mask
+    is only built for columns that actually contain one of ``values``.
+    """
+    kernels = x_kernels(ser, values)
+    if not any(any_blockwise(arr, func) for arr, func in kernels):
+        return None
+
+    mask = np.zeros(len(ser), dtype=bool)
+    for arr, func in kernels:
+        mask |= np.asarray(func(arr), dtype=bool)
+    return mask
+
+
+def _is_reducible(dtype):
+    """Whether columns of `dtype` hold numbers in a numpy array that min/max can reduce."""
+    return isinstance(dtype, np.dtype) and dtype.kind in "biuf"
+
+
+def _is_one_array(df):
+    """Whether all of `df`'s columns are views of one 2-D array, which `to_numpy` won't copy."""
+    bases = {id(df.iloc[:, i].to_numpy().base) for i in range(df.shape[1])}
+    return len(bases) == 1 and df.iloc[:, 0].to_numpy().base is not None
+
+
+def block_extremes(df, cols):
+    """(min, max) of each of `cols` that holds numbers in a numpy array, skipping NaNs.
+
+    When `cols` are all of `df`'s columns, share a dtype and are held in a single 2-D
+    array, they're reduced together without being copied, so a hundred float columns
+    cost two reductions rather than two hundred. Otherwise, gathering them into one
+    array would copy them, so each column's own array is reduced instead.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        cols (list): Labels of the columns to reduce.
+
+    Returns:
+        dict of col to (min, max), only for the reducible columns among ``cols``.
+        Columns holding only NaNs get (NaN, NaN).
+
+    """
+    if not len(df) or not df.columns.is_unique:
+        return {}
+
+    dtypes = df.dtypes
+    groups = {}
+    for col in cols:
+        try:
+            dtype = dtypes.get(col)
+        except TypeError:  # unhashable label
+            continue
+        if _is_reducible(dtype):
+            groups.setdefault(dtype, []).append(col)
+
+    extremes = {}
+    for group in groups.values():
+        if len(group) > 1 and len(group) == df.shape[1] and _is_one_array(df):
+            block = df.to_numpy()
+            # fmin and fmax skip NaNs, as `lower > NaN` is False.
+            extremes.update(zip(df.columns, zip(np.fmin.reduce(block, axis=0),
+                                                np.fmax.reduce(block, axis=0))))
+            continue
+        for col in group:
+            values = df[col].to_numpy()
+            extremes[col] = (np.fmin.reduce(values), np.fmax.reduce(values))
+    return extremes
+
+
+def extremes(ser):
+    """(min, max) of `ser`, skipping missing values, or None if they can't bound its values.
+
+    Categories compare by their order rather than by their values, so categoricals
+    get None, as do columns whose values can't be ordered.
+    """
+    if not isinstance(ser, pd.Series) or isinstance(ser.dtype, pd.api.types.CategoricalDtype):
+        return None
+    if _is_reducible(ser.dtype):
+        values = ser.to_numpy()
+        if not values.size:
+            return np.nan, np.nan
+        return np.fmin.reduce(values), np.fmax.reduce(values)
+    try:
+        return ser.min(), ser.max()
+    except (TypeError, ValueError):
+        return None
+
+
+def null_extremes(ser, block_size=BLOCK_SIZE):
+    """(null count, min, max) of `ser` in a single pass, or None if min/max can't reduce it.
+
+    Each block of `block_size` elements is counted and reduced while it's in cache, so the
+    column is read from memory once rather than once per statistic. Like ``ser.min()``,
+    the extremes skip NaNs, and are NaN if there are no other values.
+    """
+    if not isinstance(ser, pd.Series) or not _is_reducible(ser.dtype):
+        return None
+    values = ser.to_numpy()
+    if not values.size:
+        return 0, np.nan, np.nan
+
+    n_nulls, lows, highs = 0, [], []
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        if block.dtype.kind == "f":
+            n_nulls += int(np.count_nonzero(block != block))
+        lows.append(np.fmin.reduce(block))
+        highs.append(np.fmax.reduce(block))
+    return n_nulls, np.fmin.reduce(np.array(lows)), np.fmax.reduce(np.array(highs))
+
+
+def extremes_within(lower, upper, bounds):
+    """Whether (min, max) `bounds` prove every value is within [lower, upper].
+
+    False only means it couldn't be proven, e.g. because the bounds don't compare.
+    """
+    if bounds is None:
+        return False
+    low, high = bounds
+    if pd.isna(low) or pd.isna(high):  # empty or all missing
+        return True
+    try:
+        return bool(lower <= low) and bool(high <= upper)
+    except (TypeError, ValueError):
+        return False
+
+
+def range_mask(ser, lower, upper, bounds=None):
+    """Mask of where `ser` is outside [lower, upper], or None if it never is.
+
+    The happy path only takes `ser`'s min and max (or uses the given ``bounds``,
+    e.g. from `block_extremes`); the mask is built once, and only for columns
+    those can't prove to be within the range.
+    """
+    if extremes_within(lower, upper, extremes(ser) if bounds is None else bounds):
+        return None
+    mask = (lower > ser) | (upper < ser)
+    return mask if mask.any() else None
+
+
+# Comparisons of each value with the previous one that should hold, keyed by
+# (increasing, strict); with increasing=None, either of them is enough.
+MONOTONIC_OPS = {
+    (True, True): (np.greater,),
+    (False, True): (np.less,),
+    (True, False): (np.greater_equal,),
+    (False, False): (np.less_equal,),
+    (None, True): (np.greater, np.less),
+    (None, False): (np.greater_equal, np.less_equal),
+}
+
+
+def is_diffable(dtype):
+    """Whether columns of `dtype` are numbers, datetimes or timedeltas, whose `diff()` works."""
+    return ((pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)) or
+            pd.api.types.is_datetime64_dtype(dtype) or
+            pd.api.types.is_timedelta64_dtype(dtype))
+
+
+# int64 value of NaT in the `asi8` of datetime arrays.
+_NAT = np.iinfo(np.int64).min
+
+
+def ordered_values(ser):
+    """`ser`'s values as a numpy array that compares like them, with a missing-value test.
+
+    Numbers, booleans, datetimes (tz-aware ones as UTC nanoseconds) and timedeltas are
+    compared directly, nullable numbers once their missing values are filled.
+
+    Returns:
+        (values, missing), where ``missing(start, stop)`` is the mask of missing values
+        of ``values[start:stop]``, or None if there can't be any; or None if `ser`'s
+        dtype isn't supported.
+
+    """
+    dtype = ser.dtype
+    if isinstance(dtype, np.dtype):
+        values = ser.to_numpy()
+        if dtype.kind in "biu":
+            return values, None
+        if dtype.kind == "f":
+            return values, lambda start, stop: np.isnan(values[start:stop])
+        if dtype.kind in "mM":
+            return values, lambda start, stop: np.isnat(values[start:stop])
+        return None
+
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        values = ser.array.asi8
+        return values, lambda start, stop: values[start:stop] == _NAT
+    numpy_dtype = getattr(dtype, "numpy_dtype", None)  # nullable numbers and booleans
+    if isinstance(numpy_dtype, np.dtype) and numpy_dtype.kind in "biuf":
+        mask = ser.isna().to_numpy()
+        values = ser.to_numpy(dtype=numpy_dtype, na_value=0)
+        return values, lambda start, stop: mask[start:stop]
+    return None
+
+
+def adjacent_violations(values, op, missing=None, first=False, block_size=BLOCK_SIZE):
+    """Positions ``i`` where ``op(values[i], values[i - 1])`` doesn't hold.
+
+    Adjacent values are compared block by block, so no more than a block's worth of
+    memory is allocated. Pairs with a missing value in them are skipped.
+
+    Args:
+        values (np.ndarray): Values to compare, e.g. from `ordered_values`.
+        op (np.ufunc): Comparison that should hold between each value and the previous one.
+        missing (function): Missing-value test, as returned by `ordered_values`.
+        first (bool): Whether to stop at the first violation.
+        block_size (int): Number of pairs compared at a time.
+
+    Returns:
+        np.ndarray of the positions, in order.
+
+    """
+    found = []
+    for start in range(1, len(values), block_size):
+        stop = min(start + block_size, len(values))
+        bad = ~op(values[start:stop], values[start - 1:stop - 1])
+        if missing is not None and bad.any():
+            bad &= ~(missing(start, stop) | missing(start - 1, stop - 1))
+        hits = np.flatnonzero(bad)
+        if hits.size:
+            found.append(hits[:1] + start if first else hits + start)
+            if first:
+                break
+    return np.concatenate(found) if found else np.array([], dtype=np.intp)
+
+
+def monotonic_violations(ser, ops, first=False):
+    """Positions where `ser` breaks the comparison among `ops` that it breaks least.
+
+    Args:
+        ser (pd.Series): Column to check.
+        ops (tuple): Comparisons from `MONOTONIC_OPS`, any of which should hold.
+        first (bool): Whether to stop at the first violation.
+
+    Returns:
+        np.ndarray of the positions, in order; empty if `ser` is monotonic.
+
+    """
+    ordered = ordered_values(ser)
+
+    def positions(op, first):
+        if ordered is None:
+            diff = ser.diff()
+            bad = diff.notna() & ~op(diff, 0)
+            hits = np.flatnonzero(bad.to_numpy(dtype=bool))
+            return hits[:1] if first else hits
+        # pandas' monotonicity flags stop at the first violation and allocate nothing.
+        if (op is np.greater_equal and ser.is_monotonic_increasing or
+                op is np.less_equal and ser.is_monotonic_decreasing):
+            return np.array([], dtype=np.intp)
+        values, missing = ordered
+        return adjacent_violations(values, op, missing, first=first)
+
+    # Columns only need to hold for one of several comparisons, so look for one first.
+    firsts = []
+    for op in ops:
+        hits = positions(op, first or len(ops) > 1)
+        if not hits.size:
+            return hits
+        firsts.append(hits)
+    if first:
+        # Where the column stops being monotonic in either direction.
+        return max(firsts, key=lambda hits: hits[0])
+    if len(ops) == 1:
+        return firsts[0]
+    return min((positions(op, False) for op in ops), key=len)
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for running checks in parallel.
+
+Most column kernels used by the checks (numpy comparisons, ``isin``, hashing)
+release the GIL, so column-wise checks can spread their columns over a thread pool.
+
+Checks that mostly run Python code while holding the GIL (custom predicates,
+object-dtype ``isin``, ...) can instead run on worker processes with `ProcessBackend`.
+"""
+import os
+import pickle
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bulwark import engine
+from bulwark.generic import MAX_BAD_LOCATIONS, check_arguments
+from bulwark.results import ValidationResult
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+_THREAD_POOLS = {}
+_THREAD_POOLS_LOCK = threading.Lock()
+
+
+def _n_workers(n_jobs):
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def thread_pool(n_jobs):
+    """Returns a shared ThreadPoolExecutor with `n_jobs` workers (-1 for one per CPU)."""
+    n_workers = _n_workers(n_jobs)
+    with _THREAD_POOLS_LOCK:
+        if n_workers not in _THREAD_POOLS:
+            _THREAD_POOLS[n_workers] = ThreadPoolExecutor(
+                max_workers=n_workers, thread_name_prefix="bulwark")
+        return _THREAD_POOLS[n_workers]
+
+
+def map_columns(func, columns, n_jobs=None):
+    """Lazily maps `func` over `columns`, optionally on a thread pool.
+
+    Results are always returned in the order of ``columns``,
+    so errors found while iterating over them are reported in a fixed order.
+
+    Args:
+        func (function): Function of a single column (or item) of a check.
+        columns (list): Columns, or items, to map ``func`` over.
+        n_jobs (int or Executor): Number of threads to use; -1 uses one per CPU.
+                                  None or 1 runs in the calling thread.
+                                  An Executor is used as-is.
+
+    Returns:
+        Iterator over the results of ``func``.
+
+    """
+    columns = list(columns)
+    if isinstance(n_jobs, Executor):
+        return n_jobs.map(func, columns)
+    if n_jobs is None or _n_workers(n_jobs) == 1 or len(columns) < 2:
+        return map(func, columns)
+    return thread_pool(n_jobs).map(func, columns)
+
+
+# Checks that raise for their first failing column only, keyed to the argument holding
+# their columns, so they can be split into one task per column without changing errors.
+_SHARDABLE = {"has_vals_within_range": "items", "within_range": "items",
+              "has_vals_within_set": "items", "within_set": "items",
+              "unique": "columns", "has_dtypes": "items", "has_schema": "schema"}
+
+# Frame of each worker process, with the token of the call it belongs to and the shared
+# memory segments its columns are views of.
+_WORKER_TOKEN = None
+_WORKER_FRAME = None
+_WORKER_SEGMENTS = []
+
+_DEFAULT_BACKEND = None
+_DEFAULT_BACKEND_LOCK = threading.Lock()
+
+
+def _is_shareable(values):
+    return isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM"
+
+
+def _values(obj):
+    """numpy values of a pd.Series or pd.Index, or its ExtensionArray (e.g. tz-aware)."""
+    return obj.to_numpy() if isinstance(obj.dtype, np.dtype) else obj.array
+
+
+def _segment(size, segments):
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    segments.append(segment)
+    return segment
+
+
+def _publish(values, segments):
+    """Copies `values` into shared memory, pickled once if they aren't a numeric array."""
+    if not _is_shareable(values):
+        data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        segment = _segment(len(data), segments)
+        segment.buf[:len(data)] = data
+        return ("pickled", segment.name, len(data))
+
+    segment = _segment(values.nbytes, segments)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[...] = values
+    return ("shared", segment.name, values.dtype.str, values.shape)
+
+
+def _attach(entry):
+    segment = shared_memory.SharedMemory(name=entry[1])
+    if entry[0] == "pickled":
+        try:
+            return pickle.loads(segment.buf[:entry[2]])
+        finally:
+            segment.close()
+
+    _, _, dtype, shape = entry
+    _WORKER_SEGMENTS.append(segment)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _share_frame(df, segments):
+    """Describes `df` with its columns (and index) moved to shared memory."""
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_entry = ("range", index)
+    else:
+        index_entry = ("index", _publish(_values(index), segments), index.name)
+
+    columns = [_publish(_values(df.iloc[:, j]), segments) for j in range(df.shape[1])]
+    return {"index": index_entry, "columns": columns, "labels": df.columns}
+
+
+def _detach():
+    """Drops the worker's frame, and unmaps its segments unless views of them remain."""
+    global _WORKER_FRAME, _WORKER_TOKEN
+    _WORKER_FRAME = _WORKER_TOKEN = None
+    while _WORKER_SEGMENTS:
+        try:
+            _WORKER_SEGMENTS.pop().close()
+        except BufferError:  # still viewed, unmapped once garbage collected
+            pass
+
+
+def _attach_frame(token, spec):
+    """Sets the worker's frame to that of `spec`, unless it's already that of `token`."""
+    global _WORKER_FRAME, _WORKER_TOKEN
+    if token == _WORKER_TOKEN:
+        return
+    _detach()
+
+    index_entry = spec["index"]
+    if index_entry[0] == "range":
+        index = index_entry[1]
+    else:
+        index = pd.Index(_attach(index_entry[1]), name=index_entry[2], copy=False)
+
+    data = {j: _attach(entry) for j, entry in enumerate(spec["columns"])}
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.columns = spec["labels"]
+    _WORKER_FRAME, _WORKER_TOKEN = df, token
+
+
+def _summary(error):
+    """Picklable summary of a check's error: its type, check, column, count and positions."""
+    if isinstance(error, ValidationResult):
+        return (type(error), error.check, error.column, error.n_violations,
+                error.positions[:MAX_BAD_LOCATIONS], error.samples)
+    return type(error), None, None, None, (), ()
+
+
+def _run_task(token, spec, func, params):
+    """Runs a check on the frame of `spec`, returning the `_summary` of its error, if any."""
+    _attach_frame(token, spec)
+    errors = engine.run_checks(_WORKER_FRAME, {func: params})
+    return _summary(errors[0]) if errors else None
+
+
+def _rebuild(summary, df, func, params):
+    """The error summarised by a worker, whose message is rendered by checking `df` again."""
+    kind, check, column, n_violations, positions, samples = summary
+    if not issubclass(kind, ValidationResult):
+        kind = ValidationResult
+    if check is None:
+        check = getattr(func, "__name__", repr(func))
+
+    def render():
+        errors = engine.run_checks(df, {func: params})
+        return errors[0].args if errors else ()
+
+    return kind(check, column, n_violations, positions, samples, render)
+
+
+def _shards(df, func, params):
+    """Splits a check into per-column parameters, if that doesn't change its errors."""
+    key = _SHARDABLE.get(getattr(func, "__name__", None))
+    if key is None or getattr(func, "__module__", None) != "bulwark.checks":
+        return [params]
+
+    try:
+        arguments = check_arguments(func, params)
+    except TypeError:
+        return [params]
+
+    value = arguments[key]
+    if isinstance(value, dict):
+        return [dict(arguments, **{key: {col: v}}) for col, v in value.items()] or [params]
+    if key == "columns":
+        columns = df.columns if value is None else value
+        if pd.api.types.is_list_like(columns):
+            return [dict(arguments, columns=[col]) for col in columns] or [params]
+    return [params]
+
+
+class ProcessBackend(object):
+    """Runs checks on a pool of worker processes.
+
+    The frame's numpy-backed columns (and index) are copied once per call into
+    `multiprocessing.shared_memory`; the remaining (e.g. object) columns are pickled
+    once into shared memory too, and unpickled once per worker. Each task only carries
+    the segments' names. Workers run disjoint checks, or single columns of column-wise
+    checks, and send back a summary of their errors (the check, column, count and up to
+    `MAX_BAD_LOCATIONS` positions); their messages are rendered in the calling process,
+    by checking the frame again, only when used.
+
+    The pool is started by the first call and kept until `close`, so decorated functions
+    don't pay for starting workers on each call.
+
+    Check functions and their parameters must be picklable. Checks that aren't,
+    e.g. lambdas, run in the calling process.
+
+    Args:
+        n_jobs (int): Number of worker processes; -1 uses one per CPU.
+        mp_context: Optional multiprocessing context for the worker processes.
+
+    """
+
+    def __init__(self, n_jobs=-1, mp_context=None):
+        if shared_memory is None:
+            raise ImportError("ProcessBackend requires multiprocessing.shared_memory "
+                              "(Python 3.8+).")
+        self.n_jobs = n_jobs
+        self.mp_context = mp_context
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=_n_workers(self.n_jobs),
+                                                     mp_context=self.mp_context)
+            return self._executor
+
+    def close(self):
+        """Shuts the worker processes down; the next call starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def run_checks(self, df, checks):
+        """Runs each check in `checks` on `df` in worker processes.
+
+        Args:
+            df (pd.DataFrame): Any pd.DataFrame.
+            checks (dict): Mapping of check functions to parameters for those check functions.
+
+        Returns:
+            List of the AssertionErrors raised by failing checks, in the order of `checks`.
+
+        """
+        tasks, local = [], {}
+        for i, (func, params) in enumerate(checks.items()):
+            shards = _shards(df, func, params)
+            try:
+                pickle.dumps((func, shards))
+            except (pickle.PicklingError, AttributeError, TypeError):
+                local[i] = (func, params)
+                continue
+            tasks.extend((i, func, shard) for shard in shards)
+
+        failures = {}
+        if tasks:
+            segments = []
+            try:
+                spec = _share_frame(df, segments)
+                token = uuid.uuid4().hex
+                executor = self._pool()
+                futures = [(i, func, shard, executor.submit(_run_task, token, spec, func, shard))
+                           for i, func, shard in tasks]
+                for i, func, shard, future in futures:
+                    summary = future.result()
+                    if summary is not None and i not in failures:
+                        failures[i] = _rebuild(summary, df, func, shard)
+            finally:
+                for segment in segments:
+                    segment.close()
+                    segment.unlink()
+
+        errors = []
+        for i in range(len(checks)):
+            if i in local:
+                errors.extend(engine.run_checks(df, dict([local[i]])))
+            elif i in failures:
+                errors.append(failures[i])
+        return errors
+
+
+def default_backend():
+    """ProcessBackend with one worker per CPU shared by ``backend="process"`` users."""
+    global _DEFAULT_BACKEND
+    with _DEFAULT_BACKEND_LOCK:
+        if _DEFAULT_BACKEND is None:
+            _DEFAULT_BACKEND = ProcessBackend()
+        return _DEFAULT_BACKEND
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of Parquet files from the statistics in their footer.
+
+The footer of a Parquet file stores the number of rows of each row group, and the null
+count, min and max of each of its column chunks. `ParquetValidator` decides each check
+from them where it can, and only reads (and decodes) the row groups, and columns, whose
+statistics can't prove a pass:
+
+- `has_no_nans` and `has_no_nones` pass on row groups without nulls, except in float
+  columns for `has_no_nans`, since Parquet doesn't count NaNs as nulls,
+- `has_vals_within_range` passes on row groups whose min and max are within range,
+- `is_monotonic` passes on row groups of a single value whose value follows that of the
+  previous row group, or, with ``trust_sorting=True``, on row groups that the writer
+  declares sorted by the column (their first ``sorting_columns``) in the right direction.
+  Other row groups are read and checked one at a time, carrying their first and last
+  values over to compare across row group boundaries.
+- `has_columns` and `is_shape` are decided from the footer's schema and row counts alone.
+
+Row groups are read one at a time, so memory is bounded by the largest row group.
+Statistics only prove passes (see `bulwark.generic.CheckRegistry`): once a check may
+fail, it is run on the columns it references of the whole file, so the row labels in its
+error messages are those of the file. Any other check is run that way too.
+
+pyarrow is an optional dependency.
+"""
+import abc
+import types
+
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark import engine, kernels
+from bulwark.generic import CheckRegistry, LabeledFrame, referenced_columns
+from bulwark.results import ValidationReport
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Plans, see `_RowGroupPlan`, are built from a `_Footer` and the check function.
+_PLANS = CheckRegistry()
+_pushes_down = _PLANS.register
+
+
+class _Footer(LabeledFrame):
+    """Schema, row counts and column chunk statistics of a `pq.ParquetFile`.
+
+    Args:
+        parquet_file (pq.ParquetFile): The file to validate.
+        trust_sorting (bool): Whether row groups are taken to be sorted as their
+                              ``sorting_columns`` say.
+
+    """
+
+    def __init__(self, parquet_file, trust_sorting=False):
+        self.file = parquet_file
+        self.metadata = parquet_file.metadata
+        self.trust_sorting = trust_sorting
+        # The frame the file reads as, without any rows.
+        self.empty = parquet_file.schema_arrow.empty_table().to_pandas()
+        self.labels = list(self.empty.columns)
+        schema = self.metadata.schema
+        self._paths = [schema.column(j).path for j in range(len(schema))]
+        self._positions = {path: j for j, path in enumerate(self._paths)}
+
+    @property
+    def num_row_groups(self):
+        return self.metadata.num_row_groups
+
+    def num_rows(self, i):
+        return self.metadata.row_group(i).num_rows
+
+    def has_field(self, col):
+        """Whether `col` is a top-level column of the file that can be read by name."""
+        return isinstance(col, str) and col in self._positions and col in self.labels
+
+    def is_float(self, col):
+        return pa.types.is_floating(self.file.schema_arrow.field(col).type)
+
+    def is_comparable(self, col):
+        """Whether `col`'s min and max compare to its values as pandas reads them."""
+        dtype = self.empty[col].dtype
+        return not (isinstance(dtype, pd.CategoricalDtype) or
+                    pd.api.types.is_timedelta64_dtype(dtype))
+
+    def is_ordered(self, col):
+        """Whether `is_monotonic` compares `col`'s values one by one, see `kernels`."""
+        return kernels.ordered_values(self.empty[col]) is not None
+
+    def statistics(self, i, col):
+        """Statistics of `col` in row group `i`, or None if it has no null count."""
+        stats = self.metadata.row_group(i).column(self._positions[col]).statistics
+        if stats is None or not stats.has_null_count:
+            return None
+        return stats
+
+    def sorted_descending(self, i, col):
+        """Whether row group `i` is declared sorted descending by `col`, or None if it isn't
+        declared sorted by it (or sortedness isn't trusted)."""
+        if not self.trust_sorting:
+            return None
+        # Later sorting columns are only sorted within ties of the first one.
+        sorting = getattr(self.metadata.row_group(i), "sorting_columns", ())[:1]
+        for column in sorting:
+            if self._paths[column.column_index] == col:
+                return column.descending
+        return None
+
+    def read_row_group(self, i, columns):
+        return self.file.read_row_group(i, columns=columns).to_pandas()
+
+    def read(self, func, params):
+        """The whole file as a pd.DataFrame, only reading the columns `func` looks at."""
+        columns = None
+        if getattr(func, "__module__", None) == "bulwark.checks":
+            columns = referenced_columns(self.empty, params)
+            if not all(isinstance(col, str) for col in columns):
+                columns = None
+        return self.file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+
+
+class _RowGroupPlan(abc.ABC):
+    """Plan running the check itself on each row group that has to be read.
+
+    `columns` lists the columns a plan reads, `prove(i)` returns whether statistics prove
+    the check on row group ``i``, `update(i, frame)` checks a row group that had to be
+    read, and `passed` turns False as soon as the check may fail.
+    """
+
+    def __init__(self, footer, func, arguments, columns):
+        self.footer = footer
+        self.func = func
+        self.arguments = arguments
+        self.columns = columns
+        self.passed = columns is not None and all(footer.has_field(col) for col in columns)
+
+    @abc.abstractmethod
+    def prove(self, i):
+        """Whether row group ``i``'s statistics prove the check passes on it."""
+
+    def update(self, i, frame):
+        try:
+            self.func(frame, **self.arguments)
+        except AssertionError:
+            self.passed = False
+
+
+@_pushes_down("has_no_nans", "has_no_nones")
+class _NoNullsPlan(_RowGroupPlan):
+    def __init__(self, footer, func, columns=None):
+        super(_NoNullsPlan, self).__init__(footer, func, {"columns": columns},
+                                           footer.columns(columns))
+
+    def prove(self, i):
+        for col in self.columns:
+            stats = self.footer.statistics(i, col)
+            if stats is None or stats.null_count:
+                return False
+            if self.func is ck.has_no_nans and self.footer.is_float(col):
+                return False
+        return True
+
+
+@_pushes_down("has_vals_within_range", "within_range")
+class _WithinRangePlan(_RowGroupPlan):
+    def __init__(self, footer, func, items=None):
+        super(_WithinRangePlan, self).__init__(footer, func, {"items": items}, list(items))
+        self.items = items
+        self.passed = self.passed and all(footer.is_comparable(col) for col in items)
+
+    def prove(self, i):
+        for col, (lower, upper) in self.items.items():
+            stats = self.footer.statistics(i, col)
+            if stats is None:
+                return False
+            if not stats.has_min_max:
+                # Nulls are never outside the range.
+                if stats.null_count == self.footer.num_rows(i):
+                    continue
+                return False
+            try:
+                if not (lower <= stats.min and stats.max <= upper):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+
+def _in_order(previous, following, increasing, strict):
+    """Whether adjacent values `previous` and `following` don't break monotonicity."""
+    # The check skips pairs with a missing value.
+    if previous is None or following is None or pd.isna(previous) or pd.isna(following):
+        return True
+    try:
+        return bool(kernels.MONOTONIC_OPS[(increasing, strict)][0](following, previous))
+    except TypeError:
+        return False
+
+
+@_pushes_down("is_monotonic")
+class _MonotonicPlan(_RowGroupPlan):
+    def __init__(self, footer, func, items=None, increasing=None, strict=False, n_jobs=None,
+                 fail_fast=False):
+        if items is None:
+            items = {col: (increasing, strict) for col in footer.labels}
+        super(_MonotonicPlan, self).__init__(footer, func, {}, list(items))
+        self.items = items
+        self.n_jobs = n_jobs
+        self.passed = self.passed and all(footer.is_ordered(col) for col in items)
+        # Directions each column can still be monotonic in, for `increasing=None`.
+        self.directions = {col: (True, False) if increasing is None else (increasing,)
+                           for col, (increasing, strict) in items.items()}
+        # Last value of the previous non-empty row group of each column.
+        self.last = {}
+
+    def _ends(self, i, col, strict):
+        """(first value, last value, directions it is monotonic in) of `col` in row group
+        `i`, known from statistics, or None if they aren't."""
+        stats = self.footer.statistics(i, col)
+        n_rows = self.footer.num_rows(i)
+        if stats is None:
+            return None
+        if stats.null_count == n_rows:
+            return None, None, (True, False)
+        if stats.null_count or not stats.has_min_max:
+            return None
+        if stats.min == stats.max and (n_rows == 1 or not strict):
+            return stats.min, stats.max, (True, False)
+        descending = None if strict else self.footer.sorted_descending(i, col)
+        if descending is False:
+            return stats.min, stats.max, (True,)
+        if descending is True:
+            return stats.max, stats.min, (False,)
+        return None
+
+    def _advance(self, col, first, last, directions):
+        strict = self.items[col][1]
+        previous = self.last.get(col)
+        self.directions[col] = tuple(
+            increasing for increasing in self.directions[col]
+            if increasing in directions and _in_order(previous, first, increasing, strict))
+        self.last[col] = last
+        if not self.directions[col]:
+            self.passed = False
+
+    def prove(self, i):
+        if not self.footer.num_rows(i):
+            return True
+        ends = {}
+        for col, (_, strict) in self.items.items():
+            ends[col] = self._ends(i, col, strict)
+            if ends[col] is None:
+                return False
+        for col, (first, last, directions) in ends.items():
+            self._advance(col, first, last, directions)
+        return True
+
+    def update(self, i, frame):
+        for col, (_, strict) in self.items.items():
+            directions = []
+            for increasing in self.directions[col]:
+                try:
+                    ck.is_monotonic(frame, items={col: (increasing, strict)},
+                                    n_jobs=self.n_jobs, fail_fast=True)
+                except AssertionError:
+                    continue
+                directions.append(increasing)
+            values = frame[col]
+            self._advance(col, values.iloc[0], values.iloc[-1], directions)
+
+
+# Checks decided from the footer alone, on a stand-in for the frame with the same
+# columns, or the same shape.
+_FROM_FOOTER = {
+    "has_columns": lambda footer: footer.empty,
+    "is_shape": lambda footer: types.SimpleNamespace(
+        shape=(footer.metadata.num_rows, len(footer.labels))),
+}
+
+
+class ParquetValidator(object):
+    """Validates Parquet files, reading only the row groups their statistics can't clear.
+
+    Args:
+        checks (dict): Mapping of check functions to parameters for those check functions,
+                       as in `bulwark.checks.multi_check`.
+        trust_sorting (bool): Whether `is_monotonic` may take row groups to be sorted as
+                              their ``sorting_columns`` declare, without reading them.
+                              Default is False, since writers don't verify the claim.
+
+    `n_row_groups` and `n_row_groups_read` count the row groups of the files validated
+    so far, and those that had to be read.
+
+    Raises:
+        ImportError: If pyarrow isn't installed.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> validator = ParquetValidator({ck.has_no_nans: {"columns": ["id"]},
+        ...                               ck.has_vals_within_range: {"items": {"id": (0, 99)}}})
+        >>> validator.validate("part-0.parquet")  # doctest: +SKIP
+        'part-0.parquet'
+
+    """
+
+    def __init__(self, checks, trust_sorting=False):
+        if pq is None:
+            raise ImportError("ParquetValidator requires pyarrow.")
+        self.checks = checks
+        self.trust_sorting = trust_sorting
+        self.n_row_groups = 0
+        self.n_row_groups_read = 0
+
+    def run_checks(self, source):
+        """Runs each check on the Parquet file `source`, from its statistics where possible.
+
+        Args:
+            source (str, path, file-like or pq.ParquetFile): The Parquet file to check.
+
+        Returns:
+            List of the AssertionErrors raised by failing checks, in the order of `checks`.
+
+        """
+        parquet_file = source if isinstance(source, pq.ParquetFile) else pq.ParquetFile(source)
+        footer = _Footer(parquet_file, self.trust_sorting)
+        plans = {func: _PLANS.attempt(func, params, footer, func)
+                 for func, params in self.checks.items()}
+
+        live = [plan for plan in plans.values() if plan is not None and plan.passed]
+        for i in range(footer.num_row_groups):
+            self.n_row_groups += 1
+            pending = [plan for plan in live if plan.passed and not plan.prove(i)]
+            if not pending:
+                continue
+            columns = list(dict.fromkeys(col for plan in pending for col in plan.columns))
+            frame = footer.read_row_group(i, columns)
+            self.n_row_groups_read += 1
+            for plan in pending:
+                plan.update(i, frame)
+
+        errors = []
+        for func, params in self.checks.items():
+            plan = plans[func]
+            if plan is not None and plan.passed:
+                continue
+            name = getattr(func, "__name__", None)
+            if getattr(func, "__module__", None) == "bulwark.checks" and name in _FROM_FOOTER:
+                try:
+                    func(_FROM_FOOTER[name](footer), **params)
+                except AssertionError as e:
+                    errors.append(e)
+                continue
+            errors.extend(engine.run_checks(footer.read(func, params), {func: params}))
+        return errors
+
+    def validate(self, source, warn=False):
+        """Asserts that the Parquet file `source` passes all checks.
+
+        Args:
+            source (str, path, file-like or pq.ParquetFile): The Parquet file to check.
+            warn (bool): Indicates whether an error should be raised
+                         or only a warning notification should be displayed.
+                         Default is to error.
+
+        Returns:
+            Original `source`.
+
+        """
+        error_msgs = self.run_checks(source)
+        if warn and error_msgs:
+            print(error_msgs)
+        elif error_msgs:
+            raise ValidationReport(error_msgs)
+        return source
+
+
+def validate_parquet(source, checks, warn=False, trust_sorting=False):
+    """Asserts that the Parquet file `source` passes all `checks`, see `ParquetValidator`.
+
+    Args:
+        source (str, path, file-like or pq.ParquetFile): The Parquet file to check.
+        checks (dict): Mapping of check functions to parameters for those check functions.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+        trust_sorting (bool): Whether row groups are taken to be sorted as their
+                              ``sorting_columns`` declare.
+
+    Returns:
+        Original `source`.
+
+    """
+    return ParquetValidator(checks, trust_sorting).validate(source, warn)
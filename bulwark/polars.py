@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Execution of checks on polars DataFrames and LazyFrames.
+
+`PolarsBackend` turns every check it knows into polars expressions that evaluate to
+True only if the check passes, and evaluates the expressions of a whole suite in a
+single ``select``, so polars' multithreaded engine runs them together.
+On a ``LazyFrame``, the query only projects the columns the checks reference,
+so nothing else is read from its source:
+
+- `has_no_nans`, `has_no_nones`, `has_no_infs` and `has_no_neg_infs`,
+- `has_vals_within_range`, `has_vals_within_set` and `has_set_within_vals`,
+- `unique` and `is_monotonic`, and
+- `has_columns` and `is_shape`, which only need the schema and row count.
+
+Expressions only prove passes (see `bulwark.generic.CheckRegistry`). Failing checks and
+any other check are run on a pd.DataFrame holding only the columns the check references.
+
+polars is an optional dependency; converting columns to pandas also requires pyarrow.
+"""
+import operator
+import types
+
+import numpy as np
+import pandas as pd
+
+from bulwark import engine
+from bulwark.generic import CheckRegistry, LabeledFrame, referenced_columns
+from bulwark.kernels import MONOTONIC_OPS
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Translations take a `PolarsFrame` and return a list of boolean scalar expressions that
+# are all True only if the check passes, or None if the check can't be translated.
+_EXPRESSIONS = CheckRegistry()
+_expresses = _EXPRESSIONS.register
+
+
+# Checks that look at every column of the frame, whatever columns they name.
+_WHOLE_FRAME = {"is_shape"}
+
+
+class PolarsFrame(LabeledFrame):
+    """Schema of a polars DataFrame or LazyFrame, and conversion of its columns to pandas.
+
+    Args:
+        data (pl.DataFrame or pl.LazyFrame): The checked data.
+
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.is_lazy = isinstance(data, pl.LazyFrame)
+        self.schema = data.collect_schema() if self.is_lazy else data.schema
+        self.labels = list(self.schema.names())
+
+    def column(self, col):
+        """`pl.col(col)`, with NaNs of float columns as nulls, or None if `col` is missing.
+
+        pandas never finds NaN outside ranges or out of order, and counts it as a null,
+        while polars orders it above every number.
+        """
+        try:
+            dtype = self.schema.get(col)
+        except TypeError:  # unhashable label
+            return None
+        if dtype is None:
+            return None
+        expr = pl.col(col)
+        return expr.fill_nan(None) if dtype.is_float() else expr
+
+    def is_float(self, col):
+        return self.schema[col].is_float()
+
+    def select(self, exprs):
+        """Evaluates `exprs` in a single query, returning a one-row pl.DataFrame."""
+        result = self.data.select(exprs)
+        return result.collect() if self.is_lazy else result
+
+    def to_pandas(self, func, params):
+        """The data as a pd.DataFrame, only converting the columns `func` looks at."""
+        data = self.data
+        name = getattr(func, "__name__", None)
+        if getattr(func, "__module__", None) == "bulwark.checks" and name == "has_columns":
+            return pd.DataFrame(columns=self.labels)  # only the labels are checked
+        if getattr(func, "__module__", None) == "bulwark.checks" and name not in _WHOLE_FRAME:
+            data = data.select(referenced_columns(types.SimpleNamespace(columns=self.labels),
+                                                  params))
+        return (data.collect() if self.is_lazy else data).to_pandas()
+
+
+def _has_missing(values):
+    return any(value is None or (isinstance(value, float) and np.isnan(value))
+               for value in values)
+
+
+@_expresses("has_no_nans", "has_no_nones")
+def _no_nulls(frame, columns=None):
+    columns = frame.columns(columns)
+    if columns is None:
+        return None
+    exprs = []
+    for col in columns:
+        expr = frame.column(col)
+        if expr is None:
+            return None
+        exprs.append(expr.null_count() == 0)
+    return exprs
+
+
+def _no_inf(frame, columns, sign):
+    columns = frame.columns(columns)
+    if columns is None:
+        return None
+    exprs = []
+    for col in columns:
+        if frame.column(col) is None:
+            return None
+        # Only float columns can hold infinities.
+        if frame.is_float(col):
+            exprs.append((pl.col(col) == sign * np.inf).any().not_())
+    return exprs
+
+
+@_expresses("has_no_infs")
+def _no_infs(frame, columns=None):
+    return _no_inf(frame, columns, 1)
+
+
+@_expresses("has_no_neg_infs")
+def _no_neg_infs(frame, columns=None):
+    return _no_inf(frame, columns, -1)
+
+
+@_expresses("has_vals_within_range", "within_range")
+def _within_range(frame, items=None):
+    exprs = []
+    for col, (lower, upper) in items.items():
+        expr = frame.column(col)
+        if expr is None:
+            return None
+        # Nulls are never outside the range, so all-null columns pass.
+        exprs.append((expr.min() >= lower).fill_null(True))
+        exprs.append((expr.max() <= upper).fill_null(True))
+    return exprs
+
+
+@_expresses("has_vals_within_set", "within_set")
+def _within_set(frame, items=None):
+    exprs = []
+    for col, values in items.items():
+        values = list(values)
+        if frame.column(col) is None or _has_missing(values):
+            return None
+        exprs.append(pl.col(col).is_in(values).fill_null(False).all())
+    return exprs
+
+
+@_expresses("has_set_within_vals")
+def _set_within_vals(frame, items):
+    exprs = []
+    for col, values in items.items():
+        values = list(values)
+        if frame.column(col) is None or _has_missing(values):
+            return None
+        exprs.extend((pl.col(col) == value).any() for value in values)
+    return exprs
+
+
+@_expresses("unique")
+def _unique(frame, columns=None, approx=False):
+    if approx:  # n_unique hashes whole columns
+        return None
+    columns = frame.columns(columns)
+    if columns is None:
+        return None
+    exprs = []
+    for col in columns:
+        expr = frame.column(col)
+        if expr is None:
+            return None
+        exprs.append(expr.n_unique() == pl.len())
+    return exprs
+
+
+# Python operators of the comparisons in `MONOTONIC_OPS`, which build polars expressions.
+# Pairs with a null in them are skipped, as the check skips missing values.
+_OPERATORS = {np.greater: operator.gt, np.greater_equal: operator.ge,
+              np.less: operator.lt, np.less_equal: operator.le}
+
+
+@_expresses("is_monotonic")
+def _monotonic(frame, items=None, increasing=None, strict=False):
+    if items is None:
+        items = {col: (increasing, strict) for col in frame.labels}
+
+    exprs = []
+    for col, (increasing, strict) in items.items():
+        expr = frame.column(col)
+        if expr is None or not (frame.schema[col].is_numeric() or
+                                frame.schema[col].is_temporal()):
+            return None
+        checks = [_OPERATORS[op](expr, expr.shift(1)).all()
+                  for op in MONOTONIC_OPS[(increasing, strict)]]
+        exprs.append(pl.any_horizontal(checks) if len(checks) > 1 else checks[0])
+    return exprs
+
+
+@_expresses("has_columns")
+def _has_columns(frame, columns, exact_cols=False, exact_order=False):
+    labels, expected = frame.labels, list(columns)
+    if exact_order:
+        passes = labels[:len(expected)] == expected and (
+            not exact_cols or len(labels) == len(expected))
+    else:
+        passes = set(expected) <= set(labels) and (not exact_cols or set(labels) <= set(expected))
+    return [] if passes else None
+
+
+@_expresses("is_shape")
+def _is_shape(frame, shape):
+    n_rows, n_columns = shape
+    if n_columns not in (None, -1) and n_columns != len(frame.labels):
+        return None
+    return [] if n_rows in (None, -1) else [pl.len() == n_rows]
+
+
+def _all_true(row):
+    return all(value is True for value in row)
+
+
+class PolarsBackend(object):
+    """Runs checks on polars DataFrames and LazyFrames with polars expressions.
+
+    Use it directly, or as the ``backend`` of `bulwark.checks.multi_check` and of the
+    decorators (``backend="polars"``) for functions returning polars frames.
+
+    Raises:
+        ImportError: If polars isn't installed.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import polars as pl
+        >>> lf = pl.LazyFrame({"a": [1, 2, 3], "b": ["x", "y", "x"]})
+        >>> PolarsBackend().run_checks(lf, {ck.unique: {"columns": ["a"]},
+        ...                                 ck.has_vals_within_range: {"items": {"a": (0, 3)}}})
+        []
+
+    """
+
+    def __init__(self):
+        if pl is None:
+            raise ImportError("PolarsBackend requires polars.")
+
+    def run_checks(self, df, checks):
+        """Runs each check in `checks` on `df`, evaluating all their expressions at once.
+
+        Args:
+            df (pl.DataFrame or pl.LazyFrame): The data to check.
+            checks (dict): Mapping of check functions to parameters for those check functions.
+
+        Returns:
+            List of the AssertionErrors raised by failing checks, in the order of `checks`.
+
+        """
+        frame = PolarsFrame(df)
+        translated = [_EXPRESSIONS.attempt(func, params, frame) for func, params in checks.items()]
+
+        exprs, spans = [], []
+        for check_exprs in translated:
+            if check_exprs is None:
+                spans.append(None)
+                continue
+            start = len(exprs)
+            spans.append((start, start + len(check_exprs)))
+            exprs.extend(expr.alias("_{}".format(start + i)) for i, expr in enumerate(check_exprs))
+
+        passed = [False] * len(spans)
+        if exprs:
+            try:
+                row = frame.select(exprs).row(0)
+                passed = [span is not None and _all_true(row[span[0]:span[1]])
+                          for span in spans]
+            except pl.exceptions.PolarsError:
+                # An expression polars can't evaluate, e.g. comparing strings to numbers;
+                # evaluate each check on its own instead.
+                passed = [span is not None and self._passes(frame, exprs[span[0]:span[1]])
+                          for span in spans]
+        else:
+            passed = [span is not None for span in spans]
+
+        errors = []
+        for (func, params), check_passed in zip(checks.items(), passed):
+            if not check_passed:
+                errors.extend(engine.run_checks(frame.to_pandas(func, params), {func: params}))
+        return errors
+
+    @staticmethod
+    def _passes(frame, exprs):
+        if not exprs:
+            return True
+        try:
+            return _all_true(frame.select(exprs).row(0))
+        except pl.exceptions.PolarsError:
+            return False
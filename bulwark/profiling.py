@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of the checks run by decorators and `bulwark.checks.multi_check`.
+
+Hooks registered with `add_hook` are called with a `CheckEvent` after every check
+run by a decorator (`bulwark.decorators.BaseDecorator` and `CustomCheck`) and after
+each check of a `multi_check` suite, whether it passed or not. While no hooks are
+registered, nothing is measured. Checks run on a `bulwark.parallel.ProcessBackend`
+are only reported as a whole, by the decorator that runs them.
+
+`CheckProfiler` is a hook that aggregates events into per-check latency histograms::
+
+    with CheckProfiler(trace_memory=True) as profiler:
+        run_pipeline()
+    profiler.dump()
+
+Peak allocations are measured with `tracemalloc`, and only while it is tracing
+(``trace_memory=True`` starts it for the profiler's lifetime). Tracing slows down
+allocation-heavy checks noticeably, so leave it off when only timings are needed.
+
+tracemalloc's peak is global to the process, so only one thread's checks (and the
+checks nested in them) are measured at a time: checks starting in other threads
+meanwhile report no peak (``peak_bytes=None``), and allocations made by other threads
+during a measured check count towards its peak.
+"""
+import collections
+import math
+import sys
+import threading
+import time
+import tracemalloc
+
+from bulwark.generic import referenced_columns
+
+CheckEvent = collections.namedtuple(
+    "CheckEvent",
+    ["name", "check_func", "func", "n_rows", "n_columns", "seconds", "peak_bytes", "passed"])
+CheckEvent.__doc__ = """A single run of a check.
+
+Attributes:
+    name (str): Name of the check function.
+    check_func (function): The check function.
+    func (function): The decorated function whose result was checked,
+                     or None for checks run by `multi_check`.
+    n_rows (int): Number of rows checked, after any row sampling,
+                  or None if the frame's length isn't known.
+    n_columns (int): Number of columns the check looks at.
+    seconds (float): Wall time of the check.
+    peak_bytes (int): Peak memory allocated during the check,
+                      or None if `tracemalloc` wasn't tracing.
+    passed (bool): Whether the check passed.
+
+"""
+
+_HOOKS = []
+_HOOKS_LOCK = threading.Lock()
+
+# Absolute tracemalloc peaks of the checks being measured in each thread, innermost last,
+# so a check's peak includes those of nested checks that reset it.
+_STACK = threading.local()
+
+# Held by the thread whose checks' peaks are being measured, once per measured check.
+_MEMORY_LOCK = threading.RLock()
+
+
+def add_hook(hook):
+    """Registers `hook`, a function of a `CheckEvent`, to be called after every check."""
+    with _HOOKS_LOCK:
+        _HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """Unregisters a hook added by `add_hook`."""
+    with _HOOKS_LOCK:
+        _HOOKS.remove(hook)
+
+
+def _n_rows(df):
+    try:
+        return len(df)
+    except TypeError:  # e.g. a polars LazyFrame, whose length isn't known
+        return None
+
+
+def _n_columns(df, check_func, params):
+    if getattr(check_func, "__module__", None) == "bulwark.checks":
+        return len(referenced_columns(df, params))
+    return df.shape[1]
+
+
+class _Measurement(object):
+    """Context manager timing a check and passing its `CheckEvent` to the hooks."""
+
+    def __init__(self, df, check_func, params, func):
+        self.df = df
+        self.check_func = check_func
+        self.params = params
+        self.func = func
+
+    def __enter__(self):
+        # Other threads' checks would reset the peak, so they aren't measured meanwhile.
+        self.tracing = tracemalloc.is_tracing() and _MEMORY_LOCK.acquire(blocking=False)
+        if self.tracing:
+            stack = _STACK.__dict__.setdefault("peaks", [])
+            stack.append(0)
+            self.start_bytes = tracemalloc.get_traced_memory()[0]
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = None
+        if self.tracing:
+            try:
+                stack = _STACK.peaks
+                peak = stack.pop()
+                # Tracing may have been stopped by the check.
+                if tracemalloc.is_tracing():
+                    peak = max(tracemalloc.get_traced_memory()[1], peak)
+                    if stack:
+                        stack[-1] = max(stack[-1], peak)
+                    peak_bytes = max(peak - self.start_bytes, 0)
+            finally:
+                _MEMORY_LOCK.release()
+
+        event = CheckEvent(name=getattr(self.check_func, "__name__", repr(self.check_func)),
+                           check_func=self.check_func, func=self.func,
+                           n_rows=_n_rows(self.df),
+                           n_columns=_n_columns(self.df, self.check_func, self.params),
+                           seconds=seconds, peak_bytes=peak_bytes,
+                           passed=exc_type is None)
+        for hook in list(_HOOKS):
+            hook(event)
+        return False
+
+
+class _NoMeasurement(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_MEASUREMENT = _NoMeasurement()
+
+
+def measure(df, check_func, params, func=None):
+    """Context manager reporting the check run in its body to the registered hooks.
+
+    Args:
+        df (pd.DataFrame): The checked pd.DataFrame.
+        check_func (function): The check function.
+        params (dict): Keyword arguments of the check.
+        func (function): The decorated function whose result is checked, if any.
+
+    Returns:
+        A context manager; a no-op one if no hooks are registered.
+        The check counts as failed if its body raises.
+
+    """
+    if not _HOOKS:
+        return _NO_MEASUREMENT
+    return _Measurement(df, check_func, params, func)
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1.), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "{:.3g}{}".format(seconds / scale, unit)
+    return "{:.3g}us".format(seconds / 1e-6)
+
+
+def _format_bytes(n_bytes):
+    if n_bytes is None:
+        return "n/a"
+    for unit, scale in (("GB", 1 << 30), ("MB", 1 << 20), ("kB", 1 << 10)):
+        if n_bytes >= scale:
+            return "{:.3g}{}".format(n_bytes / scale, unit)
+    return "{}B".format(n_bytes)
+
+
+class CheckStats(object):
+    """Running statistics of a check's events, with a histogram of its latencies.
+
+    Latencies are counted in buckets whose upper bounds are powers of two
+    multiples of ``1e-6`` seconds, so memory stays constant however many events
+    are recorded, and quantiles are exact up to a factor of two.
+    """
+
+    # Upper bound of the first bucket, in seconds.
+    RESOLUTION = 1e-6
+
+    def __init__(self):
+        self.count = 0
+        self.n_failed = 0
+        self.total_seconds = 0.
+        self.max_seconds = 0.
+        self.total_rows = 0
+        self.peak_bytes = None
+        self.buckets = collections.Counter()
+
+    def add(self, event):
+        self.count += 1
+        self.n_failed += not event.passed
+        self.total_seconds += event.seconds
+        self.max_seconds = max(self.max_seconds, event.seconds)
+        self.total_rows += event.n_rows or 0
+        if event.peak_bytes is not None:
+            self.peak_bytes = max(self.peak_bytes or 0, event.peak_bytes)
+        self.buckets[self._bucket(event.seconds)] += 1
+
+    def _bucket(self, seconds):
+        if seconds <= self.RESOLUTION:
+            return 0
+        return int(math.ceil(math.log2(seconds / self.RESOLUTION)))
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.count if self.count else 0.
+
+    def histogram(self):
+        """List of (upper bound in seconds, count) of the non-empty latency buckets."""
+        return [(self.RESOLUTION * 2 ** i, self.buckets[i]) for i in sorted(self.buckets)]
+
+    def quantile(self, q):
+        """Upper bound, in seconds, of the bucket holding the `q` quantile of latencies."""
+        if not self.count:
+            return 0.
+        rank = q * self.count
+        seen = 0
+        for upper, count in self.histogram():
+            seen += count
+            if seen >= rank:
+                return min(upper, self.max_seconds)
+        return self.max_seconds
+
+
+class CheckProfiler(object):
+    """Hook aggregating `CheckEvent`\\ s into per-check `CheckStats`.
+
+    Use it as a context manager to register it for the duration of a block,
+    or register it with `add_hook`.
+
+    Args:
+        trace_memory (bool): Whether to trace allocations with `tracemalloc` while
+                             used as a context manager, to record peak memory.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> with CheckProfiler() as profiler:
+        ...     _ = ck.multi_check(pd.DataFrame({"a": [1, 2]}), {ck.unique: {}})
+        >>> profiler.stats["unique"].count
+        1
+
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stats = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def __call__(self, event):
+        with self._lock:
+            if event.name not in self.stats:
+                self.stats[event.name] = CheckStats()
+            self.stats[event.name].add(event)
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        add_hook(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_hook(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def reset(self):
+        """Forgets all recorded events."""
+        with self._lock:
+            self.stats.clear()
+
+    def dump(self, file=None, width=40):
+        """Writes a summary and latency histogram of each check, slowest in total first.
+
+        Args:
+            file: Text stream to write to. Default is `sys.stdout`.
+            width (int): Width of the longest histogram bar.
+
+        """
+        file = sys.stdout if file is None else file
+        with self._lock:
+            stats = sorted(self.stats.items(), key=lambda item: -item[1].total_seconds)
+        for name, check_stats in stats:
+            file.write("{}: {} calls, {} failed, total {}, mean {}, p50 {}, p99 {}, "
+                       "max {}, peak {}\n"
+                       .format(name, check_stats.count, check_stats.n_failed,
+                               _format_seconds(check_stats.total_seconds),
+                               _format_seconds(check_stats.mean_seconds),
+                               _format_seconds(check_stats.quantile(.5)),
+                               _format_seconds(check_stats.quantile(.99)),
+                               _format_seconds(check_stats.max_seconds),
+                               _format_bytes(check_stats.peak_bytes)))
+            histogram = check_stats.histogram()
+            most = max(count for _, count in histogram)
+            for upper, count in histogram:
+                bar = "#" * max(int(round(width * count / most)), 1)
+                file.write("  <= {:>8} | {:<{width}} {}\n"
+                           .format(_format_seconds(upper), bar, count, width=width))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Structured outcomes of checks, whose messages are only rendered when asked for.
+
+Checks used to raise AssertionErrors whose arguments, e.g. the values outside a set or
+a boolean mask of the whole column, were built before anyone looked at them, and
+`multi_check` then formatted each one. `ValidationResult` instead keeps the check's
+name, the column, the number of violations, their row positions as an integer array and
+a few sample values, and only builds (and formats) the usual arguments when its `args`
+or its text are used. `ValidationReport` gathers the results of several checks just as
+lazily.
+
+Both are AssertionErrors, so checks still raise them as before. `check_result` and
+``multi_check(..., report=True)`` return them instead of raising::
+
+    report = ck.multi_check(df, checks, report=True)
+    if not report.passed:
+        log.warning("%d checks failed", len(report.failures))
+"""
+import numpy as np
+
+# Number of violating values kept as examples.
+MAX_SAMPLES = 5
+
+
+class ValidationResult(AssertionError):
+    """Outcome of one check, raised when it fails, with its message rendered lazily.
+
+    Args:
+        check (str): Name of the check.
+        column: Label of the column with violations, or None if they aren't in one column.
+        n_violations (int): Number of violations, 0 if the check passed,
+                            or None if the check didn't count them.
+        positions (np.ndarray): Row positions of the violations, or of those kept.
+        samples (list): A few of the violating values.
+        render (function): Builds the exception's arguments when they're first needed.
+
+    """
+
+    def __init__(self, check=None, column=None, n_violations=0, positions=(), samples=(),
+                 render=None):
+        super(ValidationResult, self).__init__()
+        self.check = check
+        self.column = column
+        self.n_violations = n_violations
+        self.positions = np.asarray(positions, dtype=np.intp)
+        self.samples = list(samples)
+        self._render = render
+        self._args = None
+
+    @classmethod
+    def from_error(cls, check, error):
+        """Result of the failed check named `check` that raised `error`."""
+        if isinstance(error, cls):
+            error.check = check
+            return error
+        result = cls(check, n_violations=None)
+        result.args = error.args
+        return result
+
+    @property
+    def passed(self):
+        return self.n_violations == 0
+
+    @property
+    def args(self):
+        if self._args is None:
+            self._args = tuple(self._render()) if self._render is not None else ()
+        return self._args
+
+    @args.setter
+    def args(self, value):
+        self._args = tuple(value)
+
+    def __str__(self):
+        args = self.args
+        if not args:
+            return ""
+        return str(args[0]) if len(args) == 1 else str(args)
+
+    def __repr__(self):
+        return "{}{!r}".format(type(self).__name__, self.args)
+
+    def __reduce__(self):
+        return (type(self), (self.check, self.column, self.n_violations, self.positions,
+                             self.samples), {"_args": self.args})
+
+    def summary(self):
+        """Short description of the result, without rendering the check's message."""
+        if self.passed:
+            return "{}: passed".format(self.check)
+        text = "{}: failed".format(self.check)
+        if self.n_violations is not None:
+            text += ", {} violations".format(self.n_violations)
+        if self.column is not None:
+            text += " in column {!r}".format(self.column)
+        if self.samples:
+            text += ", e.g. {!r}".format(self.samples)
+        return text
+
+
+class ValidationReport(AssertionError):
+    """Results of several checks, failing if any of them fails.
+
+    Its message joins those of the failed checks, one per line, when first rendered.
+
+    Args:
+        results (list): `ValidationResult`\\ s, or AssertionErrors, of the checks.
+
+    """
+
+    def __init__(self, results=()):
+        super(ValidationReport, self).__init__()
+        self.results = list(results)
+        self._args = None
+
+    @property
+    def failures(self):
+        return [result for result in self.results
+                if not isinstance(result, ValidationResult) or not result.passed]
+
+    @property
+    def passed(self):
+        return not self.failures
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    @property
+    def args(self):
+        if self._args is None:
+            self._args = ("\n".join(str(i) for i in self.failures),)
+        return self._args
+
+    @args.setter
+    def args(self, value):
+        self._args = tuple(value)
+
+    def __str__(self):
+        return str(self.args[0]) if len(self.args) == 1 else str(self.args)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.results)
+
+    def __reduce__(self):
+        return type(self), (self.results,)
+
+
+def check_result(df, check_func, **params):
+    """Runs a check, returning its outcome instead of raising it.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        check_func (function): A check, e.g. from `bulwark.checks`.
+        **params: Keyword arguments of ``check_func``.
+
+    Returns:
+        The `ValidationResult` of the check, passed or not.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> result = check_result(pd.DataFrame({"a": [1, 5, 9]}), ck.has_vals_within_range,
+        ...                       items={"a": (0, 4)})
+        >>> result.summary()
+        "has_vals_within_range: failed, 2 violations in column 'a', e.g. [5, 9]"
+
+    """
+    name = getattr(check_func, "__name__", repr(check_func))
+    try:
+        check_func(df, **params)
+    except AssertionError as e:
+        return ValidationResult.from_error(name, e)
+    return ValidationResult(name)
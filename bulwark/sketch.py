@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Duplicate detection in bounded memory, for key columns too large to hash exactly.
+
+``ser.is_unique`` builds a hash table of every value, which costs tens of bytes per row.
+`duplicated_values` instead makes two passes over 64-bit hashes of the values, computed
+block by block:
+
+1. Each block's hashes are looked up in, then added to, a `BloomFilter` sized for the
+   requested false-positive rate. Hashes already in the filter, or repeated within the
+   block, are *suspicious*: either a duplicate or a false positive.
+2. Only the rows whose hash is suspicious are gathered, and checked exactly.
+
+Equal values always have equal hashes, so no duplicate is ever missed, and the exact
+second pass means false positives only cost time, never a wrong result. Memory is the
+filter (about 1.8 bytes per row at a 1% false-positive rate, or ``max_bytes``) plus
+the suspicious rows.
+
+`duplicated_rows` finds rows repeating a combination of columns the same way, with the
+filter replaced by the sorted 64-bit hashes of whole rows (8 bytes per row), which are
+combined column by column so no row is ever turned into a tuple.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Number of rows hashed at a time.
+BLOCK_SIZE = 1 << 20
+
+# Bits per hash can't overlap within the 60 mixed bits used to pick them.
+_MAX_HASHES = 10
+
+# Number of buffered writes of hashes to a filter before unbuffered ones.
+_ADD_ROUNDS = 8
+
+# Extra size of blocked filters over classic ones for the same false-positive rate.
+_BLOCKED_SLACK = 1.5
+
+
+class BloomFilter(object):
+    """Set of 64-bit hashes with false positives but no false negatives.
+
+    The filter is *blocked*: all the bits of a hash are set in the same 64-bit word,
+    so adding or looking up a hash touches a single word.
+
+    Args:
+        n_words (int): Size of the filter in 64-bit words.
+        n_hashes (int): Number of bits set per hash, at most 10.
+
+    """
+
+    def __init__(self, n_words, n_hashes):
+        self.n_hashes = min(max(int(n_hashes), 1), _MAX_HASHES)
+        self.words = np.zeros(max(int(n_words), 1), dtype=np.uint64)
+
+    @classmethod
+    def for_capacity(cls, capacity, fp_rate=0.01, max_bytes=None):
+        """A filter sized to hold `capacity` hashes with a false-positive rate of `fp_rate`.
+
+        Args:
+            capacity (int): Expected number of hashes.
+            fp_rate (float): Target false-positive rate, between 0 and 1.
+            max_bytes (int): Upper bound on the size of the filter; a smaller filter
+                             trades a higher false-positive rate for less memory.
+
+        Raises:
+            ValueError: If `fp_rate` isn't strictly between 0 and 1.
+
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1, got {!r}.".format(fp_rate))
+        capacity = max(capacity, 1)
+        # Optimal size of a classic filter, plus some slack for the uneven load of words.
+        n_bits = _BLOCKED_SLACK * -capacity * math.log(fp_rate) / math.log(2) ** 2
+        if max_bytes is not None:
+            n_bits = min(n_bits, max_bytes * 8)
+        n_hashes = int(round(n_bits / capacity * math.log(2)))
+        return cls(math.ceil(n_bits / 64), n_hashes)
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def _locate(self, hashes):
+        """Word index and bit mask of each of `hashes`."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        # Words come from the high half of the hash, bits from the mixed low half.
+        index = ((hashes >> np.uint64(32)) * np.uint64(len(self.words))) >> np.uint64(32)
+        mixed = (hashes & np.uint64(0xFFFFFFFF)) * np.uint64(0x9E3779B97F4A7C15)
+        masks = np.zeros(len(hashes), dtype=np.uint64)
+        for i in range(self.n_hashes):
+            bits = (mixed >> np.uint64(58 - 6 * i)) & np.uint64(63)
+            masks |= np.left_shift(np.uint64(1), bits)
+        return index, masks
+
+    def contains(self, hashes):
+        """Boolean np.ndarray of whether each of `hashes` may have been added."""
+        index, masks = self._locate(hashes)
+        return (self.words[index] & masks) == masks
+
+    def add(self, hashes):
+        """Adds `hashes` to the filter."""
+        index, masks = self._locate(hashes)
+        # Only one of several hashes sharing a word is written by a fancy-indexed OR, so
+        # those whose bits were lost are written again, and finally OR-ed unbuffered
+        # (but much more slowly) if the filter is so small that many share a word.
+        for _ in range(_ADD_ROUNDS):
+            self.words[index] |= masks
+            lost = (self.words[index] & masks) != masks
+            index, masks = index[lost], masks[lost]
+        np.bitwise_or.at(self.words, index, masks)
+
+
+def _blocks(values, block_size):
+    """Start and values of each block of `values`."""
+    for start in range(0, len(values), block_size):
+        if isinstance(values, pd.Series):
+            yield start, values.iloc[start:start + block_size]
+        else:
+            yield start, values[start:start + block_size]
+
+
+def _mix(hashes):
+    """splitmix64's finalizer, spreading hashes like ``hash(i) == i`` over all 64 bits."""
+    hashes = hashes ^ (hashes >> np.uint64(30))
+    hashes = hashes * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = hashes ^ (hashes >> np.uint64(27))
+    hashes = hashes * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def _hashes(block):
+    """64-bit hash of each value of `block`, equal for values that compare equal."""
+    if isinstance(block.dtype, np.dtype) and block.dtype.kind in "fc":
+        # -0.0 equals 0.0, and NaNs count as duplicates whatever their payload,
+        # but their bytes, and so their pandas hashes, differ.
+        values = np.asarray(block) + 0.
+        values[np.isnan(values)] = np.nan
+        return pd.util.hash_array(values)
+    if isinstance(block, pd.MultiIndex) or block.dtype != object:
+        return pd.util.hash_pandas_object(block, index=False).to_numpy()
+    # Python objects cache their hash, e.g. strings, which makes `hash` much faster than
+    # pandas' hashing of their contents, and equal numbers of different types hash equally.
+    values = block.to_numpy() if isinstance(block, pd.Series) else np.asarray(block)
+    hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values)).view(np.uint64)
+    # Null objects, e.g. NaN, don't all have equal hashes but may count as duplicates,
+    # so they share one, and are told apart by the exact pass.
+    hashes[pd.isna(values)] = 0
+    return _mix(hashes)
+
+
+def row_hashes(df, columns=None, block_size=BLOCK_SIZE):
+    """64-bit hash of each row of `df`'s `columns`, equal for rows whose values compare equal.
+
+    Each column is hashed a block of rows at a time, from a view of its values, and the
+    hashes combined in order, so the columns are never gathered into a new frame.
+    """
+    columns = df.columns if columns is None else columns
+    hashes = np.empty(len(df), dtype=np.uint64)
+    for start in range(0, len(df), block_size):
+        combined = np.zeros(min(block_size, len(df) - start), dtype=np.uint64)
+        for col in columns:
+            block = df[col].iloc[start:start + block_size]
+            combined = _mix((combined * np.uint64(0x9E3779B97F4A7C15)) ^ _hashes(block))
+        hashes[start:start + len(combined)] = combined
+    return hashes
+
+
+def duplicated_rows(df, columns=None, block_size=BLOCK_SIZE):
+    """Positions of the rows of `df` whose values in all of `columns` occur in another row too.
+
+    Rows are hashed into 8 bytes each, which are sorted in place to find repeated hashes;
+    only the rows with one, found by hashing again, are compared exactly.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): Labels of the columns to compare rows on. Default is all of them.
+        block_size (int): Number of rows hashed at a time.
+
+    Returns:
+        np.ndarray of the positions of duplicated rows, first occurrences included,
+        as ``np.flatnonzero(df[columns].duplicated(keep=False))``.
+
+    """
+    columns = list(df.columns if columns is None else columns)
+    hashes = row_hashes(df, columns, block_size)
+    hashes.sort()
+    repeated = np.unique(hashes[1:][hashes[1:] == hashes[:-1]])
+    del hashes
+    if not repeated.size:
+        return np.array([], dtype=np.intp)
+
+    candidates = np.concatenate([
+        start + np.flatnonzero(np.isin(
+            row_hashes(df.iloc[start:start + block_size], columns), repeated))
+        for start in range(0, len(df), block_size)])
+    exact = df.take(candidates)[columns].duplicated(keep=False).to_numpy()
+    return candidates[exact]
+
+
+def _repeated(hashes):
+    """Hashes occurring more than once in `hashes`."""
+    ordered = np.sort(hashes)
+    return ordered[1:][ordered[1:] == ordered[:-1]]
+
+
+def _as_index(values):
+    return values if isinstance(values, pd.Index) else pd.Index(values, dtype=values.dtype)
+
+
+def duplicated_values(values, fp_rate=0.01, max_bytes=None, block_size=BLOCK_SIZE):
+    """Values occurring more than once in `values`, in a bounded amount of memory.
+
+    Args:
+        values (pd.Series or pd.Index): Values to look for duplicates in.
+        fp_rate (float): False-positive rate of the Bloom filter, i.e. about the fraction
+                         of unique values that are checked exactly too.
+        max_bytes (int): Upper bound on the size of the Bloom filter.
+        block_size (int): Number of values hashed at a time.
+
+    Returns:
+        pd.Index of each duplicated value once, in the order of their second occurrences,
+        as ``values[values.duplicated()].unique()``.
+
+    Examples:
+        >>> import pandas as pd
+        >>> duplicated_values(pd.Series([3, 1, 2, 1, 3, 3]))
+        Int64Index([1, 3], dtype='int64')
+
+    """
+    bloom = BloomFilter.for_capacity(len(values), fp_rate, max_bytes)
+    suspicious = []
+    for _, block in _blocks(values, block_size):
+        hashes = _hashes(block)
+        suspicious.append(np.unique(np.concatenate([hashes[bloom.contains(hashes)],
+                                                    _repeated(hashes)])))
+        bloom.add(hashes)
+    suspicious = np.unique(np.concatenate(suspicious)) if suspicious else np.array([])
+
+    positions = np.array([], dtype=np.intp)
+    if suspicious.size:
+        # First occurrences of suspicious values are only found by a second pass.
+        positions = np.concatenate([start + np.flatnonzero(np.isin(_hashes(block), suspicious))
+                                    for start, block in _blocks(values, block_size)])
+    # Taken rather than appended, so objects keep their dtype and e.g. None and NaN aren't
+    # both inferred as NaN.
+    candidates = _as_index(values.take(positions))
+    return candidates[candidates.duplicated()].unique()
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of pd.DataFrames that arrive as an iterable of chunks,
+e.g. from ``pd.read_csv(..., chunksize=...)``.
+
+Checks that only look at one row at a time are applied to each chunk as-is.
+Checks that look across rows keep a small state between chunks, so that validating
+the chunks gives the same pass/fail result as validating the concatenated frame:
+
+- `unique` and `has_unique_index` keep the values seen so far,
+- `is_monotonic` carries the last row over chunk boundaries,
+- `has_set_within_vals` collects the required values found so far,
+- `has_vals_within_n_std` keeps running moments and extremes per column,
+- `one_to_many` keeps the unit found for each value of ``manycol``, and
+- `is_shape` counts rows.
+
+Apart from the seen values of `unique`, `has_unique_index` and `one_to_many`,
+which grow with the number of distinct keys, memory stays bounded by the chunk size.
+"""
+import types
+
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark.generic import MAX_BAD_LOCATIONS, CheckRegistry, RunningMoments
+from bulwark.generic import check_arguments, column_list
+from bulwark.generic import float_blocks, numeric_columns
+from bulwark.kernels import missing_values
+from bulwark.results import ValidationReport
+
+# Checks whose result on a frame is the conjunction of their results on its chunks.
+_CHUNKWISE = {"has_columns", "has_no_x", "none_missing", "has_no_nans", "has_no_nones",
+              "has_no_infs", "has_no_neg_infs", "has_vals_within_set", "within_set",
+              "has_vals_within_range", "within_range", "has_dtypes", "has_schema"}
+
+# State classes are built from the check function, and have an `update(chunk)` method
+# checking each chunk and a `finalize()` method checking the whole stream.
+_STATES = CheckRegistry()
+_tracks = _STATES.register
+
+
+class _ChunkwiseState(object):
+    def __init__(self, func, **arguments):
+        self.func = func
+        self.arguments = arguments
+
+    def update(self, chunk):
+        self.func(chunk, **self.arguments)
+
+    def finalize(self):
+        pass
+
+
+@_tracks("is_shape")
+class _ShapeState(object):
+    def __init__(self, func, shape):
+        self.shape = shape
+        self.n_rows = 0
+        self.n_columns = None
+
+    def update(self, chunk):
+        ck.is_shape(chunk, (-1, self.shape[1]))
+        self.n_rows += chunk.shape[0]
+        self.n_columns = chunk.shape[1]
+
+    def finalize(self):
+        # is_shape only looks at `.shape`, so there's no need to build a frame.
+        ck.is_shape(types.SimpleNamespace(shape=(self.n_rows, self.n_columns)), self.shape)
+
+
+class _SeenValues(object):
+    """Values seen so far in a column, with nulls tracked apart since NaN != NaN."""
+
+    def __init__(self):
+        self.values = set()
+        self.has_null = False
+
+    def add(self, values):
+        """Adds a pd.Series or pd.Index of values, returning False on any repeat."""
+        nulls = values.isna()
+        n_nulls = int(nulls.sum())
+        if n_nulls > 1 or (n_nulls and self.has_null) or not values.is_unique:
+            return False
+
+        non_null = values[~nulls].tolist() if n_nulls else values.tolist()
+        if not self.values.isdisjoint(non_null):
+            return False
+
+        self.values.update(non_null)
+        self.has_null = self.has_null or bool(n_nulls)
+        return True
+
+
+def _exact_only(func, approx):
+    if approx:
+        # Bloom filters need a second pass over the data to rule out false positives.
+        raise ValueError("{}(approx=True) can't be validated chunk by chunk."
+                         .format(func.__name__))
+
+
+@_tracks("unique")
+class _UniqueState(object):
+    def __init__(self, func, columns=None, approx=False):
+        _exact_only(func, approx)
+        self.columns = columns
+        self.seen = {}
+
+    def update(self, chunk):
+        columns = chunk.columns if self.columns is None else self.columns
+        for col in columns:
+            if not self.seen.setdefault(col, _SeenValues()).add(chunk[col]):
+                raise AssertionError("Column {!r} contains non-unique values".format(col))
+
+    def finalize(self):
+        pass
+
+
+@_tracks("has_unique_index", "unique_index")
+class _UniqueIndexState(object):
+    def __init__(self, func, approx=False):
+        _exact_only(func, approx)
+        self.seen = _SeenValues()
+
+    def update(self, chunk):
+        if not self.seen.add(chunk.index):
+            dupes = chunk.index[chunk.index.duplicated() |
+                                chunk.index.isin(list(self.seen.values))].unique()
+            raise AssertionError(*dupes)
+
+    def finalize(self):
+        pass
+
+
+@_tracks("is_monotonic")
+class _MonotonicState(object):
+    def __init__(self, func, items=None, increasing=None, strict=False, n_jobs=None,
+                 fail_fast=False):
+        self.items = items
+        self.fail_fast = fail_fast
+        self.increasing = increasing
+        self.strict = strict
+        self.n_jobs = n_jobs
+        self.last = None
+        # Directions each column can still be monotonic in, for `increasing=None`.
+        self.directions = {}
+
+    def update(self, chunk):
+        if self.items is None:
+            self.items = {col: (self.increasing, self.strict) for col in chunk}
+        frame = chunk[list(self.items)]
+        if self.last is not None:
+            frame = pd.concat([self.last, frame])
+        if frame.empty:
+            return
+        self.last = frame.iloc[-1:]
+
+        for col, (increasing, strict) in self.items.items():
+            candidates = self.directions.get(col, (True, False) if increasing is None
+                                             else (increasing,))
+            passing = []
+            for direction in candidates:
+                try:
+                    ck.is_monotonic(frame, items={col: (direction, strict)}, n_jobs=self.n_jobs,
+                                    fail_fast=self.fail_fast)
+                except AssertionError as e:
+                    error = e
+                else:
+                    passing.append(direction)
+            if not passing:
+                raise error
+            self.directions[col] = tuple(passing)
+
+    def finalize(self):
+        pass
+
+
+@_tracks("has_set_within_vals")
+class _SetWithinValsState(object):
+    def __init__(self, func, items):
+        self.missing = {col: list(vals) for col, vals in items.items()}
+
+    def update(self, chunk):
+        for col, vals in self.missing.items():
+            if vals:
+                self.missing[col] = missing_values(chunk[col], vals)
+
+    def finalize(self):
+        bad_cols_vals = {col: vals for col, vals in self.missing.items() if vals}
+        if bad_cols_vals:
+            raise AssertionError("The following column: value pairs are missing: {}"
+                                 .format(bad_cols_vals))
+
+
+@_tracks("has_vals_within_n_std", "within_n_std")
+class _WithinNStdState(object):
+    def __init__(self, func, n=3, columns=None, means=None, stds=None):
+        if (means is None) != (stds is None):
+            raise ValueError("means and stds must be given together.")
+        self.n = n
+        self.columns = columns
+        self.means = means
+        self.stds = stds
+        self.moments = None
+
+    def update(self, chunk):
+        if self.means is not None:
+            # Reference statistics don't depend on the data, so chunks are checked alone.
+            ck.has_vals_within_n_std(chunk, self.n, self.columns, self.means, self.stds)
+            return
+        if self.moments is None:
+            if self.columns is None:
+                self.columns = numeric_columns(chunk)
+            self.columns = pd.Index(self.columns)
+            self.moments = RunningMoments(len(self.columns))
+        for block in float_blocks(chunk[self.columns]):
+            self.moments.update(block)
+
+    def finalize(self):
+        if self.moments is None or not (self.moments.count + self.moments.n_nulls).any():
+            return
+        # Every value is within n stds of the mean iff both extremes are.
+        mean, limit = self.moments.mean, self.n * self.moments.std()
+        with np.errstate(invalid="ignore"):
+            inliers = ((self.moments.max - mean < limit) & (mean - self.moments.min < limit) &
+                       (self.moments.n_nulls == 0))
+        if not inliers.all():
+            raise AssertionError("Columns with values outside {} standard deviations: {}"
+                                 .format(self.n, list(self.columns[~inliers])))
+
+
+@_tracks("one_to_many")
+class _OneToManyState(object):
+    def __init__(self, func, unitcol, manycol, max_keys=MAX_BAD_LOCATIONS):
+        self.unitcol = unitcol
+        self.manycol = manycol
+        self.max_keys = max_keys
+        self.manycols = column_list(manycol)
+        self.columns = self.manycols + column_list(unitcol)
+        # One (manycol, unitcol) pair per key seen so far, with the keys' hashes, in runs
+        # sorted by hash. Runs are merged like the digits of a binary counter, so each
+        # pair is only copied a logarithmic number of times as the stream grows.
+        self.runs = []
+
+    def update(self, chunk):
+        pairs = chunk[self.columns].drop_duplicates()
+        hashes = pd.util.hash_pandas_object(pairs[self.manycols], index=False).to_numpy()
+        # Sorted lookups walk each run once, instead of jumping around it.
+        order = np.argsort(hashes)
+        hashes, pairs = hashes[order], pairs.iloc[order]
+
+        known = []
+        is_known = np.zeros(len(hashes), dtype=bool)
+        for run_hashes, run_pairs in self.runs:
+            found = np.searchsorted(run_hashes, hashes).clip(max=len(run_hashes) - 1)
+            matches = run_hashes[found] == hashes
+            is_known |= matches
+            known.append(run_pairs.iloc[np.unique(found[matches])])
+        ck.one_to_many(pd.concat(known + [pairs]), self.unitcol, self.manycol, self.max_keys)
+
+        # Keys are unique in `pairs` now, or the check would have failed.
+        self._add(hashes[~is_known], pairs[~is_known])
+
+    def _add(self, hashes, pairs):
+        """Adds pairs of new keys, sorted by their `hashes`, as a run."""
+        while len(hashes) and self.runs and len(self.runs[-1][0]) <= len(hashes):
+            run_hashes, run_pairs = self.runs.pop()
+            hashes = np.concatenate([run_hashes, hashes])
+            pairs = pd.concat([run_pairs, pairs])
+            # Both halves are sorted, which mergesort takes advantage of.
+            order = np.argsort(hashes, kind="mergesort")
+            hashes, pairs = hashes[order], pairs.iloc[order]
+        if len(hashes):
+            self.runs.append((hashes, pairs))
+
+    def finalize(self):
+        pass
+
+
+def _state_for(func, params):
+    name = getattr(func, "__name__", None)
+    if getattr(func, "__module__", None) == "bulwark.checks" and name in _CHUNKWISE:
+        return _ChunkwiseState(func, **check_arguments(func, params))
+    if _STATES.lookup(func) is None:
+        raise ValueError("{} can't be validated chunk by chunk.".format(name or func))
+    return _STATES.call(func, params, func)
+
+
+class ChunkedValidator(object):
+    """Validates a pd.DataFrame that is only available as a sequence of chunks.
+
+    Args:
+        checks (dict): Mapping of `bulwark.checks` functions to parameters for those
+                       check functions, as in `bulwark.checks.multi_check`.
+
+    Raises:
+        ValueError: If a check can't be decided chunk by chunk, e.g. `is_same_as`.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> validator = ChunkedValidator({ck.unique: {"columns": ["a"]}})
+        >>> _ = validator.update(pd.DataFrame({"a": [1, 2]}))
+        >>> _ = validator.update(pd.DataFrame({"a": [3, 1]}))
+        Traceback (most recent call last):
+            ...
+        AssertionError: Column 'a' contains non-unique values
+
+    """
+
+    def __init__(self, checks):
+        self.checks = checks
+        self._states = [_state_for(func, params) for func, params in checks.items()]
+
+    def update(self, chunk):
+        """Validates the next chunk against all checks.
+
+        Args:
+            chunk (pd.DataFrame): The next rows of the frame.
+
+        Returns:
+            Original `chunk`.
+
+        Raises:
+            AssertionError: As soon as the chunks seen so far are known to fail a check.
+
+        """
+        self._run("update", chunk)
+        return chunk
+
+    def finalize(self):
+        """Runs the checks that can only be decided once all chunks have been seen."""
+        self._run("finalize")
+
+    def _run(self, method, *args):
+        error_msgs = []
+        for state in self._states:
+            try:
+                getattr(state, method)(*args)
+            except AssertionError as e:
+                error_msgs.append(e)
+
+        if len(error_msgs) == 1:
+            raise error_msgs[0]
+        elif error_msgs:
+            raise ValidationReport(error_msgs)
+
+
+def validate_chunks(chunks, checks):
+    """Validates an iterable of pd.DataFrame chunks as if they were one pd.DataFrame.
+
+    Args:
+        chunks (iterable): pd.DataFrames holding consecutive rows of the same frame.
+        checks (dict): Mapping of `bulwark.checks` functions to parameters for those
+                       check functions.
+
+    Yields:
+        Each original chunk, after it has been validated.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> chunks = pd.read_csv("data.csv", chunksize=100000)  # doctest: +SKIP
+        >>> for chunk in validate_chunks(chunks, {ck.is_monotonic: {}}):  # doctest: +SKIP
+        ...     process(chunk)
+
+    """
+    validator = ChunkedValidator(checks)
+    for chunk in chunks:
+        yield validator.update(chunk)
+    validator.finalize()
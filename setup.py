@@ -18,6 +18,8 @@ with open("README.md") as readme_file:
 
 # Requirements placed here for convenient viewing
 install_requires = ['numpy>=1.15', 'pandas>=0.23.0']
+arrow_requires = ['pyarrow>=7.0']
+polars_requires = ['polars>=1.0', 'pyarrow>=7.0']
 tests_requires = ["pytest", "pytest-cov"]
 docs_requires = [
     "m2r",
@@ -26,7 +28,7 @@ docs_requires = [
     "sphinxcontrib-apidoc~=0.3.0",
     "sphinx_rtd_theme"
 ]
-dev_requires = tests_requires + docs_requires + ["pre-commit", "tox"]
+dev_requires = tests_requires + docs_requires + ["asv", "pre-commit", "tox"]
 
 name = project_info.NAME
 author = project_info.AUTHOR
@@ -55,12 +57,14 @@ setup(
                  "Programming Language :: Python :: 3.7",
                  "Programming Language :: Python :: 3.8"],
     keywords='data analysis testing',
-    packages=find_packages(exclude=["docs", "tests"]),
+    packages=find_packages(exclude=["benchmarks", "docs", "tests"]),
     python_requires=">=3.6",
     install_requires=install_requires,
     # Deprecated: setup_requires, tests_require, test_suite
     # Each extra exists for purpose k, and requires install of v.
-    extras_require={'docs': docs_requires,
+    extras_require={'arrow': arrow_requires,
+                    'polars': polars_requires,
+                    'docs': docs_requires,
                     'test': tests_requires,
                     'dev': dev_requires},
     cmdclass=cmdclass,
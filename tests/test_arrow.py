@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark import engine
+
+pa = pytest.importorskip("pyarrow")
+ArrowDtype = getattr(pd, "ArrowDtype", None)
+if ArrowDtype is None:
+    pytest.skip("pd.ArrowDtype requires pandas 1.5+", allow_module_level=True)
+
+from bulwark.arrow import ArrowBackend, ArrowFrame  # noqa: E402
+
+
+def _noop(df):
+    return df
+
+
+@pytest.fixture
+def table():
+    return pa.table({"a": pa.array([1, 2, 3, 4], pa.int64()),
+                     "b": pa.array([0.5, 1.5, None, 2.5]),
+                     "c": pa.array(["x", "y", "x", "z"]),
+                     "d": pa.array(pd.date_range("2020-01-01", periods=4))})
+
+
+@pytest.fixture
+def df(table):
+    return pd.DataFrame({col: pd.Series(table.column(col), dtype=ArrowDtype(table.column(col).type))
+                         for col in table.column_names})
+
+
+PASSING = {ck.has_no_nans: {"columns": ["a", "c", "d"]},
+           ck.has_vals_within_range: {"items": {"a": (1, 4), "b": (0, 3),
+                                                "d": (pd.Timestamp("2020"), pd.Timestamp("2021"))}},
+           ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}},
+           ck.unique: {"columns": ["a", "d"]},
+           ck.is_monotonic: {"items": {"a": (True, True), "d": (None, True)}}}
+
+
+def test_arrow_backend_passes_without_pandas(table, monkeypatch):
+    monkeypatch.setattr(ArrowFrame, "to_pandas", None)
+    checks = dict(PASSING)
+    checks[ck.has_schema] = {"schema": {"a": "int", "b": "float",
+                                        "c": "string", "d": "datetime64_ns"}}
+    assert ArrowBackend().run_checks(table, checks) == []
+
+
+def test_arrow_backend_dataframe(df, monkeypatch):
+    monkeypatch.setattr(engine, "run_checks", None)
+    assert ArrowBackend().run_checks(df, PASSING) == []
+
+
+def test_arrow_frame_is_zero_copy():
+    ser = pd.Series(["x", "yy", None], dtype="string[pyarrow]")
+    chunked = ArrowFrame(pd.DataFrame({"s": ser}))["s"]
+    backing = ser.array.__arrow_array__()
+    assert chunked.chunk(0).buffers()[2].address == backing.chunk(0).buffers()[2].address
+    assert ArrowFrame(pd.DataFrame({"n": [1, 2]}))["n"] is None
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_no_nans, {}),
+    (ck.has_vals_within_range, {"items": {"a": (2, 4)}}),
+    (ck.has_vals_within_set, {"items": {"c": ["x", "y"]}}),
+    (ck.unique, {"columns": ["c"]}),
+    (ck.is_monotonic, {"items": {"a": (False, False)}}),
+    (ck.has_columns, {"columns": ["a"], "exact_cols": True}),
+    (ck.is_shape, {"shape": (3, 4)}),
+])
+def test_arrow_backend_failure_matches_check(table, func, params):
+    errors = ArrowBackend().run_checks(table, {func: params})
+    expected = engine.run_checks(table.to_pandas(), {func: params})
+    assert [str(e) for e in errors] == [str(e) for e in expected]
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("arrow_type", [pa.float32(), pa.float64()])
+def test_arrow_unique_signed_zeros(arrow_type):
+    table = pa.table({"a": pa.array([0., -0.], arrow_type)})
+    assert len(ArrowBackend().run_checks(table, {ck.unique: {}})) == 1
+    table = pa.table({"a": pa.array([0., 1.], arrow_type)})
+    assert ArrowBackend().run_checks(table, {ck.unique: {}}) == []
+
+
+def test_arrow_backend_option(df):
+    tm.assert_frame_equal(ck.multi_check(df, PASSING, backend="arrow"), df)
+    tm.assert_frame_equal(dc.Unique(["a"], backend="arrow")(_noop)(df), df)
+
+    numpy_df = pd.DataFrame({"a": [1, 1, np.nan]})
+    with pytest.raises(AssertionError, match="non-unique"):
+        dc.Unique(backend="arrow")(_noop)(numpy_df)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import itertools
+import json
+import os
+
+import pytest
+
+from benchmarks.run import benchmarks, compare, missing
+
+SMALL = list(itertools.product([10 ** 3], [1, 2], ["float", "categorical", "object"],
+                               ["pass", "fail"]))
+
+
+@pytest.mark.parametrize("name, cls", list(benchmarks()))
+def test_benchmark_runs(name, cls):
+    n_run = 0
+    for params in SMALL:
+        bench = cls()
+        try:
+            bench.setup(*params)
+        except NotImplementedError:
+            continue
+        bench.time_check(*params)
+        n_run += 1
+    assert n_run
+
+
+def test_compare():
+    baseline = {"a": {"time": 1.}, "b": {"time": 1.}, "c": {"time": 1e-6}}
+    results = {"a": {"time": 1.5}, "b": {"time": 3.}, "c": {"time": 5e-6}, "d": {"time": 9.}}
+    assert compare(results, baseline, 2.) == [("b", 3.)]
+    assert missing(results, baseline) == ["d"]
+
+
+def test_baseline_covers_every_benchmark():
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "baseline.json")
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+    measured = {key.split("(")[0] for key in baseline}
+    assert [name for name, _ in benchmarks() if name not in measured] == []
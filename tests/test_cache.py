@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark.cache import ValidationCache, fingerprint
+
+
+def _noop(df):
+    return df
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": np.arange(5000), "b": list("ab") * 2500})
+
+
+def test_fingerprint_changes_with_data(df):
+    assert fingerprint(df) == fingerprint(df)
+    assert fingerprint(df) != fingerprint(df.iloc[::-1])
+    assert fingerprint(df) == fingerprint(df.copy())
+
+    before = fingerprint(df, ["a"])
+    df.loc[0, "b"] = "c"
+    assert fingerprint(df, ["a"]) == before
+    df.loc[0, "a"] = -1
+    assert fingerprint(df, ["a"]) != before
+
+
+@pytest.mark.parametrize("dtype", ["float64", "Int64"])
+def test_fingerprint_sees_unsampled_values(dtype):
+    # New frames often reuse the buffers of freed ones.
+    df = pd.DataFrame({"a": pd.array(np.arange(100000.), dtype=dtype)})
+    passed = fingerprint(df)
+    df.loc[7, "a"] = None
+    assert fingerprint(df) != passed
+    assert fingerprint(df, sample_size=1024) == fingerprint(df.fillna(7), sample_size=1024)
+
+    cache = ValidationCache()
+    checked = dc.CustomCheck(lambda df: ck.has_no_nans(df), cache=cache)(_noop)
+    checked(df.fillna(7))
+    with pytest.raises(AssertionError):
+        checked(df)
+
+
+@pytest.mark.parametrize("ser", [
+    pd.Series(list("abcab"), dtype="category"),
+    pd.Series(["a", "b", None, "d", "e"], dtype=object),
+    pd.Series([1, 2, None, 4, 5], dtype="Int64"),
+    pd.Series([[1], [2], [3], [4], [5]]),
+])
+def test_fingerprint_of_dtypes(ser):
+    df = ser.to_frame("a")
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.iloc[::-1].reset_index(drop=True))
+
+
+def test_key_depends_on_check_and_params(df):
+    cache = ValidationCache()
+    key = cache.key(df, ck.unique, {"columns": ["a"]})
+    assert key == cache.key(df, ck.unique, {"columns": ["a"]})
+    assert key != cache.key(df, ck.unique, {"columns": ["b"]})
+    assert key != cache.key(df, ck.has_no_nans, {"columns": ["a"]})
+    assert (cache.key(df, ck.is_same_as, {"df_to_compare": df}) !=
+            cache.key(df, ck.is_same_as, {"df_to_compare": df.iloc[::-1]}))
+
+
+def test_lru_eviction():
+    cache = ValidationCache(max_entries=2)
+    for key in [b"1", b"2", b"1", b"3"]:
+        cache.add(key)
+    assert b"1" in cache and b"3" in cache and b"2" not in cache
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache = ValidationCache(max_bytes=sys.getsizeof(b"1") + 1)
+    cache.add(b"1")
+    cache.add(b"2")
+    assert len(cache) == 1 and cache.nbytes <= cache.max_bytes
+
+
+def test_decorator_cache(df):
+    calls = []
+
+    def count(df):
+        calls.append(len(df))
+
+    cache = ValidationCache()
+    decorated = dc.CustomCheck(count, cache=cache)(_noop)
+    for _ in range(3):
+        decorated(df)
+    decorated(df.head())
+    assert calls == [5000, 5]
+    assert cache.hits == 2
+
+
+def test_decorator_cache_rechecks_failures():
+    df = pd.DataFrame({"a": [1, 1]})
+    cache = ValidationCache()
+    for _ in range(2):
+        with pytest.raises(AssertionError):
+            dc.Unique(cache=cache)(_noop)(df)
+    assert len(cache) == 0
+
+    dc.Unique(cache=True)(_noop)(df.iloc[:1])
+    dc.Unique(cache=True)(_noop)(df.iloc[:1])
+
+
+def test_decorator_cache_skips_cheap_checks(df):
+    cache = ValidationCache()
+    assert cache.caches(ck.unique) and cache.caches(ck.has_unique_key)
+    assert cache.caches(lambda df: df) and not cache.caches(ck.has_no_nans)
+    for _ in range(2):
+        dc.HasNoNans(cache=cache)(_noop)(df)
+        dc.Unique(["a"], cache=cache)(_noop)(df)
+    assert (len(cache), cache.hits, cache.misses) == (1, 1, 1)
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import tracemalloc
+
 import numpy as np
 import pandas as pd
 import pandas.testing as tm
@@ -6,6 +8,8 @@ import pytest
 
 import bulwark.checks as ck
 import bulwark.decorators as dc
+from bulwark import kernels
+from bulwark.results import check_result
 
 
 def _add_n(df, n=1):
@@ -77,6 +81,43 @@ def test_has_no_x():
     tm.assert_frame_equal(result, df + 2)
 
 
+@pytest.mark.parametrize("ser,values,bad", [
+    (pd.Series([1., np.nan, np.inf, -np.inf]), [np.nan], [1]),
+    (pd.Series([1., np.nan, np.inf, -np.inf]), [np.inf], [2]),
+    (pd.Series([1., np.nan, np.inf, -np.inf]), [-np.inf, None], [3]),
+    (pd.Series([1, 2]), [np.nan, None, np.inf, -np.inf], []),
+    (pd.Series([1, None], dtype="Int64"), [np.nan], [1]),
+    (pd.Series([1, None], dtype="Int64"), [None, np.inf], []),
+    (pd.Series([1., None, np.inf, -np.inf], dtype="Float64"), [np.inf, -np.inf], [2, 3]),
+    (pd.Series([1, None, np.nan, np.inf, "a"], dtype=object), [None, "a"], [1, 4]),
+    (pd.Series([1, None, np.nan, np.inf, "a"], dtype=object), [np.nan, np.inf], [2, 3]),
+    (pd.Series(pd.to_datetime(["2020", None])), [np.nan, None], []),
+    (pd.Series(pd.Categorical(["a", None, "b"])), [None, pd.NA], []),
+    (pd.Series(pd.Categorical(["a", None, "b"])), [np.nan], [1]),
+    (pd.Series(pd.Categorical(["a", None, "b"])), ["b"], [2]),
+    (pd.Series(pd.Categorical(["a", None, "b"])), ["b", np.nan, "z"], [1, 2]),
+    (pd.Series(pd.Categorical([1., np.inf, 2.])), [np.inf, 2.], [1, 2]),
+    (pd.Series(pd.Categorical(["a", "b"], categories=["a", "b", "c"])), ["c", None], []),
+    (pd.Series(["a", None], dtype="string"), [np.nan], [1]),
+])
+def test_has_no_x_dtypes(ser, values, bad):
+    df = ser.to_frame("a")
+    if bad:
+        with pytest.raises(AssertionError) as excinfo:
+            ck.has_no_x(df, values=values)
+        assert list(excinfo.value.args[0]) == [(i, "a") for i in bad]
+    else:
+        tm.assert_frame_equal(df, ck.has_no_x(df, values=values))
+
+
+def test_has_no_x_block_boundary():
+    df = pd.DataFrame({"a": np.zeros(200000), "b": np.zeros(200000)})
+    df.iloc[150000, 1] = np.nan
+    with pytest.raises(AssertionError) as excinfo:
+        ck.has_no_nans(df)
+    assert list(excinfo.value.args[0]) == [(150000, "b")]
+
+
 def test_has_no_nans():
     df = pd.DataFrame(np.random.randn(5, 3))
     result = ck.has_no_nans(df)
@@ -113,6 +154,11 @@ def test_has_no_nones():
     result = dc.HasNoNones()(_add_n)(df, n=2)
     tm.assert_frame_equal(result, df + 2)
 
+    # Like float columns, categoricals hold NaN, and not None.
+    df = pd.DataFrame({"a": pd.Categorical(["x", np.nan])})
+    tm.assert_frame_equal(df, ck.has_no_nones(df))
+    tm.assert_frame_equal(df, ck.multi_check(df, {ck.has_no_nones: {}}))
+
 
 def test_has_no_infs():
     df = pd.DataFrame(np.random.randn(5, 3))
@@ -164,6 +210,36 @@ def test_has_set_within_vals():
         dc.HasSetWithinVals(items=items)(_noop)(df)
 
 
+@pytest.mark.parametrize("dtype", [None, "category", "string"])
+def test_has_set_within_vals_blockwise(dtype):
+    ser = pd.Series(["x", "y", None] * 5000 + ["z"], dtype=dtype)
+    df = pd.DataFrame({"a": ser})
+    tm.assert_frame_equal(ck.has_set_within_vals(df, {"a": ["z", "x"]}), df)
+    with pytest.raises(AssertionError, match=r"\{'a': \['w', 'v'\]\}"):
+        ck.has_set_within_vals(df, {"a": ["w", "x", "v"]})
+    # As with np.setdiff1d, required NaNs are never found.
+    missing = kernels.missing_values(ser, ["y", np.nan])
+    assert len(missing) == 1 and pd.isna(missing[0])
+
+
+def test_has_set_within_vals_stops_early(monkeypatch):
+    scanned = []
+    slice_ = kernels._slice
+
+    def counting_slice(values, start, stop):
+        scanned.append(stop - start)
+        return slice_(values, start, stop)
+
+    monkeypatch.setattr(kernels, "_slice", counting_slice)
+    df = pd.DataFrame({"a": np.tile(np.arange(5), 200000)})
+    ck.has_set_within_vals(df, {"a": [0, 4]})
+    assert sum(scanned) < 10000
+
+    codes = pd.Categorical.from_codes(np.tile(np.arange(5, dtype=np.int8), 200000),
+                                      list("abcde"))
+    assert kernels.missing_values(pd.Series(codes), ["e", "a", "f"], block_size=8) == ["f"]
+
+
 def test_unique():
     df = pd.DataFrame([[1, 2, 3], ['a', 'b', 'c']])
     tm.assert_frame_equal(df, ck.unique(df))
@@ -177,6 +253,54 @@ def test_unique():
         dc.Unique()(_noop)(df)
 
 
+def test_unique_approx():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"k": rng.permutation(20000), "s": np.arange(20000).astype(str)})
+    tm.assert_frame_equal(df, ck.unique(df, approx=True, fp_rate=0.05))
+    tm.assert_frame_equal(df, dc.Unique(approx=True, max_bytes=1024)(_noop)(df))
+
+    df.loc[19999, "s"] = "17"
+    with pytest.raises(AssertionError, match="Column 's' contains non-unique values"):
+        ck.unique(df, approx=True)
+    with pytest.raises(AssertionError, match="Column 's'"):
+        ck.multi_check(df, {ck.unique: {"approx": True}})
+
+
+@pytest.mark.parametrize("values", [[np.nan, np.inf - np.inf, 1.], ["x", None, np.nan]])
+def test_unique_approx_matches_exact(values):
+    df = pd.DataFrame({"a": values})
+    exact = check_result(df, ck.unique, columns=["a"])
+    assert check_result(df, ck.unique, columns=["a"], approx=True).passed == exact.passed
+
+
+def test_has_unique_key():
+    df = pd.DataFrame({"a": [1, 1, 2, 2, np.nan, np.nan], "b": [0., -0., 1., 2., 3., 3.],
+                       "c": list("xyxyxy")})
+    tm.assert_frame_equal(df, ck.has_unique_key(df, ["a", "c"]))
+    tm.assert_frame_equal(df, dc.HasUniqueKey(columns=["b", "c"])(_noop)(df))
+    tm.assert_frame_equal(df.iloc[:0], ck.has_unique_key(df.iloc[:0], "a"))
+
+    result = check_result(df, ck.has_unique_key, columns=["a", "b"])
+    assert (result.column, result.n_violations, result.positions.tolist()) == \
+        (None, 4, [0, 1, 4, 5])
+    assert str(result) == \
+        "Duplicated keys of ['a', 'b'] with their counts: {(1.0, 0.0): 2, (nan, 3.0): 2}"
+
+    result = check_result(df, ck.has_unique_key, columns="c", max_keys=1)
+    assert (result.column, result.samples[:2]) == ("c", ["x", "y"])
+    assert str(result) == "Duplicated keys of c with their counts: {'x': 3} ... and 1 more"
+    with pytest.raises(AssertionError, match="Duplicated keys"):
+        ck.multi_check(df, {ck.has_unique_key: {"columns": ["a", "b"]}})
+
+
+def test_has_unique_key_nan_payloads():
+    df = pd.DataFrame({"a": [np.nan, np.inf - np.inf], "b": [1, 1]})
+    for columns in ["a", ["a", "b"]]:
+        result = check_result(df, ck.has_unique_key, columns=columns)
+        expected = np.flatnonzero(df[columns].duplicated(keep=False))
+        assert result.positions.tolist() == expected.tolist() == [0, 1]
+
+
 def test_has_unique_index():
     df = pd.DataFrame([1, 2, 3], index=['a', 'b', 'c'])
     tm.assert_frame_equal(df, ck.has_unique_index(df))
@@ -189,6 +313,16 @@ def test_has_unique_index():
         dc.HasUniqueIndex()(_add_n)(df.reindex(['a', 'a', 'b']))
 
 
+def test_has_unique_index_approx():
+    df = pd.DataFrame({"a": range(6)}, index=list("abcbaa"))
+    tm.assert_frame_equal(df.iloc[:3], ck.has_unique_index(df.iloc[:3], approx=True))
+    with pytest.raises(AssertionError) as exact:
+        ck.has_unique_index(df)
+    with pytest.raises(AssertionError) as approx:
+        ck.has_unique_index(df, approx=True)
+    assert approx.value.args == exact.value.args == ("b", "a")
+
+
 def test_unique_index():
     df = pd.DataFrame([1, 2, 3], index=['a', 'b', 'c'])
 
@@ -315,6 +449,57 @@ def test_monotonic_items():
         df), df + 1)
 
 
+@pytest.mark.parametrize("ser,increasing,strict,bad", [
+    (pd.Series(pd.date_range("2020", periods=5)), True, True, []),
+    (pd.Series(pd.to_datetime(["2020", "2019", None, "2021"]).tz_localize("UTC")), True, False,
+     [1]),
+    (pd.Series(pd.to_timedelta([1, 2, 3], "s")), False, False, [1, 2]),
+    (pd.Series([3, 2, 1], dtype=np.uint8), False, True, []),
+    (pd.Series([3, 2, 1], dtype=np.uint8), True, False, [1, 2]),
+    (pd.Series([1, None, 0, 2, 2], dtype="Int64"), True, False, []),
+    (pd.Series([1, None, 0, 2, 2], dtype="Int64"), True, True, [4]),
+    (pd.Series([1., np.nan, 0, 2, 1]), True, False, [4]),
+    (pd.Series([True, False]), True, False, [1]),
+    (pd.Series([1, 2, 3, 4, 3, 5, 6, 7]), None, False, [4]),
+    (pd.Series([5, 4, 4, 3, 1]), None, True, [2]),
+])
+def test_monotonic_dtypes(ser, increasing, strict, bad):
+    df = pd.DataFrame({"a": ser})
+    if not bad:
+        tm.assert_frame_equal(df, ck.is_monotonic(df, increasing=increasing, strict=strict))
+        return
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=increasing, strict=strict)
+    assert list(e.value.args[0]) == [(i, "a") for i in bad]
+
+
+def test_monotonic_fail_fast():
+    df = pd.DataFrame({"a": [1, 2, 1, 2, 1], "b": [3, 2, 1, 2, 3], "c": [1, 2, 1, 2, 1]},
+                      index=list("vwxyz"))
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True, fail_fast=True)
+    assert list(e.value.args[0]) == [("x", "a")]
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, fail_fast=True)
+    assert list(e.value.args[0]) == [("x", "a")]
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, items={"b": (None, False)}, fail_fast=True)
+    assert list(e.value.args[0]) == [("y", "b")]
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True)
+    assert list(e.value.args[0]) == [("x", "a"), ("z", "a"), ("w", "b"), ("x", "b"),
+                                     ("x", "c"), ("z", "c")]
+
+
+def test_monotonic_blocks():
+    values = np.arange(10.)
+    assert kernels.adjacent_violations(values, np.greater, block_size=3).size == 0
+    values[[4, 8]] = 0
+    assert list(kernels.adjacent_violations(values, np.greater, block_size=3)) == [4, 8]
+    assert list(kernels.adjacent_violations(values, np.greater, first=True,
+                                            block_size=3)) == [4]
+
+
 def test_within_set():
     df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
     items = {'A': [1, 2, 3], 'B': ['a', 'b', 'c']}
@@ -352,6 +537,28 @@ def test_has_vals_within_set():
         dc.HasValsWithinSet(items=items)(_noop)(df)
 
 
+@pytest.mark.parametrize("values", [["a", "b", "c"], ["a", "b", "c", np.nan], ["a", "c"],
+                                    ["b", None, "z"], [], [1, 2]])
+def test_has_vals_within_set_categorical(values):
+    ser = pd.Series(pd.Categorical(["a", "b", None, "a", "c"], categories=["c", "b", "a"]))
+    df = ser.to_frame("a")
+    expected = ~ser.isin(values)
+    result = check_result(df, ck.has_vals_within_set, items={"a": values})
+    assert result.passed == (not expected.any())
+    if expected.any():
+        assert result.positions.tolist() == np.flatnonzero(expected).tolist()
+        tm.assert_series_equal(result.args[1], df.loc[expected, "a"])
+
+
+def test_category_table():
+    ser = pd.Series(pd.Categorical(["x", "y", None], categories=["y", "x", "w"]))
+    table = kernels.category_table(ser, ["x", "w", "v"])
+    assert table.tolist() == [False, True, True, False]
+    assert table[ser.cat.codes.to_numpy()].tolist() == ser.isin(["x", "w", "v"]).tolist()
+    assert kernels.x_kernels(ser, ["v", np.inf]) == []
+    assert kernels.outside_set(ser, ["x", "y", "w", None]) is None
+
+
 def test_has_vals_within_range():
     df = pd.DataFrame({'A': [-1, 0, 1]})
     items = {'A': (-1, 1)}
@@ -365,6 +572,68 @@ def test_has_vals_within_range():
         dc.HasValsWithinRange(items)(_noop)(df)
 
 
+def test_has_vals_within_range_blocks():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(rng.uniform(0, 1, (100, 20)), columns=["s{}".format(i) for i in range(20)])
+    df["i"] = np.arange(100)
+    df["d"] = pd.date_range("2020", periods=100)
+    df.iloc[3, 4] = np.nan
+    items = {col: (0, 1) for col in df.columns[:20]}
+    items.update({"i": (0, 99), "d": (pd.Timestamp("2020"), pd.Timestamp("2021"))})
+    tm.assert_frame_equal(df, ck.has_vals_within_range(df, items))
+    tm.assert_frame_equal(df, ck.has_vals_within_range(df, dict(list(items.items())[:5])))
+
+    df.iloc[7, 12] = 1.5
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_range(df, items)
+    outside = e.value.args[1]
+    assert outside.name == "s12" and outside.sum() == 1 and outside.iloc[7]
+
+
+def test_block_extremes_does_not_copy_blocks():
+    df = pd.DataFrame(np.arange(40000.).reshape(2000, 20))
+    df.iloc[5, 3] = np.nan
+    expected = {col: (df[col].min(), df[col].max()) for col in df}
+    assert kernels.block_extremes(df, list(df.columns)) == expected
+
+    df["t"] = pd.date_range("2020", periods=2000)
+    tracemalloc.start()
+    try:
+        assert kernels.block_extremes(df, list(df.columns)) == expected
+        assert tracemalloc.get_traced_memory()[1] < df.memory_usage().sum() / 10
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("ser,lower,upper,passes", [
+    (pd.Series([np.nan, np.nan]), 0, 1, True),
+    (pd.Series([], dtype=float), 0, 1, True),
+    (pd.Series([1, None, 3], dtype="Int64"), 1, 3, True),
+    (pd.Series([1, None, 3], dtype="Int64"), 2, 3, False),
+    (pd.Series([True, False]), 0, 1, True),
+    (pd.Series(["b", "c"], dtype=pd.CategoricalDtype(["c", "b"], ordered=True)), "c", "b", True),
+    (pd.Series(["b", "c"]), "a", "b", False),
+    (pd.Series([0.5, 1.5]), np.nan, 2, True),
+])
+def test_has_vals_within_range_dtypes(ser, lower, upper, passes):
+    df = pd.DataFrame({"a": ser, "b": ser})
+    items = {"a": (lower, upper), "b": (lower, upper)}
+    expected = (lower > ser) | (upper < ser)
+    assert (not expected.any()) == passes
+    if passes:
+        tm.assert_frame_equal(df, ck.has_vals_within_range(df, items))
+    else:
+        with pytest.raises(AssertionError) as e:
+            ck.has_vals_within_range(df, items)
+        tm.assert_series_equal(e.value.args[1], expected.rename("a"))
+
+
+def test_has_vals_within_range_uncomparable():
+    df = pd.DataFrame({"a": [1, 2]})
+    with pytest.raises(TypeError):
+        ck.has_vals_within_range(df, {"a": ("x", "y")})
+
+
 def test_within_range():
     df = pd.DataFrame({'A': [-1, 0, 1]})
     items = {'A': (-1, 1)}
@@ -391,6 +660,40 @@ def test_has_vals_within_n_std():
         dc.HasValsWithinNStd(.5)(_noop)(df)
 
 
+def test_has_vals_within_n_std_one_pass():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"a": rng.randn(1000), "b": rng.randint(0, 10, 1000),
+                       "c": pd.Series(rng.randn(1000)).astype("Float64"),
+                       "s": ["x"] * 1000, "t": pd.to_timedelta(np.arange(1000), "s")})
+    tm.assert_frame_equal(df, ck.has_vals_within_n_std(df, 5))
+
+    df.loc[17, "a"] = 100.
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_n_std(df, 5)
+    assert list(e.value.args[0]) == [(17, "a")]
+    tm.assert_frame_equal(df, ck.has_vals_within_n_std(df, 5, columns=["b", "c"]))
+
+    df.loc[3, "c"] = pd.NA
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_n_std(df, 5, columns=["b", "c"])
+    assert list(e.value.args[0]) == [(3, "c")]
+
+
+def test_has_vals_within_n_std_reference():
+    df = pd.DataFrame({"a": [9., 10., 11.], "b": [0, 1, 2], "s": list("xyz")})
+    means, stds = pd.Series({"a": 10., "b": 1.}), pd.Series({"a": 1., "b": .5})
+    tm.assert_frame_equal(df, ck.has_vals_within_n_std(df, 2.5, means=means, stds=stds))
+    tm.assert_frame_equal(df, dc.HasValsWithinNStd(2.5, means=means, stds=stds)(_noop)(df))
+
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_n_std(df, 1.5, means=means, stds=stds)
+    assert list(e.value.args[0]) == [(0, "b"), (2, "b")]
+    tm.assert_frame_equal(df, ck.has_vals_within_n_std(df, 1.5, ["a"], means, stds))
+
+    with pytest.raises(ValueError):
+        ck.has_vals_within_n_std(df, means=means)
+
+
 def test_within_n_std():
     df = pd.DataFrame({'A': np.arange(10), 'B': list('abcde') * 2})
 
@@ -440,6 +743,32 @@ def test_one_to_many_raises():
         ck.one_to_many(df, 'units', 'parameter')
 
 
+def test_one_to_many_reports_all_keys():
+    df = pd.DataFrame({
+        'parameter': ['Cu', 'Cu', 'Pb', 'Pb', 'Zn', 'Zn', 'Zn'],
+        'units': ['ug/L', 'mg/L', 'ug/L', 'ug/L', 'ug/L', 'mg/L', 'g/L'],
+    })
+    with pytest.raises(AssertionError) as e:
+        ck.one_to_many(df, 'units', 'parameter')
+    assert str(e.value) == ("parameter values with multiple values for units: "
+                            "{'Cu': ['ug/L', 'mg/L'], 'Zn': ['ug/L', 'mg/L', 'g/L']}")
+
+    with pytest.raises(AssertionError, match=r"\{'Cu': \['ug/L', 'mg/L'\]\} ... and 1 more"):
+        ck.one_to_many(df, 'units', 'parameter', max_keys=1)
+
+
+def test_one_to_many_composite_columns():
+    df = pd.DataFrame({
+        'site': ['A', 'A', 'B', 'B'],
+        'parameter': ['Cu', 'Pb', 'Cu', 'Cu'],
+        'units': ['ug/L', 'mg/L', 'ug/L', 'ug/L'],
+        'method': [1, 1, 1, 2],
+    })
+    tm.assert_frame_equal(ck.one_to_many(df, 'units', ['site', 'parameter']), df)
+    with pytest.raises(AssertionError, match=r"\('B', 'Cu'\): \[\('ug/L', 1\), \('ug/L', 2\)\]"):
+        ck.one_to_many(df, ['units', 'method'], ['site', 'parameter'])
+
+
 def test_is_same_as():
     df = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
     df_equal = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
@@ -543,3 +872,28 @@ def test_custom_check():
 
     with pytest.raises(AssertionError):
         dc.CustomCheck(f, 4)(_noop)(df)
+
+
+@pytest.mark.parametrize("n_jobs", [None, 1, 4, -1])
+def test_column_checks_n_jobs(n_jobs):
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [3, 2, 1], 'C': ['a', 'b', 'c']})
+    tm.assert_frame_equal(df, ck.unique(df, n_jobs=n_jobs))
+    tm.assert_frame_equal(df, ck.is_monotonic(df, items={'A': (True, True), 'B': (False, True)},
+                                              n_jobs=n_jobs))
+    tm.assert_frame_equal(df, ck.has_vals_within_set(df, {'A': [1, 2, 3], 'C': list('abc')},
+                                                     n_jobs=n_jobs))
+    tm.assert_frame_equal(df, ck.has_vals_within_range(df, {'A': (1, 3), 'B': (1, 3)},
+                                                       n_jobs=n_jobs))
+
+    df = pd.DataFrame({'A': [1, 1, 3], 'B': [3, 2, 2], 'C': ['a', 'a', 'c']})
+    with pytest.raises(AssertionError, match="'B'"):
+        ck.unique(df, columns=['B', 'C', 'A'], n_jobs=n_jobs)
+    with pytest.raises(AssertionError) as excinfo:
+        ck.has_vals_within_set(df, {'B': [3], 'C': ['c']}, n_jobs=n_jobs)
+    assert excinfo.value.args[1].name == 'B'
+    with pytest.raises(AssertionError) as excinfo:
+        ck.has_vals_within_range(df, {'C': ('b', 'c'), 'A': (2, 3)}, n_jobs=n_jobs)
+    assert excinfo.value.args[1].name == 'C'
+    with pytest.raises(AssertionError) as excinfo:
+        ck.is_monotonic(df[['A', 'B']], increasing=True, strict=True, n_jobs=n_jobs)
+    assert list(excinfo.value.args[0]) == [(1, 'A'), (1, 'B'), (2, 'B')]
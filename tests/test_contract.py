@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.checks as ck
+from bulwark import engine
+from bulwark.contract import Contract
+from bulwark.results import ValidationReport
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, 2, 3, 4],
+                         "b": [0.5, 1.5, np.nan, 2.5],
+                         "c": ["x", "y", "x", "z"],
+                         "d": pd.date_range("2020-01-01", periods=4)})
+
+
+def test_contract_passes(df):
+    contract = Contract({ck.has_columns: {"columns": ["a", "b", "c", "d"], "exact_order": True},
+                         ck.is_shape: {"shape": (-1, 4)},
+                         ck.has_dtypes: {"items": {"a": "int64", "c": object}},
+                         ck.has_schema: {"schema": {"b": "float", "d": "datetime"}},
+                         ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}},
+                         ck.has_set_within_vals: {"items": {"c": ["x", "z"]}},
+                         ck.has_vals_within_range: {"items": {"a": (1, 4), "b": (0, 3)}},
+                         ck.unique: {"columns": ["a", "d"]},
+                         ck.is_monotonic: {"items": {"a": (True, True), "d": (None, True)}}})
+    assert all(step.passes is not None for step in contract._steps)
+    assert contract.errors(df) == []
+    tm.assert_frame_equal(contract.validate(df), df)
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_columns, {"columns": ["b", "a"], "exact_order": True}),
+    (ck.has_columns, {"columns": ["a"], "exact_cols": True}),
+    (ck.is_shape, {"shape": (3, None)}),
+    (ck.has_dtypes, {"items": {"a": "float64"}}),
+    (ck.has_schema, {"schema": {"c": "numeric"}}),
+    (ck.has_vals_within_set, {"items": {"c": ["x", "y"]}}),
+    (ck.has_vals_within_set, {"items": {"b": [0.5, 1.5, 2.5, None]}}),
+    (ck.has_set_within_vals, {"items": {"c": ["x", "w"]}}),
+    (ck.has_set_within_vals, {"items": {"b": [np.nan]}}),
+    (ck.has_vals_within_range, {"items": {"a": (2, 4)}}),
+    (ck.unique, {"columns": ["c"]}),
+    (ck.is_monotonic, {"items": {"a": (False, False)}}),
+    (ck.is_monotonic, {"items": {"b": (False, False)}}),
+])
+def test_contract_failure_matches_check(df, func, params):
+    errors = Contract({func: params}).errors(df)
+    expected = engine.run_checks(df, {func: params})
+    assert [str(e) for e in errors] == [str(e) for e in expected]
+    assert len(errors) == 1
+
+
+def test_contract_decorator(df):
+    contract = Contract({ck.has_no_nans: {"columns": ["a"]},
+                         ck.has_vals_within_range: {"items": {"a": (0, 1)}},
+                         ck.unique: {"columns": ["c"]}})
+
+    @contract
+    def load():
+        return df
+
+    with pytest.raises(AssertionError) as excinfo:
+        load()
+    assert str(excinfo.value).startswith("('Outside range'")
+    assert str(excinfo.value).endswith("Column 'c' contains non-unique values")
+
+    with pytest.raises(ValidationReport) as excinfo:
+        Contract({ck.unique: {"columns": ["c"]}}).validate(df)
+    assert len(excinfo.value.failures) == 1
+    assert Contract(contract.checks, warn=True).validate(df) is df
+
+
+def test_contract_compiles_once(df, monkeypatch):
+    contract = Contract({ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}}})
+    monkeypatch.setattr(ck, "has_vals_within_set", None)
+    for _ in range(3):
+        contract.validate(df)
+
+
+def test_contract_rejects_bad_params():
+    with pytest.raises(TypeError):
+        Contract({ck.unique: {"cols": ["a"]}})
+    with pytest.raises(ValueError):
+        Contract({ck.has_schema: {"schema": {"a": "nope"}}})
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import concurrent.futures
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.decorators as dc
+
+
+def _noop(df):
+    return df
+
+
+def _length_at_least(df, length):
+    if len(df) < length:
+        raise AssertionError("df is too short.")
+
+
+def test_every_n_calls():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    decorator = dc.HasNoNans(every_n_calls=3)
+    decorated = decorator(_noop)
+
+    with pytest.raises(AssertionError):
+        decorated(df)
+    tm.assert_frame_equal(decorated(df), df)
+    tm.assert_frame_equal(decorated(df), df)
+    with pytest.raises(AssertionError):
+        decorated(df)
+    assert (decorator.n_calls, decorator.n_skipped) == (4, 2)
+
+
+def test_sample_calls_is_deterministic():
+    df = pd.DataFrame({"a": [1, 2]})
+
+    def skipped(seed):
+        decorator = dc.IsShape((2, 1), sample_calls=.3, seed=seed)
+        decorated = decorator(_noop)
+        for _ in range(200):
+            decorated(df)
+        return decorator.n_skipped
+
+    assert skipped(1) == skipped(1)
+    assert 100 < skipped(1) < 180
+    assert skipped(1) != skipped(2)
+
+
+def test_sample_calls_zero_skips_everything():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    decorator = dc.HasNoNans(sample_calls=0.)
+    for _ in range(5):
+        decorator(_noop)(df)
+    assert decorator.n_skipped == 5
+
+
+@pytest.mark.parametrize("sample_rows", [10, .01])
+def test_sample_rows(sample_rows):
+    df = pd.DataFrame({"a": np.arange(1000)})
+    seen = []
+
+    def record(df):
+        seen.append(df)
+
+    dc.CustomCheck(record, sample_rows=sample_rows)(_noop)(df)
+    assert 0 < len(seen[0]) <= 10
+    assert seen[0]["a"].is_monotonic_increasing
+    assert seen[0]["a"].isin(df["a"]).all()
+
+
+def test_custom_check_sampling():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    decorator = dc.CustomCheck(_length_at_least, 4, every_n_calls=2)
+    with pytest.raises(AssertionError):
+        decorator(_noop)(df)
+    tm.assert_frame_equal(decorator(_noop)(df), df)
+    assert (decorator.n_calls, decorator.n_skipped) == (2, 1)
+
+    tm.assert_frame_equal(dc.CustomCheck(check_func=_length_at_least, length=2)(_noop)(df), df)
+
+
+def test_coroutine_functions_are_checked_off_the_loop():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    threads = []
+
+    def record_thread(df):
+        threads.append(threading.get_ident())
+
+    @dc.CustomCheck(record_thread)
+    async def load():
+        await asyncio.sleep(0)
+        return df
+
+    @dc.HasNoNans()
+    async def load_bad():
+        return pd.DataFrame({"a": [np.nan]})
+
+    async def main():
+        loaded = await load()
+        with pytest.raises(AssertionError):
+            await load_bad()
+        return loaded
+
+    assert asyncio.iscoroutinefunction(load)
+    tm.assert_frame_equal(asyncio.run(main()), df)
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_coroutine_executor():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+
+    async def load():
+        return df
+
+    with concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="checks") as executor:
+        names = []
+        decorated = dc.CustomCheck(lambda df: names.append(threading.current_thread().name),
+                                   executor=executor, every_n_calls=2)(load)
+        for _ in range(3):
+            asyncio.run(decorated())
+    assert len(names) == 2 and names[0].startswith("checks")
+
+
+def test_deferred_checks_return_immediately():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    release = threading.Event()
+
+    def blocked_no_nans(df):
+        assert release.wait(5)
+        assert df["a"].notna().all()
+
+    errors = []
+    decorator = dc.CustomCheck(blocked_no_nans, defer=True, on_failure=errors.append)
+    decorated = decorator(_noop)
+    tm.assert_frame_equal(decorated(df), df)
+    assert decorator.failures.empty()
+
+    release.set()
+    failures = decorator.wait()
+    assert len(failures) == 1 and isinstance(failures[0], AssertionError)
+    assert errors == failures
+    assert decorator.failures.get_nowait() is failures[0]
+    assert decorator.wait() == []
+
+
+def test_deferred_executor_and_queue():
+    failures = queue.Queue()
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        decorator = dc.HasNoNans(defer=executor, failures=failures)
+        decorated = decorator(_noop)
+        decorated(pd.DataFrame({"a": [1.]}))
+        decorated(pd.DataFrame({"a": [np.nan]}))
+        future = decorator.submit(pd.DataFrame({"a": [np.nan, 2.]}))
+        assert isinstance(future.exception(5), AssertionError)
+        decorator.wait()
+    assert failures.qsize() == 2
+    assert decorator.n_calls == 2
+
+
+def test_deferred_checks_are_bounded():
+    release = threading.Event()
+
+    def blocked(df):
+        assert release.wait(5)
+        assert df["a"].notna().all()
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        decorator = dc.CustomCheck(blocked, defer=executor, max_pending=2,
+                                   failures=queue.Queue(1))
+        decorated = decorator(_noop)
+        df = pd.DataFrame({"a": [np.nan]})
+        decorated(df)
+        decorated(df)
+        third = executor.submit(decorated, df)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            third.result(timeout=0.2)
+        release.set()
+        tm.assert_frame_equal(third.result(5), df)
+        decorator.wait()
+    assert decorator.failures.qsize() == 1
+    assert decorator.n_failures_dropped == 2
+
+
+def test_cancelled_coroutine_gives_up_its_slot():
+    release = threading.Event()
+    df = pd.DataFrame({"a": [1]})
+
+    async def load():
+        return df
+
+    async def main(decorator, decorated):
+        await decorated()
+        waiting = asyncio.ensure_future(decorated())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await asyncio.get_running_loop().run_in_executor(None, decorator.wait)
+        # The slot is free again, and handed to the next coroutine waiting for one.
+        release.clear()
+        await decorated()
+        handed = asyncio.ensure_future(decorated())
+        await asyncio.sleep(0.05)
+        release.set()
+        tm.assert_frame_equal(await asyncio.wait_for(handed, 5), df)
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        decorator = dc.CustomCheck(lambda df: release.wait(5), defer=executor, max_pending=1)
+        asyncio.run(main(decorator, decorator(load)))
+        decorator.wait()
+    assert decorator._slots.acquire(blocking=False)
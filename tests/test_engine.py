@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark import engine
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, 2, 3, 4],
+                         "b": [0.5, 1.5, np.nan, 2.5],
+                         "c": ["x", "y", "x", "z"],
+                         "d": pd.date_range("2020-01-01", periods=4)})
+
+
+def test_run_checks_fused_passes(df):
+    checks = {ck.has_no_nans: {"columns": ["a", "c", "d"]},
+              ck.has_no_infs: {},
+              ck.has_no_neg_infs: {"columns": ["a", "b"]},
+              ck.has_vals_within_range: {"items": {"a": (1, 4), "b": (0, 3)}},
+              ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}},
+              ck.has_set_within_vals: {"items": {"c": ["x", "z"]}},
+              ck.unique: {"columns": ["a", "d"]},
+              ck.is_monotonic: {"items": {"a": (True, True), "d": (None, True)}}}
+    assert engine.run_checks(df, checks) == []
+
+
+def test_run_checks_shares_facts(df, monkeypatch):
+    calls = []
+    original = engine.FrameFacts.__getitem__
+
+    def counting_getitem(self, col):
+        facts = original(self, col)
+        calls.append(facts)
+        return facts
+
+    monkeypatch.setattr(engine.FrameFacts, "__getitem__", counting_getitem)
+    engine.run_checks(df, {ck.has_vals_within_range: {"items": {"a": (1, 4)}},
+                           ck.unique: {"columns": ["a"]},
+                           ck.is_monotonic: {"items": {"a": (True, True)}}})
+    assert len(set(map(id, calls))) == 1
+    assert set(calls[0]._cache) == {"null_extremes", "null_count", "min", "max", "is_unique",
+                                    "is_monotonic_increasing"}
+
+
+def test_null_count_and_extremes_in_one_pass(monkeypatch):
+    facts = engine.ColumnFacts(pd.Series([2., np.nan, -1.]))
+    for method in ["isna", "min", "max"]:
+        monkeypatch.setattr(pd.Series, method, None)
+    assert (facts.null_count, facts.min, facts.max) == (1, -1., 2.)
+
+    monkeypatch.undo()
+    facts = engine.ColumnFacts(pd.Series(["b", None, "a"]))
+    assert (facts.null_count, facts.min) == (1, engine._UNAVAILABLE)
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_no_nans, {"columns": ["b"]}),
+    (ck.has_vals_within_range, {"items": {"a": (2, 4)}}),
+    (ck.has_vals_within_set, {"items": {"c": ["x", "y"]}}),
+    (ck.has_set_within_vals, {"items": {"c": ["x", "w"]}}),
+    (ck.unique, {"columns": ["c"]}),
+    (ck.is_monotonic, {"items": {"a": (False, False)}}),
+])
+def test_run_checks_failure_matches_check(df, func, params):
+    errors = engine.run_checks(df, {func: params})
+    assert len(errors) == 1
+
+    with pytest.raises(Exception) as excinfo:
+        func(df, **params)
+    assert type(errors[0]) is excinfo.type
+    assert str(errors[0]) == str(excinfo.value)
+
+
+def test_run_checks_delegates_unknown_checks(df):
+    def always_fails(df):
+        raise AssertionError("nope")
+
+    errors = engine.run_checks(df, {always_fails: {}, ck.is_shape: {"shape": (4, 4)}})
+    assert [str(e) for e in errors] == ["nope"]
+
+
+def test_run_checks_infs(df):
+    df["b"] = [0.5, np.inf, np.nan, -np.inf]
+    assert len(engine.run_checks(df, {ck.has_no_infs: {"columns": ["b"]}})) == 1
+    assert len(engine.run_checks(df, {ck.has_no_neg_infs: {"columns": ["b"]}})) == 1
+    assert engine.run_checks(df, {ck.has_no_infs: {"columns": ["a", "d"]}}) == []
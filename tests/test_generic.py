@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.generic import CheckRegistry, LabeledFrame, bad_locations, call_with_arguments
+from bulwark.generic import referenced_columns
+
+
+def test_bad_locations():
+    df = pd.DataFrame({"a": [False, True, False], "b": [True, False, True]},
+                      index=["x", "y", "z"])
+    locs = bad_locations(df)
+    assert list(locs) == [("y", "a"), ("x", "b"), ("z", "b")]
+    assert len(locs) == 3
+    assert repr(locs) == "[('y', 'a'), ('x', 'b'), ('z', 'b')]"
+
+
+def test_bad_locations_capped():
+    df = pd.DataFrame(np.ones((1000, 3), dtype=bool), columns=list("abc"))
+    locs = bad_locations(df, max_locations=2)
+    assert len(locs) == 3000
+    assert list(locs) == [(0, "a"), (1, "a")]
+    assert repr(locs) == "[(0, 'a'), (1, 'a')] ... and 2998 more"
+
+
+def test_bad_locations_none():
+    locs = bad_locations(pd.DataFrame({"a": [False, np.nan]}, dtype=object))
+    assert len(locs) == 0
+    assert repr(locs) == "[]"
+
+
+def test_referenced_columns():
+    df = pd.DataFrame(columns=["a", "b", "c"])
+    assert referenced_columns(df, {}) == ["a", "b", "c"]
+    assert referenced_columns(df, {"columns": ["b", "x"]}) == ["b"]
+    assert referenced_columns(df, {"items": {"c": (0, 1), "a": (0, 1)}}) == ["c", "a"]
+    assert referenced_columns(df, {"unitcol": "a", "manycol": ["b", "c"]}) == ["a", "b", "c"]
+
+
+def test_call_with_arguments():
+    def planner(facts, items=None):
+        return facts, items
+
+    def anything(facts, **kwargs):
+        return kwargs
+
+    arguments = {"items": {"a": (0, 1)}, "n_jobs": 4}
+    assert call_with_arguments(planner, arguments, "facts") == ("facts", {"a": (0, 1)})
+    assert call_with_arguments(anything, arguments, "facts") == arguments
+
+
+def test_check_registry():
+    registry = CheckRegistry()
+
+    @registry.register("unique", "has_unique_index")
+    def proves(frame, columns=None):
+        if columns == ["bad"]:
+            raise KeyError("bad")
+        return frame, columns
+
+    assert registry.lookup(ck.unique) is registry.lookup(ck.has_unique_index) is proves
+    assert registry.lookup(ck.has_no_nans) is None
+    assert registry.lookup(lambda df: df) is None
+
+    assert registry.call(ck.unique, {"columns": ["a"]}, "frame") == ("frame", ["a"])
+    assert registry.call(ck.has_no_nans, {}, "frame") is None
+    with pytest.raises(TypeError):
+        registry.call(ck.unique, {"cols": ["a"]}, "frame")
+
+    assert registry.attempt(ck.unique, {}, "frame", default=False) == ("frame", None)
+    for func, params in [(ck.unique, {"cols": ["a"]}), (ck.unique, {"columns": ["bad"]}),
+                         (ck.has_no_nans, {})]:
+        assert registry.attempt(func, params, "frame", default=False) is False
+
+
+def test_labeled_frame():
+    frame = LabeledFrame()
+    frame.labels = ["a", "b"]
+    assert frame.columns() == ["a", "b"]
+    assert frame.columns(["b"]) == ["b"]
+    assert frame.columns(("a", "b")) is None
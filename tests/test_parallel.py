@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark.parallel import ProcessBackend, default_backend, map_columns
+from bulwark.results import ValidationResult
+
+
+def _noop(df):
+    return df
+
+
+def _no_lowercase(df, col):
+    if df[col].str.islower().any():
+        raise AssertionError("{} has lowercase values".format(col))
+
+
+@pytest.fixture(scope="module")
+def backend():
+    return ProcessBackend(n_jobs=2)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": np.arange(5), "b": np.linspace(0, 1, 5),
+                         "c": list("ABCDE"),
+                         "d": pd.date_range("2020", periods=5, tz="UTC")},
+                        index=pd.Index(np.arange(10, 15), name="idx"))
+
+
+def test_map_columns_keeps_order():
+    assert list(map_columns(lambda x: x * 2, range(10), n_jobs=4)) == list(range(0, 20, 2))
+
+
+def test_process_backend_passes(df, backend):
+    checks = {ck.has_vals_within_range: {"items": {"a": (0, 4), "b": (0, 1)}},
+              ck.unique: {},
+              ck.is_monotonic: {"items": {"a": (True, True)}},
+              ck.has_dtypes: {"items": {"d": "datetime64[ns, UTC]"}},
+              ck.custom_check: {"check_func": _no_lowercase, "col": "c"}}
+    assert backend.run_checks(df, checks) == []
+    tm.assert_frame_equal(df, ck.multi_check(df, checks, backend=backend))
+
+
+def test_process_backend_errors_match(df, backend):
+    checks = {ck.has_vals_within_range: {"items": {"a": (0, 4), "b": (0, .5)}},
+              ck.has_no_nans: {},
+              ck.has_vals_within_set: {"items": {"c": list("ABC")}},
+              ck.is_monotonic: {"items": {"b": (False, False)}}}
+    errors = backend.run_checks(df, checks)
+    expected = [str(e) for e in ck.engine.run_checks(df, checks)]
+    assert [str(e) for e in errors] == expected
+    assert len(errors) == 3
+
+
+def test_process_backend_unpicklable_runs_locally(df, backend):
+    def fails(df):
+        raise AssertionError("local")
+
+    assert [str(e) for e in backend.run_checks(df, {fails: {}})] == ["local"]
+
+
+def test_decorator_backend(df, backend):
+    tm.assert_frame_equal(dc.Unique(backend=backend)(_noop)(df), df)
+    with pytest.raises(AssertionError, match="Outside range"):
+        dc.HasValsWithinRange({"a": (0, 4), "b": (0, .5)}, backend=backend)(_noop)(df)
+
+    df.loc[12, "c"] = "x"
+    with pytest.raises(AssertionError, match="_no_lowercase is not true"):
+        dc.CustomCheck(_no_lowercase, "c", backend=backend)(_noop)(df)
+
+
+def test_process_backend_keeps_its_pool(df, backend):
+    backend.run_checks(df, {ck.unique: {}})
+    executor = backend._executor
+    df.loc[12, "c"] = "A"
+    assert len(backend.run_checks(df, {ck.unique: {"columns": ["c"]}})) == 1
+    assert backend._executor is executor
+    assert default_backend() is default_backend()
+
+    with ProcessBackend(n_jobs=1) as closing:
+        assert closing.run_checks(df, {ck.has_no_nans: {}}) == []
+    assert closing._executor is None
+
+
+def test_process_backend_errors_are_summaries(df, backend):
+    df["b"] = [0., 2., 0., 3., np.nan]
+    errors = backend.run_checks(df, {ck.has_vals_within_range: {"items": {"b": (0, 1)}},
+                                     ck.has_vals_within_set: {"items": {"c": list("AB")}}})
+    assert all(isinstance(e, ValidationResult) and e._args is None for e in errors)
+    assert [(e.check, e.column, e.n_violations, e.positions.tolist()) for e in errors] == \
+        [("has_vals_within_range", "b", 2, [1, 3]), ("has_vals_within_set", "c", 3, [2, 3, 4])]
+    assert str(errors[1]) == str(ck.engine.run_checks(
+        df, {ck.has_vals_within_set: {"items": {"c": list("AB")}}})[0])
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark import engine
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from bulwark.parquet import ParquetValidator, validate_parquet  # noqa: E402
+
+
+def _write(tmp_path, df, row_group_size=4, **kwargs):
+    path = str(tmp_path / "data.parquet")
+    pq.write_table(pa.Table.from_pandas(df), path, row_group_size=row_group_size, **kwargs)
+    return path
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"i": np.arange(20),
+                         "f": np.linspace(0., 1., 20),
+                         "s": ["x", "y"] * 10,
+                         "t": pd.date_range("2020-01-01", periods=20, freq="h"),
+                         "k": np.repeat([1, 2, 2, 3, 5], 4)})
+
+
+PASSING = {ck.has_no_nans: {"columns": ["i", "s", "t"]},
+           ck.has_no_nones: {},
+           ck.has_vals_within_range: {"items": {"i": (0, 19), "f": (0., 1.),
+                                                "t": (pd.Timestamp("2020"), pd.Timestamp("2021"))}},
+           ck.is_monotonic: {"items": {"k": (True, False)}},
+           ck.has_columns: {"columns": ["i", "f"]},
+           ck.is_shape: {"shape": (20, 5)}}
+
+
+def test_passes_from_statistics(tmp_path, df):
+    path = _write(tmp_path, df.assign(k=3))
+    validator = ParquetValidator(PASSING)
+    assert validator.validate(path) == path
+    assert (validator.n_row_groups, validator.n_row_groups_read) == (5, 0)
+
+
+def test_reads_undecided_row_groups_only(tmp_path, df):
+    df.loc[5, "f"] = np.nan
+    df["n"] = pd.Series([1.] * 20).where(df.index != 13)
+    df.loc[0, "k"] = 0
+    path = _write(tmp_path, df)
+    validator = ParquetValidator({ck.has_no_nans: {"columns": ["i"]},
+                                  ck.has_vals_within_range: {"items": {"i": (0, 19)}},
+                                  ck.has_no_nones: {"columns": ["n"]},
+                                  ck.is_monotonic: {"items": {"k": (True, False)}}})
+    validator.validate(path)
+    # Only row group 0 isn't constant in k, and only row group 3 has a null in n.
+    assert (validator.n_row_groups, validator.n_row_groups_read) == (5, 2)
+
+    validator = ParquetValidator({ck.has_no_nans: {"columns": ["f"]}})
+    with pytest.raises(AssertionError):
+        validator.validate(path)
+    assert validator.n_row_groups_read == 2
+
+
+def test_monotonic_across_row_groups(tmp_path, df):
+    df["k"] = [1, 2, 3, 4, 4, 3, 2, 1] + [1] * 12
+    path = _write(tmp_path, df)
+    with pytest.raises(AssertionError):
+        validate_parquet(path, {ck.is_monotonic: {"items": {"k": (True, False)}}})
+
+    # Each row group is monotonic, but they don't follow each other.
+    df["k"] = [0, 1, 2, 3, 2, 3, 4, 5] + [9] * 12
+    path = _write(tmp_path, df)
+    validator = ParquetValidator({ck.is_monotonic: {"items": {"k": (True, False)}}})
+    assert len(validator.run_checks(path)) == 1
+    validator = ParquetValidator({ck.is_monotonic: {"items": {"k": (None, True)}}})
+    assert len(validator.run_checks(path)) == 1
+
+    df["k"] = [5, 5, 5, 5] + [np.nan] * 4 + [6, 5, 4, 3] + [3] * 8
+    path = _write(tmp_path, df)
+    assert ParquetValidator({ck.is_monotonic: {"items": {"k": (None, False)}}}) \
+        .run_checks(path) == []
+    assert len(ParquetValidator({ck.is_monotonic: {"items": {"k": (True, False)}}})
+               .run_checks(path)) == 1
+
+
+def test_trust_sorting(tmp_path, df):
+    path = _write(tmp_path, df, sorting_columns=[pq.SortingColumn(0)])
+    checks = {ck.is_monotonic: {"items": {"i": (True, False)}}}
+    validator = ParquetValidator(checks)
+    validator.validate(path)
+    assert validator.n_row_groups_read == 5
+
+    validator = ParquetValidator(checks, trust_sorting=True)
+    validator.validate(path)
+    assert validator.n_row_groups_read == 0
+
+    # Strictness can't be proven from sortedness.
+    validator = ParquetValidator({ck.is_monotonic: {"items": {"i": (True, True)}}},
+                                 trust_sorting=True)
+    validator.validate(path)
+    assert validator.n_row_groups_read == 5
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_no_nans, {}),
+    (ck.has_no_nans, {"columns": ["i", "n"]}),
+    (ck.has_vals_within_range, {"items": {"i": (2, 15), "f": (0., 1.)}}),
+    (ck.has_vals_within_range, {"items": {"t": (pd.Timestamp("2020"),
+                                                pd.Timestamp("2020-01-01 12:00"))}}),
+    (ck.is_monotonic, {"items": {"i": (True, True), "k": (True, True)}}),
+    (ck.is_monotonic, {"items": {"k": (False, False)}}),
+    (ck.has_columns, {"columns": ["i"], "exact_cols": True}),
+    (ck.is_shape, {"shape": (3, 6)}),
+    (ck.unique, {"columns": ["s"]}),
+])
+def test_failure_matches_check(tmp_path, df, func, params):
+    df["n"] = pd.array([1, None] * 10, dtype="Int64")
+    df.index = df.index + 100
+    path = _write(tmp_path, df)
+    errors = ParquetValidator({func: params}).run_checks(path)
+    expected = engine.run_checks(df, {func: params})
+    assert [str(e) for e in errors] == [str(e) for e in expected]
+    assert len(errors) == 1
+
+
+def test_validate_warn(tmp_path, df, capsys):
+    path = _write(tmp_path, df)
+    checks = {ck.has_vals_within_range: {"items": {"i": (0, 5)}}}
+    assert validate_parquet(path, checks, warn=True) == path
+    assert capsys.readouterr().out
+    with pytest.raises(AssertionError):
+        validate_parquet(pq.ParquetFile(path), checks)
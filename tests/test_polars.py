@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark import engine
+
+pl = pytest.importorskip("polars")
+pytest.importorskip("pyarrow")
+
+from bulwark.polars import PolarsBackend, PolarsFrame  # noqa: E402
+
+
+def _identity(df):
+    return df
+
+
+@pytest.fixture
+def frame():
+    return pl.DataFrame({"a": [1, 2, 3, 4],
+                         "b": [0.5, 1.5, None, 2.5],
+                         "c": ["x", "y", "x", "z"],
+                         "d": pd.date_range("2020-01-01", periods=4)})
+
+
+PASSING = {ck.has_no_nans: {"columns": ["a", "c", "d"]},
+           ck.has_no_infs: {},
+           ck.has_vals_within_range: {"items": {"a": (1, 4), "b": (0, 3)}},
+           ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}},
+           ck.has_set_within_vals: {"items": {"c": ["x", "z"]}},
+           ck.unique: {"columns": ["a", "d"]},
+           ck.is_monotonic: {"items": {"a": (True, True), "d": (None, True)}},
+           ck.has_columns: {"columns": ["a", "b"]},
+           ck.is_shape: {"shape": (4, 4)}}
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_polars_backend_passes_in_one_select(frame, lazy, monkeypatch):
+    monkeypatch.setattr(PolarsFrame, "to_pandas", None)
+    selects = []
+    select = PolarsFrame.select
+    monkeypatch.setattr(PolarsFrame, "select",
+                        lambda self, exprs: selects.append(exprs) or select(self, exprs))
+    assert PolarsBackend().run_checks(frame.lazy() if lazy else frame, PASSING) == []
+    assert len(selects) == 1
+
+
+def test_polars_frame_treats_nan_as_null():
+    frame = pl.DataFrame({"f": [1., float("nan"), 0.5]})
+    backend = PolarsBackend()
+    assert len(backend.run_checks(frame, {ck.has_no_nans: {}})) == 1
+    assert backend.run_checks(frame, {ck.has_vals_within_range: {"items": {"f": (0, 1)}}}) == []
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_no_nans, {}),
+    (ck.has_vals_within_range, {"items": {"a": (2, 4)}}),
+    (ck.has_vals_within_set, {"items": {"c": ["x", "y"]}}),
+    (ck.has_set_within_vals, {"items": {"c": ["x", "w"]}}),
+    (ck.unique, {"columns": ["c"]}),
+    (ck.is_monotonic, {"items": {"a": (False, False)}}),
+    (ck.has_columns, {"columns": ["a"], "exact_cols": True}),
+    (ck.is_shape, {"shape": (3, 4)}),
+    (ck.has_vals_within_set, {"items": {"a": ["1", "2"]}}),  # polars can't compare these
+])
+def test_polars_backend_failure_matches_check(frame, func, params):
+    errors = PolarsBackend().run_checks(frame.lazy(), {func: params})
+    expected = engine.run_checks(frame.to_pandas(), {func: params})
+    assert [str(e) for e in errors] == [str(e) for e in expected]
+    assert len(errors) == 1
+
+
+def test_polars_backend_untranslated_check(frame):
+    checks = {ck.has_no_x: {"values": ["y"], "columns": ["c"]},
+              ck.has_vals_within_set: {"items": {"c": ["x", "y", "z"]}}}
+    errors = PolarsBackend().run_checks(frame, checks)
+    expected = engine.run_checks(frame.to_pandas(), checks)
+    assert [str(e) for e in errors] == [str(e) for e in expected]
+    assert len(errors) == 1
+
+
+def test_polars_backend_option(frame):
+    assert ck.multi_check(frame, PASSING, backend="polars") is frame
+    assert dc.Unique(["a"], backend="polars")(_identity)(frame) is frame
+
+    with pytest.raises(AssertionError, match="non-unique"):
+        dc.Unique(["c"], backend="polars")(_identity)(frame)
+    with pytest.raises(AssertionError):
+        dc.HasNoNans(backend="polars")(_identity)(pl.LazyFrame({"n": [1., np.nan]}))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import io
+import threading
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark import profiling
+from bulwark.profiling import CheckProfiler, CheckStats
+
+
+def _noop(df):
+    return df
+
+
+def _has_rows(df):
+    if not len(df):
+        raise AssertionError("empty")
+
+
+@pytest.fixture
+def events():
+    recorded = []
+    profiling.add_hook(recorded.append)
+    yield recorded
+    profiling.remove_hook(recorded.append)
+
+
+def test_decorator_events(events):
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [1., np.nan, 3.]})
+    dc.HasNoNans(columns=["a"])(_noop)(df)
+    with pytest.raises(AssertionError):
+        dc.HasNoNans()(_noop)(df)
+    dc.CustomCheck(_has_rows, sample_rows=2)(_noop)(df)
+
+    assert [(e.name, e.func, e.n_rows, e.n_columns, e.passed) for e in events] == [
+        ("has_no_nans", _noop, 3, 1, True),
+        ("has_no_nans", _noop, 3, 2, False),
+        ("_has_rows", _noop, 2, 2, True)]
+    assert all(e.seconds > 0 and e.peak_bytes is None for e in events)
+
+
+def test_multi_check_events(events):
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    with pytest.raises(AssertionError):
+        ck.multi_check(df, {ck.unique: {}, ck.has_vals_within_range: {"items": {"a": (0, 2)}}})
+    assert [(e.name, e.func, e.passed) for e in events] == [
+        ("unique", None, True), ("has_vals_within_range", None, False)]
+
+
+def test_no_hooks_no_measurement():
+    assert profiling.measure(pd.DataFrame(), ck.unique, {}) is profiling._NO_MEASUREMENT
+
+
+def test_profiler_traces_memory():
+    df = pd.DataFrame({"a": np.arange(10 ** 5)})
+    with CheckProfiler(trace_memory=True) as profiler:
+        for _ in range(3):
+            dc.Unique()(_noop)(df)
+    stats = profiler.stats["unique"]
+    assert (stats.count, stats.n_failed, stats.total_rows) == (3, 0, 3 * 10 ** 5)
+    assert stats.peak_bytes > 0
+    assert profiler not in profiling._HOOKS
+
+    out = io.StringIO()
+    profiler.dump(out)
+    assert out.getvalue().startswith("unique: 3 calls, 0 failed")
+
+
+def test_memory_measured_in_one_thread_at_a_time(events):
+    measured, started, done = threading.Event(), threading.Event(), threading.Event()
+
+    def _held(df):
+        started.set()
+        done.wait(5)
+
+    df = pd.DataFrame({"a": [1]})
+    tracemalloc.start()
+    try:
+        thread = threading.Thread(target=dc.CustomCheck(_held)(_noop), args=(df,))
+        thread.start()
+        started.wait(5)
+        dc.CustomCheck(lambda df: measured.set())(_noop)(df)
+        done.set()
+        thread.join()
+    finally:
+        tracemalloc.stop()
+    assert measured.is_set()
+    assert [e.peak_bytes is None for e in events] == [True, False]
+
+
+def test_check_stopping_tracemalloc(events):
+    df = pd.DataFrame({"a": [1]})
+    tracemalloc.start()
+    try:
+        dc.CustomCheck(lambda df: tracemalloc.stop())(_noop)(df)
+    finally:
+        tracemalloc.stop()
+    assert events[0].peak_bytes is None
+    assert not profiling._STACK.peaks
+
+    # The lock was released, so other threads' checks are measured again.
+    acquired = []
+
+    def _acquire():
+        acquired.append(profiling._MEMORY_LOCK.acquire(blocking=False))
+        if acquired[0]:
+            profiling._MEMORY_LOCK.release()
+
+    thread = threading.Thread(target=_acquire)
+    thread.start()
+    thread.join()
+    assert acquired == [True]
+
+
+def test_check_stats_histogram():
+    stats = CheckStats()
+    for seconds in [1e-7, 3e-6, 3e-6, 1e-3]:
+        stats.add(profiling.CheckEvent("c", None, None, 1, 1, seconds, None, True))
+    assert stats.histogram() == [(1e-6, 1), (4e-6, 2), (1e-6 * 2 ** 10, 1)]
+    assert stats.quantile(.5) == 4e-6
+    assert stats.quantile(1.) == 1e-3
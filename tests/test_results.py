@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.checks as ck
+from bulwark.results import ValidationReport, ValidationResult, check_result
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, 7, 3, 9, 5], "b": ["x", "y", "z", "x", "w"]},
+                        index=list("pqrst"))
+
+
+def test_within_set_result_is_lazy(df):
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_set(df, items={"b": ["x", "y"]})
+    result = e.value
+    assert isinstance(result, ValidationResult)
+    assert (result.check, result.column, result.n_violations) == ("has_vals_within_set", "b", 2)
+    assert result.positions.tolist() == [2, 4]
+    assert result.samples == ["z", "w"]
+    assert result._args is None
+
+    assert result.args[0] == "Not in set"
+    tm.assert_series_equal(result.args[1], df.loc[~df["b"].isin(["x", "y"]), "b"])
+    assert str(result) == str(AssertionError(*result.args))
+
+
+@pytest.mark.parametrize("values", [[1, 7, 3, 9, 5], pd.array([1, 7, None, 9, 5], "Int64")])
+def test_within_range_result(values):
+    df = pd.DataFrame({"a": values})
+    result = check_result(df, ck.has_vals_within_range, items={"a": (0, 6)})
+    assert not result.passed
+    assert (result.column, result.n_violations, result.samples) == ("a", 2, [7, 9])
+    assert result.positions.tolist() == [1, 3]
+    tm.assert_series_equal(result.args[1], (0 > df["a"]) | (6 < df["a"]))
+    assert result.summary() == \
+        "has_vals_within_range: failed, 2 violations in column 'a', e.g. [7, 9]"
+
+
+def test_has_no_x_result():
+    df = pd.DataFrame({"a": [1., np.nan, np.nan], "b": [1., 2., 3.]})
+    result = check_result(df, ck.has_no_nans)
+    assert (result.check, result.column, result.n_violations) == ("has_no_nans", "a", 2)
+    assert list(result.args[0]) == [(1, "a"), (2, "a")]
+
+
+def test_check_result_of_plain_errors(df):
+    assert check_result(df, ck.unique, columns=["a"]).passed
+    result = check_result(df, ck.has_columns, columns=["c"])
+    assert (result.check, result.n_violations, result.passed) == ("has_columns", None, False)
+    assert "c" in str(result)
+    assert result.summary() == "has_columns: failed"
+
+
+def test_multi_check_report(df):
+    checks = {ck.has_vals_within_range: {"items": {"a": (0, 6)}},
+              ck.has_vals_within_set: {"items": {"b": ["x", "y"]}},
+              ck.unique: {"columns": ["a"]}}
+    report = ck.multi_check(df, checks, report=True)
+    assert isinstance(report, ValidationReport)
+    assert not report.passed and len(report.failures) == 2
+    assert all(result._args is None for result in report)
+
+    with pytest.raises(AssertionError) as e:
+        ck.multi_check(df, checks)
+    assert str(e.value) == "\n".join(str(result) for result in report)
+    assert ck.multi_check(df, {ck.unique: {"columns": ["a"]}}, report=True).passed
+
+
+def test_results_pickle_and_args_setter(df):
+    result = check_result(df, ck.has_vals_within_set, items={"b": ["x"]})
+    restored = pickle.loads(pickle.dumps(result))
+    assert (restored.column, restored.n_violations, str(restored)) == \
+        (result.column, result.n_violations, str(result))
+
+    with pytest.raises(AssertionError, match="_not_in is not true"):
+        def _not_in(df):
+            ck.has_vals_within_set(df, items={"b": ["x"]})
+        ck.custom_check(df, _not_in)
+
+    report = pickle.loads(pickle.dumps(ValidationReport([result])))
+    assert str(report) == str(result)
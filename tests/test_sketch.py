@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from bulwark.sketch import BloomFilter, duplicated_rows, duplicated_values, row_hashes
+
+
+def test_bloom_filter_has_no_false_negatives():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 64, 200000, dtype=np.uint64)
+    bloom = BloomFilter.for_capacity(100000, fp_rate=0.01)
+    bloom.add(hashes[:100000])
+    assert bloom.contains(hashes[:100000]).all()
+    assert bloom.contains(hashes[100000:]).mean() < 0.02
+
+
+def test_bloom_filter_max_bytes():
+    bloom = BloomFilter.for_capacity(10 ** 6, fp_rate=0.001, max_bytes=1024)
+    assert bloom.nbytes <= 1024
+    with pytest.raises(ValueError):
+        BloomFilter.for_capacity(10, fp_rate=1)
+
+
+@pytest.mark.parametrize("values", [
+    pd.Series([3, 1, 2, 1, 3, 3]),
+    pd.Series(np.arange(100)),
+    pd.Series([1., np.nan, -0., 0., np.nan]),
+    pd.Series([np.nan, np.inf - np.inf, 1.]),  # NaNs with different payloads
+    pd.Series(["a", None, "b", np.nan, "a"]),
+    pd.Series(["x", None, np.nan]),
+    pd.Series([1, 1., "1", ("x", 1), ("x", 1)], dtype=object),
+    pd.Series(list("abcab"), dtype="category"),
+    pd.Series([1, None, 3, None], dtype="Int64"),
+    pd.Series(pd.to_datetime(["2020", "2021", "2020"])),
+    pd.Index([5, 3, 5, 5]),
+    pd.MultiIndex.from_tuples([(1, "a"), (2, "b"), (1, "a"), (1, "b")]),
+])
+@pytest.mark.parametrize("block_size", [1, 2, 1000])
+def test_duplicated_values_matches_pandas(values, block_size):
+    duplicated = values[values.duplicated()]
+    expected = duplicated.unique() if isinstance(values, pd.Index) else pd.Index(
+        duplicated.unique(), dtype=values.dtype)
+    tm.assert_index_equal(duplicated_values(values, block_size=block_size), expected)
+
+
+def test_duplicated_values_saturated_filter():
+    values = pd.Series(np.r_[np.arange(10000), 42])
+    result = duplicated_values(values, max_bytes=8, block_size=512)
+    tm.assert_index_equal(result, pd.Index([42]))
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({"a": [1, 2, 1, 1], "b": ["x", "y", "x", "z"]}),
+    pd.DataFrame({"a": [0., -0., np.nan, np.nan], "b": [None, np.nan, "c", "c"]}),
+    pd.DataFrame({"a": pd.Categorical(list("abab")), "b": pd.array([1, None, 1, None], "Int64"),
+                  "c": pd.to_datetime(["2020", "2021", "2020", "2022"])}),
+    pd.DataFrame({"a": np.arange(100) % 7, "b": np.arange(100) % 11}),
+    pd.DataFrame({"a": np.arange(100) % 7, "b": np.arange(100) % 11, "c": np.arange(100)}),
+])
+@pytest.mark.parametrize("block_size", [1, 3, 1000])
+def test_duplicated_rows_matches_pandas(df, block_size):
+    expected = np.flatnonzero(df.duplicated(keep=False))
+    np.testing.assert_array_equal(duplicated_rows(df, block_size=block_size), expected)
+
+
+def test_row_hashes_depend_on_column_order():
+    df = pd.DataFrame({"a": [1, 2], "b": [2, 1]})
+    hashes = row_hashes(df)
+    assert hashes[0] != hashes[1]
+    np.testing.assert_array_equal(hashes, row_hashes(df, block_size=1))
+    np.testing.assert_array_equal(row_hashes(df.assign(c=0), ["a", "b"]), hashes)
+
+
+def test_duplicated_rows_of_columns():
+    df = pd.DataFrame({"a": [1, 1, 2, 1], "b": list("xyzx"), "c": np.arange(4.)})
+    np.testing.assert_array_equal(duplicated_rows(df, ["a", "b"]), [0, 3])
+    assert not duplicated_rows(df).size
+
+
+def test_duplicated_rows_memory():
+    n = 200000
+    df = pd.DataFrame({"a": np.arange(n) % 1000, "b": np.arange(n) // 1000,
+                       "c": np.linspace(0, 1, n), "d": np.arange(n)})
+    df.iloc[-1, :2] = df.iloc[0, :2]
+    tracemalloc.start()
+    try:
+        np.testing.assert_array_equal(duplicated_rows(df, ["a", "b"], block_size=1 << 12),
+                                      [0, n - 1])
+        assert tracemalloc.get_traced_memory()[1] < 10 * n
+    finally:
+        tracemalloc.stop()
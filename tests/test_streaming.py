@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.streaming import ChunkedValidator, validate_chunks
+
+
+def _chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+def _passes(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except AssertionError:
+        return False
+    return True
+
+
+def _stream_passes(df, checks, size):
+    try:
+        for _ in validate_chunks(_chunks(df, size), checks):
+            pass
+    except AssertionError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 10])
+@pytest.mark.parametrize("df,checks", [
+    (pd.DataFrame({"a": [1, 2, 3, 4, 5]}), {ck.unique: {}}),
+    (pd.DataFrame({"a": [1, 2, 3, 4, 1]}), {ck.unique: {}}),
+    (pd.DataFrame({"a": [1., np.nan, 3, np.nan]}), {ck.unique: {}}),
+    (pd.DataFrame({"a": range(5)}, index=list("abcde")), {ck.has_unique_index: {}}),
+    (pd.DataFrame({"a": range(5)}, index=list("abcda")), {ck.has_unique_index: {}}),
+    (pd.DataFrame({"a": [1, 2, 2, 3, 5]}), {ck.is_monotonic: {"increasing": True}}),
+    (pd.DataFrame({"a": [1, 2, 2, 3, 5]}), {ck.is_monotonic: {"strict": True}}),
+    (pd.DataFrame({"a": [5, 4, 4, 3, 1]}), {ck.is_monotonic: {}}),
+    (pd.DataFrame({"a": [1, 2, 3, 2, 1]}), {ck.is_monotonic: {}}),
+    (pd.DataFrame({"a": [1, 2, 3, 4, 3]}), {ck.is_monotonic: {"increasing": True}}),
+    (pd.DataFrame({"a": [1, 2, 3, 1, 2]}), {ck.has_set_within_vals: {"items": {"a": [1, 3]}}}),
+    (pd.DataFrame({"a": [1, 2, 3, 1, 2]}), {ck.has_set_within_vals: {"items": {"a": [4]}}}),
+    (pd.DataFrame({"a": np.arange(10.), "b": list("abcde") * 2}), {ck.has_vals_within_n_std: {}}),
+    (pd.DataFrame({"a": np.arange(10.)}), {ck.has_vals_within_n_std: {"n": .5}}),
+    (pd.DataFrame({"a": [1., 2, np.nan, 3]}), {ck.has_vals_within_n_std: {}}),
+    (pd.DataFrame({"a": np.arange(10.), "b": np.arange(10)}),
+     {ck.has_vals_within_n_std: {"columns": ["b"], "means": {"b": 5}, "stds": {"b": 2}}}),
+    (pd.DataFrame({"a": np.arange(10.), "b": np.arange(10)}),
+     {ck.has_vals_within_n_std: {"columns": ["b"], "means": {"b": 5}, "stds": {"b": 1}}}),
+    (pd.DataFrame({"m": list("aabbc"), "u": list("xxyyz")}),
+     {ck.one_to_many: {"unitcol": "u", "manycol": "m"}}),
+    (pd.DataFrame({"m": list("aabba"), "u": list("xxyyz")}),
+     {ck.one_to_many: {"unitcol": "u", "manycol": "m"}}),
+    (pd.DataFrame({"m": list("aabba"), "n": [1, 1, 2, 2, 2], "u": list("xxyyz")}),
+     {ck.one_to_many: {"unitcol": "u", "manycol": ["m", "n"]}}),
+    (pd.DataFrame({"m": list("aabba"), "n": [1, 1, 2, 2, 1], "u": list("xxyyz")}),
+     {ck.one_to_many: {"unitcol": "u", "manycol": ["m", "n"]}}),
+    (pd.DataFrame({"a": range(5)}), {ck.is_shape: {"shape": (5, 1)}}),
+    (pd.DataFrame({"a": range(5)}), {ck.is_shape: {"shape": (4, -1)}}),
+    (pd.DataFrame({"a": [1., 2, np.nan]}), {ck.has_no_nans: {}}),
+    (pd.DataFrame({"a": [1, 2, 3]}), {ck.has_vals_within_range: {"items": {"a": (1, 2)}}}),
+])
+def test_validate_chunks_matches_whole_frame(df, checks, size):
+    assert _stream_passes(df, checks, size) == _passes(ck.multi_check, df, checks)
+
+
+def test_validate_chunks_yields_chunks():
+    df = pd.DataFrame({"a": range(10)})
+    chunks = list(validate_chunks(_chunks(df, 3), {ck.unique: {}}))
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+def test_chunked_validator_fails_early():
+    validator = ChunkedValidator({ck.unique: {"columns": ["a"]}})
+    validator.update(pd.DataFrame({"a": [1, 2]}))
+    with pytest.raises(AssertionError, match="non-unique"):
+        validator.update(pd.DataFrame({"a": [2, 3]}))
+
+
+def test_chunked_validator_finalize():
+    validator = ChunkedValidator({ck.has_set_within_vals: {"items": {"a": [1, 4]}}})
+    validator.update(pd.DataFrame({"a": [1, 2]}))
+    validator.update(pd.DataFrame({"a": [3]}))
+    with pytest.raises(AssertionError, match=r"\{'a': \[4\]\}"):
+        validator.finalize()
+
+
+def test_chunked_validator_unsupported():
+    with pytest.raises(ValueError):
+        ChunkedValidator({ck.is_same_as: {"df_to_compare": pd.DataFrame()}})
+    with pytest.raises(ValueError):
+        ChunkedValidator({lambda df: df: {}})
+    with pytest.raises(ValueError):
+        ChunkedValidator({ck.unique: {"approx": True}})
+
+
+def test_chunked_validator_one_to_many_looks_up_known_keys():
+    validator = ChunkedValidator({ck.one_to_many: {"unitcol": "u", "manycol": "m"}})
+    for start in range(0, 100, 10):
+        validator.update(pd.DataFrame({"m": np.arange(start, start + 10) % 50,
+                                       "u": np.arange(start, start + 10) % 50 // 2}))
+    with pytest.raises(AssertionError, match=r"\{7: \[3, 0\]\}"):
+        validator.update(pd.DataFrame({"m": [7, 60], "u": [0, 30]}))